@@ -0,0 +1,14 @@
+# picoslidertoy calibrate boot.py
+
+import supervisor
+
+supervisor.set_usb_identification(manufacturer="todbot",
+                                  product="picoslidertoy")
+
+# code.py saves the calibration to microcontroller.nvm, which needs nothing
+# here. To save it to a file instead, uncomment this, CIRCUITPY becomes
+# read-only to the computer until it is removed
+#import storage; storage.remount("/", readonly=False)
+
+# paste this lines into the REPL (without the '#') to put the board into UF2 bootloader mode
+# import microcontroller; microcontroller.on_next_reset(microcontroller.RunMode.BOOTLOADER); microcontroller.reset()
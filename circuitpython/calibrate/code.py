@@ -0,0 +1,36 @@
+#
+# picoslidertoy_calibrate_code.py -- calibrate the pads and sliders, saved to flash
+# 2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+#
+# To use:
+#
+# 1. Install needed libraries:
+#   circup install adafruit_displayio_ssd1306
+# 2. Copy the picoslidertoy library and the files in this directory to CIRCUITPY:
+#   cp -r circuitpython/lib/picoslidertoy /Volumes/CIRCUITPY/lib/
+#   cp circuitpython/calibrate/* /Volumes/CIRCUITPY/
+# 3. With the REPL open and nothing touched at startup, sweep each slider
+#    slowly and steadily from end to end and back (wheels: round and round)
+#    for about 20 seconds, then tap "*" to save. The pads' baselines and
+#    thresholds, and the sliders' offsets, gains and linearization tables go
+#    to microcontroller.nvm, where the other apps load them at boot, see
+#    calstore.py. It stays there when other apps are copied over this one.
+#
+
+from picoslidertoy.controller import Controller
+from picoslidertoy.layout import LAYOUT
+from picoslidertoy.calstore import CalibrationBackend
+
+# where the calibration goes, the apps' `calibration` setting: "nvm", or a
+# file if boot.py makes CIRCUITPY writable
+calibration = "nvm"
+# the apps' slider position estimator, "pair" unless changed, see touchslider.py
+estimator = "pair"
+
+# positions straight from the pads: no smoothing and no old calibration
+controller = Controller(CalibrationBackend(calibration), LAYOUT, smoothing=None,
+                        estimator=estimator)
+print("sweep each slider slowly end to end a few times, then tap '*' to save")
+
+while True:
+    controller.step()
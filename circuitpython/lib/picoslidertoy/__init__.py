@@ -0,0 +1,32 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`picoslidertoy`
+================================================================================
+
+Library for the picoslidertoy capacitive touch controller, shared by all
+the apps. Copy this directory to CIRCUITPY/lib/.
+
+- touchslider: TouchScanner, TouchSlider, TouchWheel, RelativeEncoder, TwoFingerGesture
+- baseline: BaselineTracker, thresholds that follow drift
+- posfilter: smoothing filters for slider positions
+- slider_display: display widgets, RefreshScheduler and IconAtlas
+- layout: the board's pins and display layout as data
+- controller: Controller, builds and runs everything from a layout
+- midi_out: MIDI output and the MidiBackend for Controller
+- hid_out: HID output and the HIDBackend for Controller
+- linearize: slider linearization tables, made by the calibrate app
+- calstore: Calibration, saved in microcontroller.nvm and loaded at boot
+- profiles: ProfileManager, switch between backends while running
+- boottime: BootTimer, times startup to first scan and first USB message
+- loopprofile: LoopProfiler, where loop time goes and touch-to-USB latency
+- touchrecord: record raw touch data for replay on a computer
+
+Modules are imported one by one, e.g.
+`from picoslidertoy.controller import Controller`, so an app only loads
+what it uses.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
@@ -0,0 +1,108 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`baseline`
+================================================================================
+
+Adaptive baseline tracking for the pins of a TouchScanner, so touch
+thresholds follow temperature and humidity drift without a reset.
+
+Each untouched pin's raw_value is followed by a slow IIR filter and its noise
+is tracked as a mean absolute deviation. Touched pins are frozen, unless
+they stay touched for longer than a finger would, then the reading is
+taken as the new baseline: an untouched pin that has drifted up past its
+threshold, e.g. from a saved calibration, would otherwise stay pressed.
+Thresholds are set to baseline plus a margin that grows with the noise.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import array
+
+_FRAC = 8  # fractional bits kept in baselines and noise
+
+class BaselineTracker():
+    """Keep a TouchScanner's thresholds following each pin's untouched baseline"""
+    def __init__(self, scanner, min_margin=200, noise_mult=4, shift=11, shift_down=6,
+                 noise_shift=5, hysteresis=4, every=16, max_held=2000):
+        """
+        min_margin: smallest distance of threshold above baseline, in raw counts
+        noise_mult: margin is at least this many times the noise estimate
+        shift, shift_down: IIR speed (1/2**shift per update) when raw is above
+                           or below baseline, falling values are followed faster
+        noise_shift: IIR speed of the noise estimate
+        hysteresis: thresholds are only changed when off by this many counts
+        every: only do an update every this many calls to update()
+        max_held: updates a pin can read as touched in a row before its
+                  reading becomes its baseline
+        The time constant is every * 2**shift calls, with the defaults at about
+        1000 calls per second that's 33 s rising (so a finger resting just
+        under the threshold isn't soon taken as the baseline), 1 s falling and
+        0.5 s for the noise. A pin is taken as stuck after every * max_held
+        calls, 32 s.
+        """
+        self.scanner = scanner
+        self.min_margin, self.noise_mult = min_margin, noise_mult
+        self.shift, self.shift_down, self.noise_shift = shift, shift_down, noise_shift
+        self.hysteresis = hysteresis
+        self.every = every
+        self.max_held = max_held
+        self.count = 0
+        # assume untouched at startup, like touchio does
+        self.baselines = array.array('l', [r << _FRAC for r in scanner.raw])
+        self.noise = array.array('l', [0] * len(scanner.raw))
+        self.held = array.array('l', [0] * len(scanner.raw))  # updates touched in a row
+
+    def restore(self, baselines):
+        """
+        Start from saved baselines (raw counts, one per pin) instead of the
+        values read at startup, so a pad touched while booting isn't taken
+        as untouched. They keep adapting from there.
+        """
+        for i, b in enumerate(baselines):
+            self.baselines[i] = b << _FRAC
+
+    def baseline(self, i):
+        """Current baseline of pin i, in raw counts"""
+        return self.baselines[i] >> _FRAC
+
+    def noise_level(self, i):
+        """Current noise estimate (mean absolute deviation) of pin i, in raw counts"""
+        return self.noise[i] >> _FRAC
+
+    def update(self):
+        """Call after each scanner.scan(), adapts baselines of untouched pins"""
+        self.count += 1
+        if self.count < self.every:
+            return False
+        self.count = 0
+        scanner = self.scanner
+        raw, thresholds, touchins = scanner.raw, scanner.thresholds, scanner.touchins
+        baselines, noise, held = self.baselines, self.noise, self.held
+        changed = False
+        for i in range(len(raw)):
+            r = raw[i]
+            if r > thresholds[i]:  # touched, freeze baseline
+                held[i] += 1
+                if held[i] < self.max_held:
+                    continue
+                baselines[i] = r << _FRAC  # touched too long for a finger, it's drift
+            else:
+                d = (r << _FRAC) - baselines[i]
+                baselines[i] += d >> (self.shift if d > 0 else self.shift_down)
+                noise[i] += ((d if d > 0 else -d) - noise[i]) >> self.noise_shift
+            held[i] = 0
+            margin = (noise[i] * self.noise_mult) >> _FRAC
+            t = (baselines[i] >> _FRAC) + (margin if margin > self.min_margin else self.min_margin)
+            if t > 0xffff:
+                t = 0xffff
+            if abs(t - thresholds[i]) >= self.hysteresis:
+                thresholds[i] = t
+                touchins[i].threshold = t  # keep TouchIn.value in agreement
+                changed = True
+        if changed:
+            scanner.generation += 1  # tells TouchWheels to recalibrate
+        return changed
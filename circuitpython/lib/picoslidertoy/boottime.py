@@ -0,0 +1,39 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`boottime`
+================================================================================
+
+Time how long a picoslidertoy takes from code.py starting to being useful.
+
+Make a BootTimer first thing in code.py, before the other imports, and pass
+it to Controller. It marks the first touch scan, the first USB message and
+when the display is fully drawn, and prints each one as it happens, e.g.
+"boot: first scan at 180 ms".
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import time
+
+class BootTimer():
+    """Records the first time each startup milestone happens"""
+    def __init__(self, report=print):
+        """
+        report: function called with a line of text for each milestone, or None
+        """
+        self.t0 = time.monotonic_ns()
+        self.report = report
+        self.times = {}  # milestone name to ms since the BootTimer was made
+
+    def mark(self, name):
+        """Note that milestone `name` happened now, later marks of it are ignored"""
+        if name in self.times:
+            return
+        ms = (time.monotonic_ns() - self.t0) // 1_000_000
+        self.times[name] = ms
+        if self.report:
+            self.report("boot: %s at %d ms" % (name, ms))
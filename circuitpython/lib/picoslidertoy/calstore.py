@@ -0,0 +1,227 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`calstore`
+================================================================================
+
+Keep a board's calibration in flash, so it isn't hardcoded in every
+code.py or worked out again on every boot: each pin's untouched baseline
+and threshold, and each slider's offset, per-pad gains and linearization
+table (see linearize.py). The calibrate app measures and saves it, and
+Controller(calibration=...) loads it at boot.
+
+It's kept in `microcontroller.nvm` ("nvm"), which code.py can always
+write, or in a file on CIRCUITPY, which code.py can only write when
+boot.py has remounted it (see calibrate/boot.py). Either way it's one
+compact blob, little-endian:
+
+  header: b"PSLC", version byte, pin count byte, slider count byte, 0,
+          data length uint16, CRC-32 of the data uint32
+  data:   per pin, baseline then threshold, uint16 each
+          per slider, pad count byte, flags byte (1: has a table),
+          offset int16 (in FIXED_ONE units), gain per pad uint16 (256 is 1.0),
+          then if flagged (TABLE_SIZE + 1) uint16 table entries
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import array
+import binascii
+import struct
+
+from .touchslider import FIXED_ONE
+from .linearize import TABLE_SIZE, SweepCalibrator
+
+MAGIC = b"PSLC"
+VERSION = 1
+_HEADER = "<4sBBBBHI"
+HEADER_SIZE = struct.calcsize(_HEADER)
+_HAS_TABLE = 1
+
+class Calibration():
+    """One board's calibration, as arrays ready to hand to its scanner and sliders"""
+    def __init__(self, baselines, thresholds, offsets, gains, tables):
+        """
+        baselines, thresholds: array('H'), one per pin in scanner order
+        offsets: array('h'), each slider's offset in FIXED_ONE units
+        gains: array('H') per slider, a gain per pad, 256 is 1.0
+        tables: linearization table per slider, or None
+        """
+        self.baselines = baselines
+        self.thresholds = thresholds
+        self.offsets = offsets
+        self.gains = gains
+        self.tables = tables
+
+    def __eq__(self, other):
+        return (isinstance(other, Calibration) and self.baselines == other.baselines and
+                self.thresholds == other.thresholds and self.offsets == other.offsets and
+                list(self.gains) == list(other.gains) and list(self.tables) == list(other.tables))
+
+    def apply(self, controller):
+        """Set controller's thresholds, baselines and sliders from this, raises ValueError if it doesn't fit"""
+        scanner, sliders = controller.scanner, controller.sliders
+        if len(self.baselines) != len(scanner.raw) or len(self.offsets) != len(sliders):
+            raise ValueError("calibration is for %d pins and %d sliders, not %d and %d" %
+                             (len(self.baselines), len(self.offsets), len(scanner.raw), len(sliders)))
+        for slider, gains in zip(sliders, self.gains):
+            if len(gains) != len(slider.touchins):
+                raise ValueError("calibration has %d pads on a slider of %d" %
+                                 (len(gains), len(slider.touchins)))
+        controller.baselines.restore(self.baselines)
+        for i, t in enumerate(self.thresholds):
+            scanner.thresholds[i] = t
+            scanner.touchins[i].threshold = t
+        for i, slider in enumerate(sliders):
+            slider.offset_fixed = self.offsets[i]
+            slider.offset = self.offsets[i] / FIXED_ONE
+            slider.gains = [g / 256 for g in self.gains[i]]
+            slider.linear = self.tables[i]
+        scanner.generation += 1  # sliders recalibrate with the new thresholds and gains
+
+def from_controller(controller, tables=None):
+    """The calibration controller is running with, with new linearization tables if given"""
+    scanner, baselines = controller.scanner, controller.baselines
+    sliders = controller.sliders
+    return Calibration(array.array('H', [baselines.baseline(i) for i in range(len(scanner.raw))]),
+                       array.array('H', scanner.thresholds),
+                       array.array('h', [s.offset_fixed for s in sliders]),
+                       [array.array('H', [round(g * 256) for g in s.gains]) for s in sliders],
+                       list(tables) if tables is not None else [s.linear for s in sliders])
+
+def pack(cal):
+    """The blob for Calibration cal"""
+    data = bytearray()
+    for b, t in zip(cal.baselines, cal.thresholds):
+        data.extend(struct.pack("<HH", b, t))
+    for offset, gains, table in zip(cal.offsets, cal.gains, cal.tables):
+        data.extend(struct.pack("<BBh", len(gains), _HAS_TABLE if table else 0, offset))
+        data.extend(struct.pack("<%dH" % len(gains), *gains))
+        if table:
+            data.extend(struct.pack("<%dH" % len(table), *table))
+    if len(data) > 0xffff:
+        raise ValueError("calibration too big")
+    header = struct.pack(_HEADER, MAGIC, VERSION, len(cal.baselines), len(cal.offsets), 0,
+                         len(data), binascii.crc32(data))
+    return header + data
+
+def _unpack_header(header):
+    """(pins, sliders, data length, crc) from a blob's header, raises ValueError if it isn't one"""
+    magic, version, pins, sliders, _, length, crc = struct.unpack(_HEADER, header)
+    if magic != MAGIC:
+        raise ValueError("no calibration")
+    if version != VERSION:
+        raise ValueError("calibration is version %d, not %d" % (version, VERSION))
+    return pins, sliders, length, crc
+
+def unpack(blob):
+    """Calibration from a blob made by pack(), raises ValueError if it's damaged"""
+    header = _unpack_header(blob[:HEADER_SIZE])
+    return _unpack_data(header, memoryview(blob)[HEADER_SIZE:HEADER_SIZE + header[2]])
+
+def _unpack_data(header, data):
+    """Calibration from a blob's data, given what _unpack_header() made of its header"""
+    pins, sliders, length, crc = header
+    if len(data) != length or binascii.crc32(data) != crc:
+        raise ValueError("calibration is damaged")
+    baselines = array.array('H', [0] * pins)
+    thresholds = array.array('H', [0] * pins)
+    for i in range(pins):
+        baselines[i], thresholds[i] = struct.unpack_from("<HH", data, 4 * i)
+    n = 4 * pins
+    offsets = array.array('h', [0] * sliders)
+    gains, tables = [], []
+    for i in range(sliders):
+        pads, flags, offsets[i] = struct.unpack_from("<BBh", data, n)
+        n += 4
+        gains.append(array.array('H', struct.unpack_from("<%dH" % pads, data, n)))
+        n += 2 * pads
+        if flags & _HAS_TABLE:
+            tables.append(array.array('H', struct.unpack_from("<%dH" % (TABLE_SIZE + 1), data, n)))
+            n += 2 * (TABLE_SIZE + 1)
+        else:
+            tables.append(None)
+    return Calibration(baselines, thresholds, offsets, gains, tables)
+
+def load(where="nvm"):
+    """
+    Read a Calibration from "nvm" or a file, raises OSError or ValueError.
+    A file is one read, nvm is the header and then just the data.
+    """
+    if where == "nvm":
+        import microcontroller
+        nvm = microcontroller.nvm
+        header = _unpack_header(nvm[0:HEADER_SIZE])
+        return _unpack_data(header, nvm[HEADER_SIZE:HEADER_SIZE + header[2]])
+    with open(where, "rb") as f:
+        return unpack(f.read())
+
+def save(cal, where="nvm"):
+    """Write Calibration cal to "nvm" or a file, raises OSError if that can't be written"""
+    blob = pack(cal)
+    if where == "nvm":
+        import microcontroller
+        microcontroller.nvm[0:len(blob)] = blob
+    else:
+        with open(where, "wb") as f:
+            f.write(blob)
+    return len(blob)
+
+class CalibrationBackend():
+    """
+    Controller backend for calibrating: counts every slider's positions while
+    each is swept slowly and steadily end to end (or around) a few times,
+    then saves the calibration when the last pad ("*") is tapped.
+    """
+    def __init__(self, where="nvm", min_samples=500):
+        """
+        where: "nvm" or a file to save to, CIRCUITPY must be writable for a file,
+               see calibrate/boot.py
+        min_samples: sliders with fewer positions than this get no table
+        """
+        self.where = where
+        self.min_samples = min_samples
+        self.controller = None
+        self.calibrators = []
+        self.save_pad = -1
+        self.pad_icons = self.slider_icons = ()
+
+    def attach(self, controller):
+        self.controller = controller
+        self.calibrators = [SweepCalibrator(slider.wrap_value) for slider in controller.sliders]
+        self.save_pad = len(controller.pads) - 1
+
+    def slider(self, i, pos):
+        self.calibrators[i].add(pos)
+        return False
+
+    def pad(self, i, pressed):
+        if i == self.save_pad and pressed:
+            self.save()
+
+    def save(self):
+        """Make and save the calibration, returns True if it was saved"""
+        tables = []
+        for i, cal in enumerate(self.calibrators):
+            if cal.samples < self.min_samples:
+                print("slider %d: %d positions, too few, not linearized" % (i, cal.samples))
+                tables.append(None)
+            else:
+                print("slider %d: %d positions" % (i, cal.samples))
+                tables.append(cal.table())
+        try:
+            size = save(from_controller(self.controller, tables), self.where)
+        except OSError as e:
+            print("could not save to %s, is CIRCUITPY writable? see boot.py:" % self.where, e)
+            return False
+        print("saved %d bytes of calibration to %s" % (size, self.where))
+        return True
+
+    def gesture(self, i, kind, steps):
+        return False
+
+    def flush(self):
+        return False
@@ -0,0 +1,325 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`controller`
+================================================================================
+
+The core every picoslidertoy app shares. Controller builds the touch
+scanner, sliders, pads, baseline tracking and display from a layout, then
+each step() reads the whole board once and hands slider positions and pad
+changes to an output backend (see midi_out.MidiBackend, hid_out.HIDBackend).
+
+A backend has these methods:
+  attach(controller): called once at startup, after the touch controls are built
+  slider(i, pos): slider i is at pos (0 to FIXED_ONE-1), or None if untouched,
+                  returns True if that made something to send
+  pad(i, pressed): pad i was just pressed or released
+  gesture(i, kind, steps): two fingers on slider i turned together ("rotate",
+                  positive as positions increase) or moved apart ("pinch",
+                  negative when closer) by steps, returns True if that made
+                  something to send
+  flush(): called at the end of every step, to send what was produced,
+           returns True if anything was sent
+
+Touch scanning and USB output come first. The display is brought up
+afterwards, a piece per step over the first steps, so a freshly plugged in
+board answers touches while the display library loads, the OLED is set up
+and the icons are drawn. Pass a boottime.BootTimer to see how long it takes,
+and loop_profile to see where the time in each step goes.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import board
+import supervisor
+
+from .touchslider import TouchScanner, TouchWheel, TouchSlider, TwoFingerGesture, FIXED_ONE
+from .baseline import BaselineTracker
+from .posfilter import FilterChain, MedianFilter, OneEuroFilter
+from .layout import LAYOUT
+
+def default_smoothing():
+    """Filter chain for each slider: de-spiked, then smoothed more when moving slowly"""
+    return FilterChain(MedianFilter(), OneEuroFilter(min_cutoff=1.0, beta=50.0))
+
+def _pins(names):
+    return tuple(getattr(board, name) for name in names)
+
+class Controller():
+    """Reads a picoslidertoy laid out as `layout` and drives `backend` with it"""
+    def __init__(self, backend, layout=LAYOUT, smoothing=default_smoothing,
+                 touch_record=None, use_display=True, fps=20, defer_display=True,
+                 boot_timer=None, icon_atlas=None, loop_profile=None, estimator="pair",
+                 min_strength=0, calibration=None):
+        """
+        backend: output backend, see above
+        layout: pins and display positions, see layout.py
+        smoothing: function making a posfilter.FilterChain per slider, or None
+        touch_record: None, a file to record raw touch values to (CIRCUITPY
+                      must be writable, see boot.py) or "serial" for the
+                      usb_cdc data port, see touchrecord.py
+        use_display: set up the OLED display and draw the controls on it
+        fps: most display refreshes per second
+        defer_display: bring the display up over the first steps, not here
+        boot_timer: a boottime.BootTimer to mark startup milestones on, or None
+        icon_atlas: path of icon atlas files made by tools/emoji_atlas.py, without
+                    .bmp or .txt, or None to draw icons with EmojiLabel
+        loop_profile: None, seconds between loop timing summaries printed by
+                      a loopprofile.LoopProfiler, or a LoopProfiler
+        estimator: how sliders find positions, "pair" or "centroid", see TouchWheel
+        min_strength: positions touched more lightly than this are shown but
+                      not sent to the backend, FIXED_ONE is a threshold's worth
+                      of signal, see TouchWheel.pos_fixed()
+        calibration: where the calibrate app saved this board's calibration,
+                     "nvm" or a file, or None to start uncalibrated, see calstore.py
+        """
+        self.backend = backend
+        self.layout = layout
+        self.boot_timer = boot_timer
+        self.profiler = loop_profile
+        if loop_profile and not hasattr(loop_profile, "lap"):
+            from .loopprofile import LoopProfiler
+            self.profiler = LoopProfiler(report_every=loop_profile)
+
+        # all pins are read in one pass per step by the scanner
+        self.scanner = scanner = TouchScanner()
+        self.sliders = []
+        for s in layout["sliders"]:
+            cls = TouchWheel if s["type"] == "wheel" else TouchSlider
+            self.sliders.append(cls(_pins(s["pins"]), offset=s.get("offset", 0), scanner=scanner,
+                                    filter=smoothing() if smoothing else None,
+                                    estimator=estimator))
+        self.min_strength = min_strength
+        self.now = 0  # supervisor.ticks_ms() of this step's scan, for filters and backends
+        # two fingers on a slider are a gesture, not a position
+        self.gestures = [TwoFingerGesture(wrap=slider.wrap_value) for slider in self.sliders]
+        pads_start = scanner.add(_pins(layout["pads"]["pins"]))
+        self.pads = range(pads_start, pads_start + len(layout["pads"]["pins"]))
+        self.pad_state = [False] * len(self.pads)
+        # thresholds follow drift of each pin's untouched value
+        self.baselines = BaselineTracker(scanner)
+        if calibration:
+            from . import calstore
+            try:
+                calstore.load(calibration).apply(self)
+            except (OSError, ValueError) as e:
+                print("not calibrated:", e)
+
+        self.recorder = None
+        if touch_record:
+            from .touchrecord import TouchRecorder
+            if touch_record == "serial":
+                import usb_cdc
+                self.recorder = TouchRecorder(scanner, usb_cdc.data)
+            else:
+                self.recorder = TouchRecorder(scanner, open(touch_record, "wb"))
+
+        self.use_display = use_display
+        self.display = None
+        self.slider_displays = ()
+        self.pad_displays = None
+        self.refresher = None
+        self.pad_icons = self.slider_icons = ()
+        self.icon_sets = []
+        self.extra_widgets = []
+        self.icon_atlas = icon_atlas
+        self.startup = self._display_startup(fps) if use_display else None
+
+        backend.attach(self)
+        if self.profiler:
+            self.profiler.attach(self)
+        if self.startup and not defer_display:
+            for _ in self.startup:
+                pass
+            self.startup = None
+
+    def _display_startup(self, fps):
+        """Bring the display up a piece at a time, step() runs one piece per call"""
+        import busio
+        import displayio
+        import adafruit_displayio_ssd1306
+        try:
+            from i2cdisplaybus import I2CDisplayBus  # CircuitPython 9+
+        except ImportError:
+            from displayio import I2CDisplay as I2CDisplayBus
+        yield
+        from .slider_display import FaderDisplay, WheelDisplay, PadsDisplay, RefreshScheduler
+        from .slider_display import IconAtlas
+        cfg = self.layout["display"]
+        atlas = None
+        if self.icon_atlas:
+            try:
+                atlas = IconAtlas(self.icon_atlas)
+            except (OSError, ValueError) as e:
+                print("no icon atlas %s.bmp/.txt, using EmojiLabel:" % self.icon_atlas, e)
+
+        # virtual on-screen displays of controls
+        widgets = []
+        for s in self.layout["sliders"]:
+            if s["type"] == "wheel":
+                x, y, r = s["display"]
+                widgets.append(WheelDisplay(x, y, r, knob_w=s.get("knob_w", 9), phase_offset=-0.25,
+                                            atlas=atlas))
+            else:
+                x, y, w, h = s["display"]
+                widgets.append(FaderDisplay(x, y, w, h, knob_w=s.get("knob_w", 10), atlas=atlas))
+        self.slider_displays = tuple(widgets)
+        x, y, pad_w, pad_h = self.layout["pads"]["display"]
+        pad_displays = PadsDisplay(x, y, n=len(self.pads), pad_h=pad_h, pad_w=pad_w, atlas=atlas)
+        yield
+
+        displayio.release_displays()
+        i2c = busio.I2C(scl=getattr(board, cfg["scl"]), sda=getattr(board, cfg["sda"]),
+                        frequency=cfg["frequency"])
+        display_bus = I2CDisplayBus(i2c, device_address=cfg["address"])
+        display = adafruit_displayio_ssd1306.SSD1306(display_bus, width=cfg["width"],
+                                                     height=cfg["height"])
+        self.maingroup = displayio.Group()
+        display.root_group = self.maingroup
+        for w in widgets:
+            self.maingroup.append(w)
+        self.maingroup.append(pad_displays)
+        # refresh display only when widgets change, and not while sliders are moving
+        self.refresher = RefreshScheduler(display, tuple(widgets) + (pad_displays,),
+                                          fps=fps, defer_while_moving=True)
+        # from here on step() draws the controls
+        self.display = display
+        self.slider_displays = tuple(widgets)
+        self.pad_displays = pad_displays
+        yield
+
+        while self.extra_widgets:
+            self.add_widget(self.extra_widgets.pop(0))
+            yield
+        # icons are slowest, one per step, picking up any set_icons() meanwhile
+        for i in range(len(self.pads)):
+            pad_displays.icon(i, self.pad_icons[i] if i < len(self.pad_icons) else "")
+            yield
+        for i, widget in enumerate(self.slider_displays):
+            widget.icon(self.slider_icons[i] if i < len(self.slider_icons) else "")
+            yield
+        self._draw_icons()
+        for pad_icons, slider_icons in self.icon_sets:
+            for i, icon in enumerate(pad_icons):
+                if pad_displays.preload_icon(i, icon):
+                    yield
+            for widget, icon in zip(self.slider_displays, slider_icons):
+                if widget.preload_icon(icon):
+                    yield
+        self.icon_sets = None
+        if self.boot_timer:
+            self.boot_timer.mark("display")
+
+    def _draw_icons(self):
+        pad_icons, slider_icons = self.pad_icons, self.slider_icons
+        for i in range(len(self.pads)):
+            self.pad_displays.icon(i, pad_icons[i] if i < len(pad_icons) else "")
+        for i, widget in enumerate(self.slider_displays):
+            widget.icon(slider_icons[i] if i < len(slider_icons) else "")
+
+    def set_icons(self, pad_icons=(), slider_icons=()):
+        """Show emoji icons on the pads and slider knobs, "" or missing for none"""
+        self.pad_icons, self.slider_icons = pad_icons, slider_icons
+        if self.pad_displays is None or self.startup:
+            return  # drawn when the display is up
+        self._draw_icons()
+
+    def preload_icons(self, pad_icons=(), slider_icons=()):
+        """Make icons that set_icons() will show later while the display comes up"""
+        if self.icon_sets is not None:
+            self.icon_sets.append((pad_icons, slider_icons))
+            return
+        for i, icon in enumerate(pad_icons):
+            self.pad_displays.preload_icon(i, icon)
+        for widget, icon in zip(self.slider_displays, slider_icons):
+            widget.preload_icon(icon)
+
+    def add_widget(self, widget):
+        """
+        Draw another widget (with a `dirty` flag) along with the controls.
+        widget can also be a function making one, called once the display is up.
+        """
+        if not self.use_display:
+            return
+        if self.display is None:
+            self.extra_widgets.append(widget)
+            return
+        if callable(widget):
+            widget = widget()
+        self.maingroup.append(widget)
+        self.refresher.widgets += (widget,)
+
+    def step(self):
+        """Read the board once, pass changes to the backend, update the display"""
+        prof = self.profiler
+        if prof:
+            prof.start()
+        self.scanner.scan()
+        self.now = now = supervisor.ticks_ms()  # one small-int timestamp for the whole step
+        if self.boot_timer:
+            self.boot_timer.mark("first scan")
+        self.baselines.update()
+        if self.recorder:
+            self.recorder.record()
+        if prof:
+            prof.lap()  # scan
+        backend = self.backend
+        moving = False
+        min_strength, gestures = self.min_strength, self.gestures
+        for i, slider in enumerate(self.sliders):
+            pos = slider.pos_fixed(now)   # 0 to FIXED_ONE-1, no float math
+            gesture = gestures[i]
+            if slider.touches > 1:
+                if not gesture.frames:
+                    backend.slider(i, None)  # the one finger lifted, as far as it knows
+                steps = gesture.update(slider.center, slider.spread)
+                if steps and backend.gesture(i, gesture.kind, steps) and prof:
+                    prof.output(i)
+            else:
+                if gesture.frames:
+                    gesture.reset()
+                # too light a touch to trust, keep the last position sent
+                if (pos is None or slider.strength >= min_strength) and backend.slider(i, pos) and prof:
+                    prof.output(i)
+            if self.slider_displays:
+                if pos is not None:   # touched!
+                    self.slider_displays[i].pos(pos / FIXED_ONE)  # 0-1 for faders and wheels alike
+                    self.slider_displays[i].touch(True)
+                else:
+                    self.slider_displays[i].touch(False)
+            if pos is not None:
+                moving = True
+        if prof:
+            prof.lap()  # sliders
+
+        scanner, pad_state = self.scanner, self.pad_state
+        for i, pad in enumerate(self.pads):
+            v = scanner.value(pad)
+            if self.pad_displays:
+                self.pad_displays.set(i, v)
+            if pad_state[i] != v:
+                pad_state[i] = v
+                backend.pad(i, v)
+        if prof:
+            prof.lap()  # pads
+
+        if backend.flush():
+            if self.boot_timer:
+                self.boot_timer.mark("first usb")
+            if prof:
+                prof.sent()
+        if prof:
+            prof.lap()  # usb
+        if self.refresher:
+            self.refresher.update(now, moving)
+        if self.startup:
+            try:
+                next(self.startup)
+            except StopIteration:
+                self.startup = None
+        if prof:
+            prof.lap()  # display
+            prof.end()
@@ -0,0 +1,263 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`hid_out`
+================================================================================
+
+HID output stage for picoslidertoy.
+
+Each Keyboard or ConsumerControl send() blocks until its press and release
+reports have gone over USB, so sending a burst of slider steps from inside
+the scan loop stalls touch scanning. HIDQueue takes actions into a bounded
+ring buffer instead and sends at most a few of them per loop. A repeat of
+the action at the end of the queue just adds to its count, so a fast slider
+move takes one slot, not one per step.
+
+compile_actions() checks an app's hid_actions config once at startup and
+turns it into flat tables of (device, command), so firing an action is a
+single index and config mistakes raise at boot.
+
+HIDBackend drives all this from a controller.Controller: sliders act like
+rotary encoders sending their actions, pads send theirs when pressed, and
+two fingers turning or pinching on a slider send its gesture actions.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import array
+
+from .touchslider import RelativeEncoder
+
+class HIDQueue():
+    """Bounded queue of HID sends, drained a few sends per loop"""
+    def __init__(self, size=16, per_loop=1, max_count=255):
+        """
+        size: most different actions waiting at once, more are dropped
+        per_loop: sends done by each drain(), each is a press and a release report
+        max_count: most repeats one slot collects, more go in the next slot
+        """
+        self.devices = [None] * size
+        self.commands = [None] * size
+        self.counts = array.array('H', [0] * size)
+        self.per_loop = per_loop
+        self.max_count = max_count
+        self.head = 0  # next slot to send
+        self.n = 0     # slots in use
+        self.sent = 0
+        self.dropped = 0
+
+    def put(self, device, command, repeats=1):
+        """
+        Queue device.send(*command) to be done repeats times.
+        Returns False if the queue filled up and some or all were dropped.
+        """
+        size = len(self.counts)
+        if self.n:
+            tail = (self.head + self.n - 1) % size
+            if self.devices[tail] is device and self.commands[tail] == command:
+                room = self.max_count - self.counts[tail]
+                add = repeats if repeats < room else room
+                self.counts[tail] += add
+                repeats -= add
+        while repeats:
+            if self.n == size:
+                self.dropped += repeats
+                return False
+            tail = (self.head + self.n) % size
+            count = repeats if repeats < self.max_count else self.max_count
+            self.devices[tail] = device
+            self.commands[tail] = command
+            self.counts[tail] = count
+            self.n += 1
+            repeats -= count
+        return True
+
+    def pending(self):
+        """Number of sends waiting"""
+        size = len(self.counts)
+        return sum(self.counts[(self.head + k) % size] for k in range(self.n))
+
+    def drain(self, max_sends=None):
+        """
+        Do up to max_sends (default per_loop) of the waiting sends, call once per loop.
+        Returns how many were done.
+        """
+        budget = self.per_loop if max_sends is None else max_sends
+        sent = self.sent
+        size = len(self.counts)
+        while budget and self.n:
+            head = self.head
+            self.devices[head].send(*self.commands[head])
+            self.sent += 1
+            budget -= 1
+            self.counts[head] -= 1
+            if self.counts[head] == 0:
+                self.devices[head] = self.commands[head] = None
+                self.head = (head + 1) % size
+                self.n -= 1
+        return self.sent - sent
+
+    def clear(self):
+        """Forget everything waiting"""
+        while self.n:
+            self.devices[self.head] = self.commands[self.head] = None
+            self.head = (self.head + 1) % len(self.counts)
+            self.n -= 1
+
+class HIDActions():
+    """hid_actions config compiled into flat dispatch tables, made by compile_actions()"""
+    def __init__(self):
+        self.buttons = []        # (device, command) per button, or None for no action
+        self.sliders = []        # (device, command) per slider direction, at 2*i (decrement) and 2*i+1
+        self.sensitivities = []  # steps per slider length
+        self.gestures = []       # (device, command) per gesture direction, at 4*i: rotate
+                                 # decrement, increment, pinch together, apart
+        self.button_icons = []
+        self.slider_icons = []
+
+def _command(command, where):
+    if (not isinstance(command, tuple) or not command or
+            not all(isinstance(c, int) for c in command)):
+        raise ValueError("%s: command must be a tuple of key or control codes, got %r" %
+                         (where, command))
+    return command
+
+def _device(device, where):
+    if not callable(getattr(device, "send", None)):
+        raise ValueError("%s: %r is not a HID device with send()" % (where, device))
+    return device
+
+def compile_actions(hid_actions, default_device=None, num_buttons=0, num_sliders=0):
+    """
+    Check hid_actions and compile it into an HIDActions. Entries can be
+      "button": (device, icon, command) or just command
+      "slider": (device, sensitivity, icon, decrement, increment)
+                or (sensitivity, decrement, increment)
+      "gesture": (device, decrement, increment, together, apart)
+                 or (decrement, increment, together, apart), or None
+    where a command is a tuple of Keycodes or ConsumerControlCodes, and
+    entries without a device use default_device. Tables are padded to
+    num_buttons and num_sliders with None. Raises ValueError on bad entries.
+    """
+    unknown = [g for g in hid_actions if g not in ("button", "slider", "gesture")]
+    if unknown:
+        raise ValueError("unknown hid_actions groups: %s" % ", ".join(unknown))
+    actions = HIDActions()
+    for i, entry in enumerate(hid_actions.get("button", ())):
+        where = "button %d" % i
+        if isinstance(entry, tuple) and entry and isinstance(entry[0], int):
+            device, icon, command = default_device, "", entry
+        elif isinstance(entry, tuple) and len(entry) == 3:
+            device, icon, command = entry
+        else:
+            raise ValueError("%s: expected (device, icon, command) or command, got %r" % (where, entry))
+        actions.buttons.append((_device(device, where), _command(command, where)))
+        actions.button_icons.append(icon)
+    for i, entry in enumerate(hid_actions.get("slider", ())):
+        where = "slider %d" % i
+        if isinstance(entry, tuple) and len(entry) == 3:
+            device, icon, (sensitivity, decrement, increment) = default_device, "", entry
+        elif isinstance(entry, tuple) and len(entry) == 5:
+            device, sensitivity, icon, decrement, increment = entry
+        else:
+            raise ValueError("%s: expected (device, sensitivity, icon, decrement, increment)"
+                             " or (sensitivity, decrement, increment), got %r" % (where, entry))
+        if not isinstance(sensitivity, int) or sensitivity <= 0:
+            raise ValueError("%s: sensitivity must be a positive int, got %r" % (where, sensitivity))
+        device = _device(device, where)
+        actions.sliders.append((device, _command(decrement, where)))
+        actions.sliders.append((device, _command(increment, where)))
+        actions.sensitivities.append(sensitivity)
+        actions.slider_icons.append(icon)
+    for i, entry in enumerate(hid_actions.get("gesture", ())):
+        where = "gesture %d" % i
+        if entry is None:
+            actions.gestures.extend((None, None, None, None))
+            continue
+        if isinstance(entry, tuple) and len(entry) == 4:
+            device, commands = default_device, entry
+        elif isinstance(entry, tuple) and len(entry) == 5:
+            device, commands = entry[0], entry[1:]
+        else:
+            raise ValueError("%s: expected (device, decrement, increment, together, apart)"
+                             " or (decrement, increment, together, apart), got %r" % (where, entry))
+        device = _device(device, where)
+        actions.gestures.extend((device, _command(c, where)) for c in commands)
+    while len(actions.buttons) < num_buttons:
+        actions.buttons.append(None)
+        actions.button_icons.append("")
+    while len(actions.sensitivities) < num_sliders:
+        actions.sliders.extend((None, None))
+        actions.sensitivities.append(16)
+        actions.slider_icons.append("")
+    while len(actions.gestures) < 4 * num_sliders:
+        actions.gestures.append(None)
+    return actions
+
+class HIDBackend():
+    """Controller backend sending hid_actions (see compile_actions) through a HIDQueue"""
+    def __init__(self, hid_actions, default_device=None, queue_size=16, per_loop=1,
+                 max_steps=4, accel=1.0):
+        """
+        hid_actions: the app's actions config, see compile_actions()
+        default_device: device for actions that don't name one
+        queue_size, per_loop: see HIDQueue
+        max_steps: most slider steps per loop
+        accel: slider acceleration, see RelativeEncoder
+        """
+        self.hid_actions = hid_actions
+        self.default_device = default_device
+        # sends wait here and go out one per loop, so USB doesn't stall scanning
+        self.queue = HIDQueue(size=queue_size, per_loop=per_loop)
+        self.max_steps = max_steps
+        self.accel = accel
+        self.actions = None
+        self.controller = None
+        self.encoders = ()
+        self.pad_icons = self.slider_icons = ()
+
+    def attach(self, controller):
+        self.controller = controller
+        # checked once here, a mistake in hid_actions stops with an error at boot
+        self.actions = actions = compile_actions(self.hid_actions, self.default_device,
+                                                 len(controller.pads), len(controller.sliders))
+        # sliders act like rotary encoders, one slider action per step moved,
+        # fast moves are accelerated and wheels can be spun past the seam
+        self.encoders = [RelativeEncoder(steps=actions.sensitivities[i], wrap=slider.wrap_value,
+                                         accel=self.accel, max_steps=self.max_steps)
+                         for i, slider in enumerate(controller.sliders)]
+        self.pad_icons, self.slider_icons = actions.button_icons, actions.slider_icons
+        controller.set_icons(self.pad_icons, self.slider_icons)
+
+    def slider(self, i, pos):
+        # positions count down toward the last pad, so steps are flipped
+        steps = -self.encoders[i].update(pos, self.controller.now)
+        if not steps:
+            return False
+        print("slider:%d: %s steps:%d" % (i,pos,steps))  # pos is None for steps left after a lift
+        action = self.actions.sliders[2*i + (steps > 0)]
+        if action:
+            return self.queue.put(action[0], action[1], abs(steps))
+        return False
+
+    def pad(self, i, pressed):
+        if pressed and self.actions.buttons[i]:
+            self.queue.put(*self.actions.buttons[i])
+        print("pad:%d: v:%d" % (i,pressed))
+
+    def gesture(self, i, kind, steps):
+        if kind == "rotate":
+            steps = -steps  # like slider()
+            action = self.actions.gestures[4*i + (steps > 0)]
+        else:
+            action = self.actions.gestures[4*i + 2 + (steps > 0)]
+        print("gesture:%d: %s steps:%d" % (i, kind, steps))
+        if action:
+            return self.queue.put(action[0], action[1], abs(steps))
+        return False
+
+    def flush(self):
+        return self.queue.drain()
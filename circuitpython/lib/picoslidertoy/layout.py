@@ -0,0 +1,42 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`layout`
+================================================================================
+
+The picoslidertoy board as data: which pins make up each slider and pad,
+and where each control is drawn on the display. Controller builds
+everything from a layout like this. Pins are board pin names.
+
+Apps can use a changed copy, e.g. to move the pads display:
+  layout = dict(LAYOUT, pads=dict(LAYOUT["pads"], display=(16, 50, 11, 11)))
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+LAYOUT = {
+    # "fader" display is (x, y, w, h), "wheel" display is (x, y, radius)
+    # pins go in order along a fader or around a wheel, 3 or more for a wheel
+    "sliders": (
+        {"name": "A", "type": "fader", "pins": ("GP4", "GP0", "GP28"), "display": (10, 10, 8, 35)},
+        {"name": "B", "type": "fader", "pins": ("GP5", "GP1", "GP27"), "display": (25, 10, 8, 35)},
+        {"name": "C", "type": "fader", "pins": ("GP3", "GP2", "GP26"), "display": (40, 10, 8, 35)},
+        {"name": "X", "type": "wheel", "pins": ("GP7", "GP8", "GP9"), "offset": 0.25,
+         "display": (70, 25, 15), "knob_w": 9},
+        {"name": "Y", "type": "wheel", "pins": ("GP10", "GP11", "GP12"), "offset": 0.25,
+         "display": (105, 25, 15), "knob_w": 9},
+    ),
+    # pads display is (x, y, pad_w, pad_h)
+    "pads": {
+        "names": ("1", "2", "3", "4", "5", "6", "7", "8", "*"),
+        "pins": ("GP22", "GP21", "GP20", "GP19", "GP18", "GP17", "GP16", "GP6", "GP13"),
+        "display": (20, 50, 10, 10),
+    },
+    # profile indicator display is (x, y, box_w, box_h), see profiles.py
+    "profiles": {"display": (104, 0, 7, 5)},
+    "display": {"width": 128, "height": 64, "scl": "GP15", "sda": "GP14",
+                "address": 0x3c, "frequency": 1_000_000},
+}
@@ -0,0 +1,80 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`linearize`
+================================================================================
+
+Straighten out each slider's response. The pads' geometry makes equal
+finger travel give unequal steps of pos_fixed(), bunching up near pad
+centers. A slow, steady sweep along a slider visits every part of it for
+the same time, so the fraction of the sweep's positions below any reading
+is where along the slider that reading really is. SweepCalibrator counts
+those positions and builds a table of that, 64 segments from 0 to FIXED_ONE
+(a wheel's can start further round), always increasing. A slider with
+`linear` set to a table looks positions up in it with linear
+interpolation, a few integer operations per call.
+
+Tables are made by the calibrate app and saved with the rest of the
+board's calibration, which Controller(calibration=...) loads at boot,
+see calstore.py.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import array
+
+from .touchslider import FIXED_SHIFT, FIXED_ONE, FIXED_MASK, LINEAR_BITS
+
+TABLE_SIZE = 1 << LINEAR_BITS
+
+def identity_table():
+    """A table that leaves positions as they are"""
+    return array.array('H', [(j * FIXED_ONE) >> LINEAR_BITS for j in range(TABLE_SIZE + 1)])
+
+class SweepCalibrator():
+    """Counts one slider's positions during slow sweeps, makes its table"""
+    def __init__(self, wrap=False):
+        """wrap: positions are on a wheel, swept round and round"""
+        self.wrap = wrap
+        self.counts = array.array('L', [0] * TABLE_SIZE)
+        self.samples = 0
+
+    def add(self, pos):
+        """Count position pos (0 to FIXED_ONE-1) or None when not touched"""
+        if pos is None:
+            return
+        self.counts[pos >> (FIXED_SHIFT - LINEAR_BITS)] += 1
+        self.samples += 1
+
+    def table(self, blend=0.05):
+        """
+        Table mapping positions to the fraction of the sweep below them.
+        A wheel's sweep has no start, so its table is turned to keep positions
+        where they were on average, entries can go past FIXED_ONE then.
+        blend: part of the identity table mixed in, so parts of the slider
+               the sweep hardly visited still move a little
+        """
+        if not self.samples:
+            return identity_table()
+        keep = round((1 - blend) * 256)
+        table = array.array('H', [0] * (TABLE_SIZE + 1))
+        below = turn = 0
+        half = FIXED_ONE >> (LINEAR_BITS + 1)  # half a segment
+        for j in range(1, TABLE_SIZE + 1):
+            count = self.counts[j - 1]
+            # how far this segment's positions move, the short way round
+            moved = (((below + count // 2) * FIXED_ONE // self.samples - (j - 1) * 2 * half - half
+                      + FIXED_ONE // 2) & FIXED_MASK) - FIXED_ONE // 2
+            turn -= count * moved
+            below += count
+            swept = below * FIXED_ONE // self.samples
+            table[j] = (swept * keep + ((j * FIXED_ONE) >> LINEAR_BITS) * (256 - keep)) >> 8
+        table[TABLE_SIZE] = FIXED_ONE
+        if self.wrap:
+            turn = (turn // self.samples) & FIXED_MASK
+            for j in range(TABLE_SIZE + 1):
+                table[j] += turn
+        return table
@@ -0,0 +1,177 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`loopprofile`
+================================================================================
+
+Where does the time in each Controller.step() go? LoopProfiler times each
+phase of the loop (touch scan, slider math, pads, USB sends, display) with
+time.monotonic_ns(), and how long a slider's touch takes to go out over
+USB. Times go into preallocated ring buffers and fixed-bucket histograms,
+nothing is allocated per loop besides the timestamps themselves, and every
+`report_every` seconds a compact summary is printed, e.g.:
+
+  prof 5s 4102 loops, us p50/p99/max: scan 512/790/790 ... loop 1024/1630/1630
+  prof touch-usb us p50/p99/max: A 2048/2801/2801 B -/-/- ...
+
+Histogram buckets double in size, p50 and p99 are the upper edges of the
+buckets they fall in (but never past max), max is exact. Touch-to-USB
+runs from the start of the scan where a slider's move first made output
+to the next step that sent something, so it includes any waiting in the
+HID queue.
+
+Turn it on with Controller(..., loop_profile=5). When off, Controller only
+checks for it a few times a step.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import array
+import time
+
+class LoopProfiler():
+    """Phase timing and touch-to-USB latency histograms for Controller.step()"""
+    PHASES = ("scan", "sliders", "pads", "usb", "display")
+
+    def __init__(self, report_every=5.0, buckets=12, bucket_us=32, ring=64, report=print):
+        """
+        report_every: seconds between summaries, None for only when report() is called
+        buckets: histogram buckets, the first is under bucket_us, each next one twice as wide
+        bucket_us: microseconds of the first bucket
+        ring: how many recent loops of phase times are kept, see recent()
+        report: function called with each line of a summary
+        """
+        self.buckets, self.bucket_us, self.ring = buckets, bucket_us, ring
+        self.report_ns = int(report_every * 1_000_000_000) if report_every else 0
+        self.report_func = report
+        self.names = self.PHASES + ("loop",)
+        self.slider_names = ()
+        nphases = len(self.names)
+        self.hist = array.array('L', [0] * (nphases * buckets))
+        self.max = array.array('L', [0] * nphases)
+        self.recent_us = array.array('L', [0] * (nphases * ring))
+        self.loops = 0  # since the last report
+        self.pos = self.filled = 0  # ring buffer position and how much of it is used
+        self.phase = 0
+        self.t_start = self.t_lap = 0
+        self.t_report = time.monotonic_ns()
+        self.set_sliders(())
+
+    def set_sliders(self, names):
+        """Make the touch-to-USB histograms, one per slider name"""
+        n, buckets = len(names), self.buckets
+        self.slider_names = tuple(names)
+        self.lat_hist = array.array('L', [0] * (n * buckets))
+        self.lat_max = array.array('L', [0] * n)
+        self.pending = [0] * n  # scan start of output not yet sent, 0 for none
+
+    def attach(self, controller):
+        self.set_sliders([s.get("name", str(i)) for i, s in enumerate(controller.layout["sliders"])])
+
+    def _bucket(self, us):
+        b, v = 0, us // self.bucket_us
+        while v and b < self.buckets - 1:
+            v >>= 1
+            b += 1
+        return b
+
+    def _add(self, hist, maxes, row, us):
+        hist[row * self.buckets + self._bucket(us)] += 1
+        if us > maxes[row]:
+            maxes[row] = us
+
+    def start(self):
+        """Call at the start of a loop"""
+        self.t_start = self.t_lap = time.monotonic_ns()
+        self.phase = 0
+
+    def lap(self):
+        """Call at the end of each phase, in PHASES order"""
+        t = time.monotonic_ns()
+        us = (t - self.t_lap) // 1000
+        self.t_lap = t
+        phase = self.phase
+        self._add(self.hist, self.max, phase, us)
+        self.recent_us[phase * self.ring + self.pos] = us
+        self.phase = phase + 1
+
+    def output(self, i):
+        """Slider i made output this loop"""
+        if not self.pending[i]:
+            self.pending[i] = self.t_start
+
+    def sent(self):
+        """Something was sent over USB this loop"""
+        t, pending = time.monotonic_ns(), self.pending
+        for i in range(len(pending)):
+            if pending[i]:
+                self._add(self.lat_hist, self.lat_max, i, (t - pending[i]) // 1000)
+                pending[i] = 0
+
+    def end(self):
+        """Call at the end of a loop, prints a summary every report_every seconds"""
+        t = time.monotonic_ns()
+        us = (t - self.t_start) // 1000
+        row = len(self.names) - 1
+        self._add(self.hist, self.max, row, us)
+        self.recent_us[row * self.ring + self.pos] = us
+        self.pos = (self.pos + 1) % self.ring
+        if self.filled < self.ring:
+            self.filled += 1
+        self.loops += 1
+        if self.report_ns and t - self.t_report >= self.report_ns:
+            self.report()
+
+    def recent(self, name):
+        """The last `ring` loops' microseconds for phase name (or "loop"), oldest first"""
+        row = self.names.index(name) * self.ring
+        n, ring = self.filled, self.ring
+        return [self.recent_us[row + (self.pos - n + i) % ring] for i in range(n)]
+
+    def percentile(self, hist, row, p):
+        """Upper edge in microseconds of the bucket holding fraction p of row's samples"""
+        buckets = self.buckets
+        counts = hist[row * buckets:(row + 1) * buckets]
+        total = sum(counts)
+        if not total:
+            return None
+        want, seen = total * p, 0
+        for b in range(buckets):
+            seen += counts[b]
+            if seen >= want:
+                break
+        return self.bucket_us << b
+
+    def _stats(self, hist, maxes, names):
+        parts = []
+        for row, name in enumerate(names):
+            p50 = self.percentile(hist, row, 0.5)
+            if p50 is None:
+                parts.append("%s -/-/-" % name)
+            else:
+                top = maxes[row]  # no bucket edge past the slowest actually seen
+                parts.append("%s %d/%d/%d" % (name, min(p50, top),
+                                              min(self.percentile(hist, row, 0.99), top), top))
+        return " ".join(parts)
+
+    def report(self):
+        """Print a summary of the loops since the last one, and start over"""
+        t = time.monotonic_ns()
+        secs = (t - self.t_report) / 1_000_000_000
+        self.report_func("prof %.0fs %d loops, us p50/p99/max: %s" %
+                         (secs, self.loops, self._stats(self.hist, self.max, self.names)))
+        if self.slider_names:
+            self.report_func("prof touch-usb us p50/p99/max: " +
+                             self._stats(self.lat_hist, self.lat_max, self.slider_names))
+        self.clear()
+        self.t_report = t
+
+    def clear(self):
+        """Empty the histograms"""
+        for a in (self.hist, self.max, self.lat_hist, self.lat_max):
+            for i in range(len(a)):
+                a[i] = 0
+        self.loops = 0
@@ -0,0 +1,212 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`midi_out`
+================================================================================
+
+MIDI output stage for picoslidertoy.
+
+MidiOut writes 3-byte channel messages straight into a reusable bytearray
+and sends everything produced in one loop with a single write(), without
+creating adafruit_midi message objects.
+
+CCSender only sends slider CC values when they change, optionally no faster
+than a minimum interval per CC. A value held back by the interval is still
+sent once its time is up, so the last value of a gesture is never lost.
+Sliders can also send high-resolution 14-bit CCs (MSB/LSB pairs) or NRPNs,
+where only the LSB is sent when the MSB hasn't changed.
+
+MidiBackend drives all this from a controller.Controller: sliders send CCs
+and pads send notes. Two-finger gestures on a slider send relative CCs,
+64 plus or minus the steps moved, the way many DAWs read endless encoders.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+from .touchslider import FIXED_MASK, TICKS_MASK
+
+class MidiOut():
+    """Write MIDI channel messages as raw bytes, batched into one write() per loop"""
+    def __init__(self, port, channel=0, max_messages=32):
+        """
+        port: where bytes go, e.g. usb_midi.ports[1]
+        channel: MIDI channel 0-15
+        max_messages: messages buffered before flush() is forced
+        """
+        self.port = port
+        self.channel = channel
+        self.buf = bytearray(3 * max_messages)
+        self.n = 0
+
+    def _put(self, status, d1, d2):
+        n = self.n
+        if n == len(self.buf):
+            self.flush()
+            n = 0
+        buf = self.buf
+        buf[n] = status | self.channel
+        buf[n+1] = d1 & 0x7f
+        buf[n+2] = d2 & 0x7f
+        self.n = n + 3
+
+    def note_on(self, note, velocity=127):
+        self._put(0x90, note, velocity)
+
+    def note_off(self, note, velocity=0):
+        self._put(0x80, note, velocity)
+
+    def control_change(self, cc_num, cc_val):
+        self._put(0xB0, cc_num, cc_val)
+
+    def flush(self):
+        """Write all buffered messages in one go, call once per loop. True if any were written"""
+        if not self.n:
+            return False
+        self.port.write(self.buf, self.n)
+        self.n = 0
+        return True
+
+# slider output modes, for entries in CCSender's ccs table
+CC7 = 0   # plain 7-bit CC
+CC14 = 1  # 14-bit CC, MSB on cc_num (0-31) and LSB on cc_num+32
+NRPN = 2  # 14-bit NRPN, via CC 99/98 parameter select and CC 6/38 data entry
+
+class CCSender():
+    """Send slider CC values only when they change, optionally rate-limited per CC"""
+    def __init__(self, send_cc, ccs, min_interval=0):
+        """
+        send_cc: function taking (cc_num, cc_val) that sends the message
+        ccs: for each slider, a CC number for a 7-bit CC, or a tuple of
+             (cc_num, CC14) or (nrpn_num, NRPN) for 14-bit output
+        min_interval: minimum seconds between messages on the same CC, 0 for none,
+                      kept in milliseconds
+        """
+        self.send_cc = send_cc
+        self.nums = [c if isinstance(c, int) else c[0] for c in ccs]
+        self.modes = [CC7 if isinstance(c, int) else c[1] for c in ccs]
+        for num, mode in zip(self.nums, self.modes):
+            if mode == CC14 and not 0 <= num < 32:
+                raise ValueError("14-bit CC number must be 0-31: %d" % num)
+        self.min_interval = round(min_interval * 1000)
+        self.sent = [-1] * len(ccs)     # last value sent per slider
+        self.pending = [-1] * len(ccs)  # value held back by min_interval
+        self.last_time = [None] * len(ccs)
+        self.nrpn_selected = -1  # NRPN parameter the receiver has selected
+        self.count = 0  # messages sent
+
+    def set(self, i, val, t_ms):
+        """
+        Set slider i's output to val, a 14-bit value 0-16383 (7-bit CCs use
+        the top 7 bits) at t_ms, supervisor.ticks_ms() like Controller's step
+        time. Returns True if anything was sent now.
+        """
+        if self.modes[i] == CC7:
+            val >>= 7
+        if val == self.sent[i]:
+            self.pending[i] = -1
+            return False
+        if self.min_interval:
+            last = self.last_time[i]
+            if last is not None and (t_ms - last) & TICKS_MASK < self.min_interval:
+                self.pending[i] = val  # "settle" send later in poll()
+                return False
+            self.last_time[i] = t_ms
+        self._send(i, val)
+        return True
+
+    def poll(self, t_ms):
+        """Call once per loop with its ticks_ms(), sends held back values whose interval is up"""
+        if not self.min_interval:
+            return
+        for i in range(len(self.pending)):
+            val = self.pending[i]
+            if val >= 0 and (t_ms - self.last_time[i]) & TICKS_MASK >= self.min_interval:
+                self.last_time[i] = t_ms
+                self._send(i, val)
+
+    def _send(self, i, val):
+        last = self.sent[i]
+        self.sent[i] = val
+        self.pending[i] = -1
+        mode, num = self.modes[i], self.nums[i]
+        if mode == CC7:
+            self.send_cc(num, val)
+            self.count += 1
+            return
+        if mode == NRPN:
+            if num != self.nrpn_selected:
+                self.send_cc(99, num >> 7)
+                self.send_cc(98, num & 0x7f)
+                self.count += 2
+                self.nrpn_selected = num
+                last = -1  # receiver may not have this parameter's MSB yet
+            msb_num, lsb_num = 6, 38
+        else:
+            msb_num, lsb_num = num, num + 32
+        # a new MSB resets the receiver's LSB, so LSB is sent either way
+        if last < 0 or (last >> 7) != (val >> 7):
+            self.send_cc(msb_num, val >> 7)
+            self.count += 1
+        self.send_cc(lsb_num, val & 0x7f)
+        self.count += 1
+
+class MidiBackend():
+    """Controller backend sending slider CCs and pad notes over MIDI"""
+    def __init__(self, port, channel=0, ccs=(73, 1, 72, 74, 71),
+                 notes=(36, 41, 43, 48, 53, 55, 60, 65, 67), cc_min_interval=0,
+                 gesture_ccs=(None, None, None, None, None)):
+        """
+        port: where bytes go, e.g. usb_midi.ports[1]
+        channel: MIDI channel 0-15
+        ccs: per slider, a CC number or a 14-bit (num, CC14) / (num, NRPN), see CCSender
+        notes: note number per pad
+        cc_min_interval: seconds between messages on a CC, 0 for no limit
+        gesture_ccs: per slider, (rotate CC, pinch CC) for two-finger gestures, or None
+                     for none, the default for every slider
+        """
+        self.midi = MidiOut(port, channel=channel)
+        # slider CCs are only sent when their value changes
+        self.cc_out = CCSender(self.midi.control_change, ccs, min_interval=cc_min_interval)
+        self.notes = notes
+        self.gesture_ccs = gesture_ccs
+        self.controller = None
+        self.pad_icons = self.slider_icons = ()
+
+    def attach(self, controller):
+        self.controller = controller  # for its step time, controller.now
+
+    def slider(self, i, pos):
+        if pos is None:
+            return False
+        cc_val = (FIXED_MASK - pos) * 16383 // FIXED_MASK  # 14-bit, ends at 0 and 16383
+        if self.cc_out.set(i, cc_val, self.controller.now):
+            print("slider:%d: %d cc:%d ccval:%d" % (i,pos,self.cc_out.nums[i],cc_val))
+            return True
+        return False
+
+    def pad(self, i, pressed):
+        n = self.notes[i]
+        if pressed:
+            self.midi.note_on(n, 127)
+        else:
+            self.midi.note_off(n, 0)
+        print("pad:%d: note:%d %s" % (i, n, "on" if pressed else "off"))
+
+    def gesture(self, i, kind, steps):
+        ccs = self.gesture_ccs[i] if i < len(self.gesture_ccs) else None
+        if not ccs:
+            return False
+        if kind == "rotate":
+            cc_num, steps = ccs[0], -steps  # slider CCs go up as positions go down
+        else:
+            cc_num = ccs[1]
+        self.midi.control_change(cc_num, 64 + steps)
+        print("gesture:%d: %s cc:%d steps:%d" % (i, kind, cc_num, steps))
+        return True
+
+    def flush(self):
+        self.cc_out.poll(self.controller.now)
+        return self.midi.flush()  # everything from this step in one USB write
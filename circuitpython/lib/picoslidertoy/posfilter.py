@@ -0,0 +1,177 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`posfilter`
+================================================================================
+
+Smoothing filters for slider positions, chained per slider with FilterChain.
+
+Filters work on fixed-point positions 0 to FIXED_ONE-1 like
+TouchWheel.pos_fixed() returns, using only integer math on state kept in
+the filter objects, so nothing is allocated per sample. On wheels the
+position wraps, so differences are taken the short way around the circle.
+A chain resets when the slider is released so a new touch starts fresh.
+Samples are timed by supervisor.ticks_ms() timestamps passed in with
+them, Controller takes one per step, untimed samples are taken as 1 ms
+apart.
+
+- EMAFilter: exponential moving average, cheap but lags on fast moves
+- MedianFilter: median of the last three samples, removes single spikes
+- OneEuroFilter: the "1 euro filter", a low-pass whose cutoff rises with
+  speed, so a held finger is smoothed hard and a fast swipe barely lags
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+from .touchslider import FIXED_ONE, FIXED_MASK, TICKS_MASK
+
+_FRAC = 6  # extra fractional bits in filter state
+_HALF = FIXED_ONE << (_FRAC - 1)
+_MASK = (FIXED_ONE << _FRAC) - 1
+_ALPHA_SHIFT = 12
+_SPEED_MAX = 1 << 15
+_DT_MAX = 100  # longest sample interval used, in milliseconds
+_TAU_K = 159_154_943  # 1e9 / 2pi, gives tau in microseconds from cutoff in millihertz
+
+def _diff(a, b, wrap):
+    """a - b, the short way around if positions wrap"""
+    d = a - b
+    if wrap:
+        d = ((d + _HALF) & _MASK) - _HALF
+    return d
+
+def _alpha(dt, cutoff_mhz):
+    """Low-pass smoothing factor for a sample interval and cutoff, scaled by 1 << _ALPHA_SHIFT"""
+    tau = _TAU_K // cutoff_mhz
+    return (dt << _ALPHA_SHIFT) // (dt + tau)
+
+def _scaled(d, alpha):
+    """d * alpha, rounded toward zero so small steps don't drift"""
+    if d < 0:
+        return -((-d * alpha) >> _ALPHA_SHIFT)
+    return (d * alpha) >> _ALPHA_SHIFT
+
+class EMAFilter():
+    """Exponential moving average, each sample moves the output 1/2**shift of the way"""
+    def __init__(self, shift=2):
+        self.shift = shift
+        self.wrap = False
+        self.y = -1
+
+    def reset(self):
+        self.y = -1
+
+    def update(self, x, t_ms=None):
+        x <<= _FRAC
+        if self.y < 0:
+            self.y = x
+        else:
+            self.y = (self.y + (_diff(x, self.y, self.wrap) >> self.shift)) & _MASK
+        return self.y >> _FRAC
+
+class MedianFilter():
+    """Median of the last three samples"""
+    def __init__(self):
+        self.wrap = False
+        self.n = 0
+        self.x1 = self.x2 = 0
+
+    def reset(self):
+        self.n = 0
+
+    def update(self, x, t_ms=None):
+        x1, x2 = self.x1, self.x2
+        self.x1, self.x2 = x, x1
+        if self.n < 2:
+            self.n += 1
+            return x
+        # compare older samples as offsets from the newest one
+        a = _diff(x1 << _FRAC, x << _FRAC, self.wrap) >> _FRAC
+        b = _diff(x2 << _FRAC, x << _FRAC, self.wrap) >> _FRAC
+        if a > b:
+            a, b = b, a
+        m = 0  # median of 0, a, b
+        if a >= 0:
+            m = a
+        elif b <= 0:
+            m = b
+        return (x + m) & FIXED_MASK
+
+class OneEuroFilter():
+    """
+    Low-pass filter whose cutoff frequency rises with speed.
+    See https://gery.casiez.net/1euro/
+    """
+    def __init__(self, min_cutoff=1.0, beta=50.0, d_cutoff=10.0):
+        """
+        min_cutoff: cutoff in Hz when still, lower is smoother but laggier
+        beta: cutoff added in Hz per slider length per second of speed,
+              higher means less lag when moving fast
+        d_cutoff: cutoff in Hz for smoothing the speed estimate
+        Put a MedianFilter first, or single-sample spikes read as speed.
+        """
+        self.min_cutoff = max(1, round(min_cutoff * 1000))  # millihertz
+        self.d_cutoff = max(1, round(d_cutoff * 1000))
+        # speed is kept in counts per 1024 us, turn that into millihertz of cutoff
+        self.beta = round(beta * 1_000_000_000 / (FIXED_ONE * 1024))
+        self.wrap = False
+        self.y = -1
+        self.speed = 0
+        self.last_t = None
+
+    def reset(self):
+        self.y = -1
+
+    def update(self, x, t_ms=None):
+        """
+        Filter position x, sampled at t_ms (supervisor.ticks_ms()), or
+        1 ms after the last sample if not given. Samples less than 1 ms
+        apart count as 1 ms.
+        """
+        x <<= _FRAC
+        if self.y < 0:
+            self.y, self.speed, self.last_t = x, 0, t_ms
+            return x >> _FRAC
+        if t_ms is None or self.last_t is None:
+            dt = 1
+        else:
+            dt = (t_ms - self.last_t) & TICKS_MASK
+            dt = 1 if dt < 1 else (_DT_MAX if dt > _DT_MAX else dt)
+        self.last_t = t_ms
+        dt *= 1000  # the math below is in microseconds
+        d = _diff(x, self.y, self.wrap)
+        # smoothed speed sets the cutoff
+        speed = (d << (10 - _FRAC)) // dt
+        speed = -_SPEED_MAX if speed < -_SPEED_MAX else (_SPEED_MAX if speed > _SPEED_MAX else speed)
+        self.speed += _scaled(speed - self.speed, _alpha(dt, self.d_cutoff))
+        cutoff = self.min_cutoff + self.beta * (self.speed if self.speed > 0 else -self.speed)
+        self.y = (self.y + _scaled(d, _alpha(dt, cutoff))) & _MASK
+        return self.y >> _FRAC
+
+class FilterChain():
+    """Run a slider position through filters in order, e.g. FilterChain(MedianFilter(), OneEuroFilter())"""
+    def __init__(self, *filters):
+        self.filters = filters
+        self.wrap = False
+
+    def set_wrap(self, wrap):
+        """Positions wrap around, for wheels. TouchWheel sets this itself"""
+        self.wrap = wrap
+        for f in self.filters:
+            f.wrap = wrap
+
+    def reset(self):
+        for f in self.filters:
+            f.reset()
+
+    def update(self, pos, t_ms=None):
+        """Filter pos sampled at t_ms, or reset and return None if pos is None (slider released)"""
+        if pos is None:
+            self.reset()
+            return None
+        for f in self.filters:
+            pos = f.update(pos, t_ms)
+        return pos
@@ -0,0 +1,111 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`profiles`
+================================================================================
+
+Switch a running picoslidertoy between several profiles, like MIDI,
+HID media keys and HID hotkeys, without copying files or rebooting.
+
+ProfileManager is a controller.Controller backend holding other backends.
+Every one of them is attached at startup, so their action tables are
+compiled and their icons made once, and switching is just changing which
+one gets the touches. Holding the switch pad ("*") moves to the next
+profile, a quick tap of it still goes to the active profile as a press
+and release. A row of boxes on the display shows the active profile.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+from .touchslider import TICKS_MASK
+
+class ProfileManager():
+    """Controller backend that passes touches to one of several profile backends"""
+    def __init__(self, profiles, switch_pad=-1, hold_time=0.5):
+        """
+        profiles: sequence of (name, backend)
+        switch_pad: index of pad to hold to switch profiles, default the last ("*")
+        hold_time: seconds the switch pad is held to switch
+        """
+        if not profiles:
+            raise ValueError("no profiles")
+        self.names = tuple(name for name, backend in profiles)
+        self.backends = tuple(backend for name, backend in profiles)
+        self.switch_pad = switch_pad
+        self.hold_ms = round(hold_time * 1000)
+        self.held_since = None
+        self.active = 0
+        self.backend = self.backends[0]
+        self.controller = None
+        self.display = None
+        self.switches = 0
+
+    def attach(self, controller):
+        self.controller = controller
+        if self.switch_pad < 0:
+            self.switch_pad += len(controller.pads)
+        # every profile is set up now, their icons are made as the display comes up
+        for backend in self.backends:
+            backend.attach(controller)
+            controller.preload_icons(backend.pad_icons, backend.slider_icons)
+        if controller.layout.get("profiles") and len(self.backends) > 1:
+            controller.add_widget(self._make_display)
+        self.select(0)
+
+    def _make_display(self):
+        from .slider_display import ProfileDisplay
+        x, y, box_w, box_h = self.controller.layout["profiles"]["display"]
+        self.display = ProfileDisplay(x, y, len(self.backends), box_w=box_w, box_h=box_h)
+        self.display.select(self.active)
+        return self.display
+
+    def select(self, n):
+        """Make profile n active, releasing anything held on the old one"""
+        n %= len(self.backends)
+        controller, old = self.controller, self.backend
+        if n != self.active:
+            pad_state = controller.pad_state
+            for i in range(len(pad_state)):
+                if pad_state[i] and i != self.switch_pad:
+                    old.pad(i, False)
+            for i in range(len(controller.sliders)):
+                old.slider(i, None)
+        self.active = n
+        self.backend = backend = self.backends[n]
+        controller.set_icons(backend.pad_icons, backend.slider_icons)
+        if self.display is not None:
+            self.display.select(n)
+        print("profile:%d: %s" % (n, self.names[n]))
+
+    def slider(self, i, pos):
+        return self.backend.slider(i, pos)
+
+    def gesture(self, i, kind, steps):
+        return self.backend.gesture(i, kind, steps)
+
+    def pad(self, i, pressed):
+        if i != self.switch_pad:
+            self.backend.pad(i, pressed)
+        elif pressed:
+            self.held_since = self.controller.now
+        elif self.held_since is not None:
+            # let go before hold_time, so it was a tap
+            self.held_since = None
+            self.backend.pad(i, True)
+            self.backend.pad(i, False)
+
+    def flush(self):
+        held = self.held_since
+        if held is not None and (self.controller.now - held) & TICKS_MASK >= self.hold_ms:
+            self.held_since = None  # its release is ignored
+            self.select(self.active + 1)
+            self.switches += 1
+        # all of them, so sends queued before a switch still go out
+        sent = False
+        for backend in self.backends:
+            if backend.flush():
+                sent = True
+        return sent
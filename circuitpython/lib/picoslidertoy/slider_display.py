@@ -0,0 +1,311 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`slider_display`
+================================================================================
+
+Create virtual displays for linear TouchSliders and rotary TouchWheels
+
+Widgets remember what they last drew and only touch displayio when the
+on-screen result changes, setting their `dirty` flag when they do.
+A RefreshScheduler then refreshes the display only when something is dirty.
+
+Widgets can show emoji icons. Given an IconAtlas, a sprite sheet made by
+tools/emoji_atlas.py, every widget draws its icon as a tile of that one
+shared bitmap, and changing icons just changes the tile. Icons not in the
+atlas, or all of them without one, are EmojiLabels from the
+adafruit_display_emoji_text library, only imported when first needed.
+Each widget keeps the labels it has made, so switching back to an icon it
+has shown before just puts that label back.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+Originally part of the 'touchwheels' project: https://github.com/todbot/touchwheels/
+2023 - @todbot / Tod Kurt
+
+"""
+
+import math
+import displayio
+import vectorio
+
+from .touchslider import TICKS_MASK
+
+def _emoji_label(text):
+    from adafruit_display_emoji_text import EmojiLabel
+    label = EmojiLabel(text, scale=1)
+    label.anchor_point = (0.5, 0.5)
+    return label
+
+def icon_key(text):
+    """Name of an icon in an IconAtlas, like its PNG's name: "⏏️" is "U+23CF" """
+    return "-".join("U+%X" % ord(c) for c in text if ord(c) != 0xFE0F)
+
+class IconAtlas():
+    """Icons as tiles of one 1-bit sprite sheet, see tools/emoji_atlas.py"""
+    def __init__(self, path="emoji_atlas"):
+        """path: the atlas files without .bmp or .txt, raises OSError or ValueError if they're bad"""
+        self.tiles = {}
+        self.by_text = {}
+        self.tile_w = self.tile_h = None
+        with open(path + ".txt") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                a, b = line.split()
+                if self.tile_w is None:
+                    self.tile_w, self.tile_h = int(a), int(b)
+                else:
+                    self.tiles[a] = int(b)
+        # pixels stay in flash, only the header and palette are in RAM
+        self.bitmap = displayio.OnDiskBitmap(path + ".bmp")
+        self.shader = self.bitmap.pixel_shader
+        self.shader.make_transparent(0)
+
+    def tile(self, text):
+        """Tile of icon text, 0 (blank) if it's not in the atlas"""
+        tile = self.by_text.get(text)
+        if tile is None:
+            tile = self.by_text[text] = self.tiles.get(icon_key(text), 0) if text else 0
+        return tile
+
+    def tilegrid(self, x, y):
+        """A one-tile TileGrid centered on x,y showing the blank tile"""
+        return displayio.TileGrid(self.bitmap, pixel_shader=self.shader,
+                                  tile_width=self.tile_w, tile_height=self.tile_h,
+                                  x=int(x - self.tile_w/2), y=int(y - self.tile_h/2))
+
+class _Icon():
+    """A widget's icon centered on x,y in group: an atlas tile, or an EmojiLabel"""
+    def __init__(self, group, x, y, atlas=None):
+        self.group, self.x, self.y = group, x, y
+        self.atlas = atlas
+        self.text = ""
+        self.label = None
+        self.labels = {}
+        self.tilegrid = None
+        if atlas:
+            self.tilegrid = atlas.tilegrid(x, y)
+            group.append(self.tilegrid)
+
+    def set(self, v):
+        """Show icon v, "" for none. Returns True if that changed anything"""
+        v = v or ""
+        if v == self.text:
+            return False
+        if self.label:
+            self.group.remove(self.label)
+            self.label = None
+        tile = self.atlas.tile(v) if self.atlas else 0
+        if self.tilegrid is not None and self.tilegrid[0] != tile:
+            self.tilegrid[0] = tile
+        if v and not tile:
+            self.label = self.preload(v)
+            self.group.append(self.label)
+        self.text = v
+        return True
+
+    def preload(self, v):
+        """Make the label for icon v now, if it needs one, so showing it later is quick"""
+        if not v or (self.atlas and self.atlas.tile(v)):
+            return None
+        label = self.labels.get(v)
+        if label is None:
+            label = self.labels[v] = _emoji_label(v)
+            label.anchored_position = (self.x, self.y)
+        return label
+
+def collect_dirty(widgets):
+    """Return how many widgets changed since the last call, and clear their dirty flags"""
+    n = 0
+    for w in widgets:
+        if w.dirty:
+            n += 1
+            w.dirty = False
+    return n
+
+class RefreshScheduler():
+    """Refresh a display at a target rate, and only when its widgets changed"""
+    def __init__(self, display, widgets, fps=20, defer_while_moving=False, max_defer=0.25):
+        """
+        fps: most refreshes per second
+        defer_while_moving: hold off refreshes while update(moving=True),
+                            so touch scanning and USB output go first
+        max_defer: longest time in seconds a refresh is held off while moving
+        """
+        display.auto_refresh = False
+        self.display, self.widgets = display, widgets
+        self.period = 1000 // fps  # in milliseconds, like the times update() is given
+        self.defer_while_moving = defer_while_moving
+        self.max_defer = int(max_defer * 1000)
+        self.pending = False
+        self.last = None
+        self.refreshes = 0
+
+    def update(self, t_ms, moving=False):
+        """
+        Call once per loop with supervisor.ticks_ms() (Controller's step time),
+        returns True if the display was refreshed
+        """
+        if collect_dirty(self.widgets):
+            self.pending = True
+        if not self.pending:
+            return False
+        since = self.period if self.last is None else (t_ms - self.last) & TICKS_MASK
+        if since < self.period:
+            return False
+        if moving and self.defer_while_moving and since < self.max_defer:
+            return False
+        self.display.refresh()
+        self.last = t_ms
+        self.pending = False
+        self.refreshes += 1
+        return True
+
+class FaderDisplay(displayio.Group):
+    """Display a simple virtual fader with virtual 'knob' indicating position """
+    def __init__(self, x,y, w,h, knob_w=10, atlas=None):
+        super().__init__(x=x,y=y,scale=1)
+        self.w, self.h, self.knob_w = w,h, knob_w
+        pW = displayio.Palette(1)
+        pB = displayio.Palette(1)
+        pW[0], pB[0] = 0xffffff, 0x000000
+        self.append(vectorio.Rectangle(pixel_shader=pW, width=1, height=h, x=w//2, y=0))
+        self.knob = displayio.Group()
+        knob_handle = vectorio.Rectangle(pixel_shader=pW, width=knob_w, height=knob_w, x=0, y=0)
+        knob_touch =  vectorio.Rectangle(pixel_shader=pB, width=knob_w-2, height=knob_w-2, x=1, y=1)
+        self.knob.append(knob_handle)
+        self.knob.append(knob_touch)
+        self.knob.y = h//2
+        self.append(self.knob)
+        self.knob_y = self.knob.y
+        self.touched = False
+        self.dirty = True
+        self.knob_icon = _Icon(self.knob, knob_w/2, 2, atlas)
+
+    def pos(self,v):
+        """Set position of virtual fader"""
+        y = int(v * (self.h-self.knob_w/2))
+        if y != self.knob_y:  # only when the knob moves a pixel
+            self.knob_y = self.knob.y = y
+            self.dirty = True
+    def touch(self,v):
+        """Set to indicate if fader is being curerently touched"""
+        if v != self.touched:
+            self.touched = self.knob[1].hidden = v
+            self.dirty = True
+
+    def icon(self,v):
+        """Show icon v on the knob, "" for none"""
+        if self.knob_icon.set(v):
+            self.dirty = True
+
+    def preload_icon(self,v):
+        """Make icon v now, so showing it later is quick"""
+        return self.knob_icon.preload(v)
+
+class WheelDisplay(displayio.Group):
+    """Simple round display with 'knob' indicating wheel position"""
+    def __init__(self, x,y, r, knob_w=8, phase_offset=0, atlas=None):
+        super().__init__(x=x,y=y,scale=1)
+        self.r = r
+        self.phase_offset = phase_offset
+        self.knob_w = knob_w
+        pW = displayio.Palette(1)
+        pB = displayio.Palette(1)
+        pW[0], pB[0] = 0xffffff, 0x000000
+        # the outer circle, with black covering up most to make a line
+        self.append(vectorio.Circle(pixel_shader=pW, radius=r, x=0, y=0))
+        self.append(vectorio.Circle(pixel_shader=pB, radius=r-1, x=0, y=0))
+        self.knob = displayio.Group()
+        knob_handle = vectorio.Circle(pixel_shader=pW, radius=knob_w//2, x=0, y=0)
+        knob_touch = vectorio.Circle(pixel_shader=pB, radius=knob_w//2-1, x=0, y=0)
+        self.knob.append(knob_handle)
+        self.knob.append(knob_touch)
+        self.append(self.knob)
+        self.last_v = None
+        self.knob_x = self.knob_y = None
+        self.touched = False
+        self.dirty = True
+        self.center_icon = _Icon(self, 0, -2, atlas)
+        self.pos(0)
+        
+    def pos(self,v):
+        if v == self.last_v:
+            return
+        self.last_v = v
+        v += 0.25 + self.phase_offset  # drawing is offset by 1/4 turn
+        x = int((self.r-self.knob_w/2) * math.sin(v*6.28))
+        y = int((self.r-self.knob_w/2) * math.cos(v*6.28))
+        if x != self.knob_x or y != self.knob_y:  # only when the knob moves a pixel
+            self.knob_x = self.knob.x = x
+            self.knob_y = self.knob.y = y
+            self.dirty = True
+        
+    def touch(self,v):
+        if v != self.touched:
+            self.touched = self.knob[1].hidden = v
+            self.dirty = True
+
+    def icon(self,v):
+        """Show icon v in the middle of the wheel, "" for none"""
+        if self.center_icon.set(v):
+            self.dirty = True
+
+    def preload_icon(self,v):
+        """Make icon v now, so showing it later is quick"""
+        return self.center_icon.preload(v)
+
+class PadsDisplay(displayio.Group):
+    """Simple list of on/off boxes representing touch pads"""
+    def __init__(self, x,y, n, pad_h=8, pad_w=8, atlas=None):
+        super().__init__(x=x,y=y,scale=1)
+        self.n = n
+        self.pad_h, self.pad_w = pad_h, pad_w
+        pW = displayio.Palette(1)
+        pB = displayio.Palette(1)
+        pW[0], pB[0] = 0xffffff, 0x000000
+        self.append(vectorio.Rectangle(pixel_shader=pW, width=(pad_w)*n+2, height=pad_h, x=0, y=0))
+        for i in range(n):
+            self.append(vectorio.Rectangle(pixel_shader=pB, width=pad_w-2, height=pad_h-2, x=2+i*pad_w, y=1))
+        self.states = [False] * n
+        self.dirty = True
+        # after the boxes, so self[i+1] is still pad i's box
+        self.icons = [_Icon(self, pad_w*(i+0.5), pad_h//2, atlas) for i in range(n)]
+
+    def set(self,i,v):
+        if v != self.states[i]:
+            self.states[i] = self[i+1].hidden = v
+            self.dirty = True
+
+    def icon(self,i,v):
+        """Show icon v on pad i, "" for none"""
+        if self.icons[i].set(v):
+            self.dirty = True
+
+    def preload_icon(self,i,v):
+        """Make icon v on pad i now, so showing it later is quick"""
+        return self.icons[i].preload(v)
+
+class ProfileDisplay(displayio.Group):
+    """Row of small boxes, one per profile, the active one filled in"""
+    def __init__(self, x,y, n, box_w=7, box_h=5):
+        super().__init__(x=x,y=y,scale=1)
+        pW = displayio.Palette(1)
+        pB = displayio.Palette(1)
+        pW[0], pB[0] = 0xffffff, 0x000000
+        for i in range(n):
+            self.append(vectorio.Rectangle(pixel_shader=pW, width=box_w-1, height=box_h, x=i*box_w, y=0))
+            self.append(vectorio.Rectangle(pixel_shader=pB, width=box_w-3, height=box_h-2, x=i*box_w+1, y=1))
+        self.active = 0
+        self[1].hidden = True
+        self.dirty = True
+
+    def select(self,i):
+        if i != self.active:
+            self[2*self.active+1].hidden = False
+            self[2*i+1].hidden = True
+            self.active = i
+            self.dirty = True
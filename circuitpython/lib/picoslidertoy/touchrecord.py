@@ -0,0 +1,134 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`touchrecord`
+================================================================================
+
+Record the raw values of a TouchScanner's pins to a compact binary file,
+and read them back, so real finger gestures can be replayed on a host.
+
+Format, all little-endian:
+  header: b"PSTR", version (uint8), number of pins n (uint8),
+          n pin names, each a length (uint8) and ASCII bytes,
+          then n touchio thresholds at the start of recording (uint16)
+  frames: timestamp in microseconds since recording started (uint32,
+          wraps after ~71 minutes), then n raw values (uint16)
+
+Frames are packed into a preallocated chunk and written a chunk at a time.
+To record over USB serial, enable `usb_cdc.data` in boot.py and capture it
+on the computer with e.g. `cat /dev/ttyACM1 > gesture.rec`. To record to
+flash, make CIRCUITPY writable in boot.py with `storage.remount("/", False)`.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import struct
+import time
+
+MAGIC = b"PSTR"
+VERSION = 1
+
+class TouchRecorder():
+    """Write frames of a TouchScanner's raw values to a stream"""
+    def __init__(self, scanner, stream, names=None, chunk_frames=32):
+        """
+        scanner: TouchScanner whose raw frame is recorded
+        stream: binary stream with write(), e.g. usb_cdc.data or open(path, "wb")
+        names: pin names for the header, defaults to str() of the scanner's pins
+        chunk_frames: frames buffered before a write()
+        """
+        self.scanner = scanner
+        self.stream = stream
+        n = len(scanner.raw)
+        if names is None:
+            names = [str(p) for p in scanner.pins]
+        if len(names) != n or n > 255:
+            raise ValueError("need one name per pin, and at most 255 pins")
+        self.frame_fmt = "<I%dH" % n
+        self.frame_size = struct.calcsize(self.frame_fmt)
+        self.chunk = bytearray(self.frame_size * chunk_frames)
+        self.n = 0  # bytes used in chunk
+        self.frames = 0
+        self.t0 = time.monotonic_ns()
+        header = bytearray(MAGIC)
+        header.append(VERSION)
+        header.append(n)
+        for name in names:
+            name = name.encode()
+            header.append(len(name))
+            header.extend(name)
+        header.extend(struct.pack("<%dH" % n, *scanner.thresholds))
+        stream.write(header)
+
+    def record(self):
+        """Add the scanner's current frame, call after each scan()"""
+        t = ((time.monotonic_ns() - self.t0) // 1000) & 0xffffffff
+        struct.pack_into(self.frame_fmt, self.chunk, self.n, t, *self.scanner.raw)
+        self.n += self.frame_size
+        self.frames += 1
+        if self.n == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        """Write out buffered frames"""
+        if self.n:
+            self.stream.write(memoryview(self.chunk)[:self.n])
+            self.n = 0
+        if hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+class TouchPlayback():
+    """Read back a recording made by TouchRecorder"""
+    def __init__(self, stream):
+        """stream: binary stream with read(), positioned at the header"""
+        self.stream = stream
+        head = stream.read(6)
+        if len(head) < 6 or head[:4] != MAGIC:
+            raise ValueError("not a touch recording")
+        if head[4] != VERSION:
+            raise ValueError("unsupported touch recording version %d" % head[4])
+        n = head[5]
+        self.names = []
+        for _ in range(n):
+            size = stream.read(1)[0]
+            self.names.append(stream.read(size).decode())
+        self.thresholds = struct.unpack("<%dH" % n, stream.read(2 * n))
+        self.frame_fmt = "<I%dH" % n
+        self.frame_size = struct.calcsize(self.frame_fmt)
+        self.buf = bytearray(self.frame_size)
+
+    def apply_thresholds(self, scanner):
+        """Give scanner's pins the thresholds they had when recording started"""
+        for i, t in enumerate(self.thresholds):
+            scanner.thresholds[i] = t
+            scanner.touchins[i].threshold = t
+        scanner.generation += 1
+
+    def read_into(self, raw):
+        """
+        Read the next frame's raw values into raw (e.g. a TouchScanner's raw
+        array), returns its timestamp in microseconds, or None at the end
+        """
+        if self.stream.readinto(self.buf) != self.frame_size:
+            return None
+        vals = struct.unpack_from(self.frame_fmt, self.buf)
+        for i in range(len(vals) - 1):
+            raw[i] = vals[i+1]
+        return vals[0]
+
+    def traces(self):
+        """Read all remaining frames, returns (timestamps, {name: [raw values]})"""
+        times = []
+        columns = [[] for _ in self.names]
+        while True:
+            data = self.stream.read(self.frame_size)
+            if len(data) != self.frame_size:
+                break
+            vals = struct.unpack_from(self.frame_fmt, data)
+            times.append(vals[0])
+            for col, v in zip(columns, vals[1:]):
+                col.append(v)
+        return times, dict(zip(self.names, columns))
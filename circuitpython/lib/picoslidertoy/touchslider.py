@@ -0,0 +1,598 @@
+## pylint: disable=invalid-name
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`touchslider`
+================================================================================
+
+Create linear (TouchSlider) and rotary (TouchWheel) capacative touch sliders
+ using three (or more) `touchio` pins and special pad geometry. Position is
+ interpolated between the two neighbouring pads touched the most.
+
+All pins can be owned by a single TouchScanner so the whole touch surface
+is read in one pass per loop into a shared frame buffer.
+
+Positions can be smoothed by giving a slider a posfilter.FilterChain, and
+turned into relative steps, like a rotary encoder, with RelativeEncoder.
+Two fingers at once are noticed, and TwoFingerGesture turns them moving
+together or apart into rotate and pinch steps.
+
+Originally part of the 'touchwheels' project: https://github.com/todbot/touchwheels/
+2023 - @todbot / Tod Kurt
+
+"""
+
+import array
+import math
+import touchio
+
+# fixed-point positions from pos_fixed() are 0 to FIXED_ONE-1
+FIXED_SHIFT = 12
+FIXED_ONE = 1 << FIXED_SHIFT
+FIXED_MASK = FIXED_ONE - 1
+FIXED_TOLERANCE = 4
+# timestamps for filters are supervisor.ticks_ms(), which wraps at 2**29
+TICKS_MASK = (1 << 29) - 1
+# linearization tables have 2**LINEAR_BITS segments, see linearize.py
+LINEAR_BITS = 6
+# per-pad touch amounts use more bits, and are clamped to keep all math in
+# small ints (30 bits on the RP2040) so nothing gets heap-allocated
+_PCT_SHIFT = 16
+_PCT_MAX = 1 << 17
+_DELTA_MAX = (1 << 13) - 1
+_RECIP_SHIFT = 8  # extra bits in fixed-point reciprocals, ok for thresholds > 256
+_LINEAR_MASK = (1 << (FIXED_SHIFT - LINEAR_BITS)) - 1
+_CENTROID_SHIFT = 5  # bits dropped from centroid weights, for wheels of up to 8 pads
+_SPREAD_SHIFT = 9  # bits dropped from two-finger weights, for up to 8 pads
+_V_MAX = 1 << 20  # RelativeEncoder speed limit, keeps its math in small ints
+
+class TouchScanner():
+    """Owns a set of touchio pins and reads them all into one shared frame"""
+    def __init__(self, pins=()):
+        self.pins = []
+        self.touchins = []
+        self.raw = array.array('H')         # frame buffer, one raw_value per pin
+        self.thresholds = array.array('H')  # touchio threshold per pin
+        self.generation = 0  # bumped whenever thresholds are changed for us
+        if pins:
+            self.add(pins)
+
+    def add(self, pins):
+        """Add pins to the scanner, returns index of the first one in the frame"""
+        start = len(self.touchins)
+        for p in pins:
+            touchin = touchio.TouchIn(p)
+            self.pins.append(p)
+            self.touchins.append(touchin)
+            self.raw.append(touchin.raw_value)
+            self.thresholds.append(touchin.threshold)
+        return start
+
+    def scan(self):
+        """Read the raw_value of every pin into the frame buffer"""
+        raw = self.raw
+        i = 0
+        for touchin in self.touchins:
+            raw[i] = touchin.raw_value
+            i += 1
+
+    def value(self, i):
+        """Touched state of pin i in the current frame, like TouchIn.value"""
+        return self.raw[i] > self.thresholds[i]
+
+class TouchWheel():
+    """Capacitive touchwheel made from three or more captouch pads around a circle"""
+    #def __init__(self, touch_pins, offset = -0.333 * (3/4), sector_scale=0.333, wrap_value=True):
+    def __init__(self, touch_pins, offset = 0, sector_scale=None, wrap_value=True,
+                 scanner=None, filter=None, estimator="pair", noise_floor=0.05,
+                 finger_pads=2):
+        # sector_scale: part of the 0-1 range from one pad's center to the next,
+        # by default 1/n for a wheel of n pads and 1/(n-1) for a slider
+        # without a shared scanner, the wheel scans its own pins in pos()
+        # filter: optional posfilter.FilterChain to smooth positions with
+        # estimator: "pair" interpolates between the two strongest neighbouring
+        #   pads, "centroid" makes pos_fixed() use centroid_fixed() instead
+        # noise_floor: for the centroid, how far below its threshold (as a
+        #   fraction of it) a pad's signal starts to count
+        # finger_pads: most pads one finger touches at once, more touched
+        #   than this, but not all of them, is taken as two fingers, see pos_fixed()
+        n = len(touch_pins)
+        if n < (3 if wrap_value else 2):
+            raise ValueError("a wheel needs 3 or more pins, a slider 2 or more")
+        if estimator == "centroid":
+            self.pos_fixed = self.centroid_fixed
+        elif estimator != "pair":
+            raise ValueError("estimator must be 'pair' or 'centroid'")
+        if sector_scale is None:
+            sector_scale = 1 / (n if wrap_value else n - 1)
+        self.autoscan = scanner is None
+        self.scanner = TouchScanner() if scanner is None else scanner
+        self.start = self.scanner.add(touch_pins)
+        self.touchins = self.scanner.touchins[self.start:self.start+n]
+        self.offset = offset  # physical design is rotated anti-clockwise
+        self.scale = sector_scale
+        self.wrap_value = wrap_value
+        self.filter = filter
+        if filter is not None:
+            filter.set_wrap(wrap_value)
+        self.scale_fixed = round(sector_scale * FIXED_ONE)
+        self.offset_fixed = round(offset * FIXED_ONE)
+        self.gains = [1.0] * n  # per-pad gain trims
+        self.pct = array.array('l', [0] * n)  # how much each pad is touched, from pos_fixed()
+        self.floor_fixed = round(noise_floor * (1 << _PCT_SHIFT))
+        self.strength = 0  # how firmly the last position was touched, see pos_fixed()
+        self.touches = 0  # 0, 1 or 2 (two or more fingers), see pos_fixed()
+        self.center = self.spread = 0  # where two fingers are, see two_fingers()
+        self.finger_pads = finger_pads
+        if wrap_value:  # each pad's direction, for two_fingers()
+            self._cos = [math.cos(2 * math.pi * j / n) for j in range(n)]
+            self._sin = [math.sin(2 * math.pi * j / n) for j in range(n)]
+        self.linear = None  # linearization table, see linearize.py
+        self.recalibrate()
+
+    def recalibrate(self, thresholds=None):
+        """
+        Rebuild the per-pad normalization cache, optionally setting new
+        thresholds first. Otherwise thresholds are re-read from the TouchIns.
+        Call after changing thresholds or gains. This happens automatically
+        when something like a BaselineTracker bumps the scanner's generation.
+        """
+        scanner = self.scanner
+        self.generation = scanner.generation
+        for j, touchin in enumerate(self.touchins):
+            if thresholds is not None:
+                touchin.threshold = thresholds[j]
+            scanner.thresholds[self.start+j] = touchin.threshold
+        # baseline is where a pad starts to count as touched, scale turns the
+        # amount above baseline into a trimmed fraction of it
+        self.norm_base = [scanner.thresholds[self.start+j] for j in range(len(self.touchins))]
+        self.norm_scale = [g / t for g, t in zip(self.gains, self.norm_base)]
+        self.norm_scale_fixed = [round(g * (1 << (_PCT_SHIFT + _RECIP_SHIFT)) / t)
+                                 for g, t in zip(self.gains, self.norm_base)]
+
+    def pos(self, t_ms=None):
+        """
+        Given the touchio.TouchIn pads, compute wheel position 0-1
+        or return None if wheel is not pressed.
+        If using a shared TouchScanner, call its scan() first.
+        t_ms: when the pads were scanned, supervisor.ticks_ms(), for the filter
+        """
+        scanner = self.scanner
+        if self.autoscan:
+            scanner.scan()
+        if self.generation != scanner.generation:
+            self.recalibrate()
+        raw, i = scanner.raw, self.start
+        base, scale = self.norm_base, self.norm_scale
+
+        # one pass over the pads: how much each is touched, the strongest
+        # pair of neighbours both touched, and the strongest single pad
+        first = prev = (raw[i] - base[0]) * scale[0]
+        pad, pad_max = (0, first) if first > 0 else (-1, 0.0)
+        pair, pair_sum, pair_b = -1, -1.0, 0.0
+        for j in range(1, len(base)):
+            pct = (raw[i+j] - base[j]) * scale[j]
+            if pct >= 0:
+                if prev >= 0 and prev + pct > pair_sum:
+                    pair, pair_sum, pair_b = j - 1, prev + pct, pct
+                if pct > pad_max:
+                    pad, pad_max = j, pct
+            prev = pct
+        # on a wheel the last pad's neighbour is the first
+        if self.wrap_value and prev >= 0 and first >= 0 and prev + first > pair_sum:
+            pair, pair_sum, pair_b = len(base) - 1, prev + first, first
+
+        if pair >= 0:  # finger touching two pads
+            pos = self.scale * (pair + (pair_b / pair_sum if pair_sum else 0))
+        elif pad >= 0:  # finger just on a single pad
+            pos = self.scale * pad
+        else:
+            if self.filter is not None:
+                self.filter.reset()
+            return None
+
+        if self.wrap_value:
+            # wrap pos around the 0-1 circle if offset puts it outside that range
+            pos = (pos + self.offset) % 1
+        else:
+            pos = min(max(pos + self.offset, 0), 1)
+        if self.linear is not None:
+            pos = self.linearize(min(int(pos * FIXED_ONE), FIXED_MASK)) / FIXED_ONE
+        if self.filter is not None:
+            pos = self.filter.update(min(int(pos * FIXED_ONE), FIXED_MASK), t_ms) / FIXED_ONE
+        return pos
+
+    def pos_fixed(self, t_ms=None):
+        """
+        Like pos() but using only integer math, so nothing is allocated per call.
+        Returns wheel position 0 to FIXED_ONE-1 or None if wheel is not pressed.
+        Agrees with pos() * FIXED_ONE to within FIXED_TOLERANCE counts (0.1%),
+        the worst case being light touches only a count or two over threshold.
+        Sets self.strength to the touch signal the position came from, with
+        FIXED_ONE being as much again as a pad's threshold, 0 when not pressed.
+        Sets self.touches to 2 when more than one finger is on the slider:
+        touched pads with an untouched one between them, or more pads touched
+        than one finger can (finger_pads) with one still untouched, as a firm
+        finger pressed flat can cover all of a small slider or wheel. So a
+        3-pad wheel never sees two fingers. The position is then of the
+        strongest of them, and self.center and self.spread say where the
+        fingers are, see two_fingers().
+        t_ms: when the pads were scanned, supervisor.ticks_ms(), for the filter
+        """
+        scanner = self.scanner
+        if self.autoscan:
+            scanner.scan()
+        if self.generation != scanner.generation:
+            self.recalibrate()
+        raw, i = scanner.raw, self.start
+        base, scale, pct = self.norm_base, self.norm_scale_fixed, self.pct
+
+        # one pass over the pads: how much each is touched, scaled by
+        # 1 << _PCT_SHIFT, the strongest pair of neighbours both touched,
+        # the strongest single pad, and how many runs of touched pads
+        pair, pair_sum, pad, pad_max = -1, -1, -1, 0
+        prev = -1
+        runs = touched = 0
+        for j in range(len(pct)):
+            d = raw[i+j] - base[j]
+            v = ((d if d < _DELTA_MAX else _DELTA_MAX) * scale[j]) >> _RECIP_SHIFT
+            if v > _PCT_MAX:
+                v = _PCT_MAX
+            pct[j] = v
+            if v >= 0:
+                touched += 1
+                if prev >= 0:
+                    if prev + v > pair_sum:
+                        pair, pair_sum = j - 1, prev + v
+                else:
+                    runs += 1
+                if v > pad_max:
+                    pad, pad_max = j, v
+            prev = v
+        # on a wheel the last pad's neighbour is the first
+        last = len(pct) - 1
+        if self.wrap_value and prev >= 0 and pct[0] >= 0:
+            runs -= runs > 1
+            if prev + pct[0] > pair_sum:
+                pair, pair_sum = last, prev + pct[0]
+        self._count_touches(runs, touched)
+
+        if pair >= 0:  # finger touching two pads
+            b = pct[pair + 1] if pair < last else pct[0]
+            pos = (pair << FIXED_SHIFT) + ((b << FIXED_SHIFT) // pair_sum if pair_sum else 0)
+            self.strength = pair_sum >> (_PCT_SHIFT - FIXED_SHIFT)
+        elif pad >= 0:  # finger just on a single pad
+            pos = pad << FIXED_SHIFT
+            self.strength = pad_max >> (_PCT_SHIFT - FIXED_SHIFT)
+        else:
+            self.strength = 0
+            if self.filter is not None:
+                self.filter.reset()
+            return None
+        return self._finish(pos, t_ms)
+
+    def centroid_fixed(self, t_ms=None):
+        """
+        Like pos_fixed() but estimating position as the weighted centroid of
+        all the pads' signals above the noise floor, taken around the most
+        touched pad so it works across a wheel's seam. Fingers between pads
+        or on one pad with weak neighbours move smoothly instead of snapping
+        to pad centers. Sets self.strength to the sum of those signals, and
+        self.touches like pos_fixed().
+        """
+        scanner = self.scanner
+        if self.autoscan:
+            scanner.scan()
+        if self.generation != scanner.generation:
+            self.recalibrate()
+        raw, i = scanner.raw, self.start
+        base, scale, pct = self.norm_base, self.norm_scale_fixed, self.pct
+
+        # how much each pad is touched, the most touched pad, and how many
+        # runs of touched pads
+        peak, peak_v = -1, 0
+        prev = -1
+        runs = touched = 0
+        for j in range(len(pct)):
+            d = raw[i+j] - base[j]
+            v = ((d if d < _DELTA_MAX else _DELTA_MAX) * scale[j]) >> _RECIP_SHIFT
+            if v > _PCT_MAX:
+                v = _PCT_MAX
+            pct[j] = v
+            if v >= 0:
+                touched += 1
+                if prev < 0:
+                    runs += 1
+            if v > peak_v:
+                peak, peak_v = j, v
+            prev = v
+        if self.wrap_value and prev >= 0 and pct[0] >= 0:
+            runs -= runs > 1
+        self._count_touches(runs, touched)
+        if peak < 0:
+            self.strength = 0
+            if self.filter is not None:
+                self.filter.reset()
+            return None
+
+        # centroid of pad numbers counted from the peak, on a wheel the short
+        # way around, weights in fewer bits so sum * FIXED_ONE stays a small int
+        n, floor, wrap = len(pct), self.floor_fixed, self.wrap_value
+        total = moment = 0
+        for j in range(n):
+            w = (pct[j] + floor) >> _CENTROID_SHIFT
+            if w > 0:
+                k = j - peak
+                if wrap:
+                    if k > n // 2:
+                        k -= n
+                    elif k < -(n // 2):
+                        k += n
+                total += w
+                moment += w * k
+        self.strength = total << (_CENTROID_SHIFT - (_PCT_SHIFT - FIXED_SHIFT))
+        return self._finish((peak << FIXED_SHIFT) + ((moment << FIXED_SHIFT) // total if total else 0),
+                            t_ms)
+
+    def _count_touches(self, runs, touched):
+        """Set self.touches from the runs of touched pads and how many were touched"""
+        if runs > 1 or self.finger_pads < touched < len(self.pct):
+            self.touches = 2
+            self.two_fingers()
+        else:
+            self.touches = 1 if touched else 0
+
+    def two_fingers(self):
+        """
+        Where two fingers are, from the pad signals of the last pos_fixed():
+        sets self.center to the middle of all the touched pads' signal (0 to
+        FIXED_ONE-1, like positions but not linearized or filtered) and
+        self.spread to how far apart the fingers are, in the same units.
+        On a wheel these come from the signal's circular mean, so they don't
+        jump as the most touched pad changes, center is on the shorter way
+        between the fingers, and spread also includes the fingers' own width.
+        Floats are used, but only while two fingers are down.
+        """
+        pct, n = self.pct, len(self.pct)
+        if self.wrap_value:
+            x = y = total = 0
+            for j in range(n):
+                if pct[j] >= 0:
+                    x += pct[j] * self._cos[j]
+                    y += pct[j] * self._sin[j]
+                    total += pct[j]
+            if not total:
+                return
+            turn = math.atan2(y, x) / (2 * math.pi)
+            r = math.sqrt(x * x + y * y) / total
+            spread = math.acos(r if r < 1 else 1) / math.pi
+            self.center = ((int(turn * n * FIXED_ONE) * self.scale_fixed) >> FIXED_SHIFT) + self.offset_fixed
+            self.center &= FIXED_MASK
+            self.spread = (int(spread * n * FIXED_ONE) * self.scale_fixed) >> FIXED_SHIFT
+            return
+        # on a slider, the mean and twice the mean distance from it
+        total = moment = 0
+        for j in range(n):
+            if pct[j] >= 0:
+                w = (pct[j] >> _SPREAD_SHIFT) + 1
+                total += w
+                moment += w * j
+        if not total:
+            return
+        mean = (moment << FIXED_SHIFT) // total  # in pads, scaled by FIXED_ONE
+        dev = 0
+        for j in range(n):
+            if pct[j] >= 0:
+                d = (j << FIXED_SHIFT) - mean
+                dev += ((pct[j] >> _SPREAD_SHIFT) + 1) * (d if d > 0 else -d)
+        self.spread = ((dev // total) * 2 * self.scale_fixed) >> FIXED_SHIFT
+        pos = ((mean * self.scale_fixed) >> FIXED_SHIFT) + self.offset_fixed
+        self.center = 0 if pos < 0 else (FIXED_MASK if pos > FIXED_MASK else pos)
+
+    def _finish(self, pos, t_ms):
+        """pos in sectors, scaled by FIXED_ONE, to 0 to FIXED_ONE-1, filtered as sampled at t_ms"""
+        # scale sectors down to 0-1, then wrap around if offset puts it outside
+        # that, or on a slider stop at the ends
+        pos = ((pos * self.scale_fixed) >> FIXED_SHIFT) + self.offset_fixed
+        if self.wrap_value:
+            pos &= FIXED_MASK
+        elif pos < 0:
+            pos = 0
+        elif pos > FIXED_MASK:
+            pos = FIXED_MASK
+        if self.linear is not None:
+            pos = self.linearize(pos)
+        if self.filter is not None:
+            pos = self.filter.update(pos, t_ms)
+        return pos
+
+    def linearize(self, pos):
+        """Look pos (0 to FIXED_ONE-1) up in the linearization table, interpolating"""
+        table = self.linear
+        j = pos >> (FIXED_SHIFT - LINEAR_BITS)
+        a = table[j]
+        # a wheel's table can go on past FIXED_ONE, round again
+        return (a + (((table[j+1] - a) * (pos & _LINEAR_MASK)) >> (FIXED_SHIFT - LINEAR_BITS))) & FIXED_MASK
+
+class TouchSlider(TouchWheel):
+    """A TouchSlider is a linearized TouchWheel """
+    def __init__(self, touch_pins, offset=0, sector_scale=None, wrap_value=False,
+                 scanner=None, filter=None, estimator="pair", noise_floor=0.05, finger_pads=2):
+        super().__init__(touch_pins, offset, sector_scale, wrap_value, scanner, filter,
+                         estimator, noise_floor, finger_pads)
+
+class RelativeEncoder():
+    """
+    Turn a slider's pos_fixed() positions into relative steps, like a rotary
+    encoder. Movement is accumulated so fractions of a step are never lost,
+    on wheels it's taken the short way around the circle so crossing the
+    seam is just more movement, and fast moves can be accelerated.
+    """
+    def __init__(self, steps=16, wrap=True, accel=0, accel_speed=1.0, max_gain=4,
+                 max_steps=4):
+        """
+        steps: steps per full turn of a wheel or length of a slider
+        wrap: positions wrap around, True for wheels
+        accel: extra gain per multiple of accel_speed the finger moves over it,
+               0 for no acceleration. Like a mouse's, a move there and back
+               only cancels out if both ways are made at the same speed
+        accel_speed: speed in turns (or lengths) per second where accel starts
+        max_gain: most steps per distance acceleration gives, times normal
+        max_steps: most steps update() returns at once, the rest come later
+        """
+        self.steps = steps
+        self.wrap = wrap
+        self.accel = round(accel * 256)
+        # speeds are kept in counts per 1024 us, scaled by 16
+        self.accel_speed = max(1, round(accel_speed * FIXED_ONE * 1.024e-3 * 16))
+        self.max_gain = max_gain * 256
+        self.max_steps = max_steps
+        self.last_pos = -1
+        self.last_t = None
+        self.speed = 0
+        self.acc = 0  # movement not yet turned into steps, in counts * steps
+
+    def reset(self):
+        """Forget the last position, e.g. when the finger lifts. Pending steps are kept"""
+        self.last_pos = -1
+        self.speed = 0
+        # drop the fraction of a step, a new touch starts from zero
+        acc = self.acc
+        whole = acc >> FIXED_SHIFT if acc >= 0 else -((-acc) >> FIXED_SHIFT)
+        self.acc = whole << FIXED_SHIFT
+
+    def update(self, pos, t_ms=None):
+        """
+        Add slider position pos (0 to FIXED_ONE-1, or None when not touched)
+        sampled at t_ms (supervisor.ticks_ms()), or 1 ms after the last
+        position if not given. Returns the number of steps moved, positive
+        when pos increases.
+        """
+        if pos is None:
+            if self.last_pos >= 0:
+                self.reset()
+        else:
+            if self.last_pos >= 0:
+                d = pos - self.last_pos
+                if self.wrap:
+                    d = ((d + FIXED_ONE // 2) & FIXED_MASK) - FIXED_ONE // 2
+                if t_ms is None or self.last_t is None:
+                    dt = 1000
+                else:
+                    # in microseconds, positions less than 1 ms apart count as 1 ms
+                    dt = (t_ms - self.last_t) & TICKS_MASK
+                    dt = 1000 if dt < 1 else (100_000 if dt > 100 else dt * 1000)
+                # velocity averaged over about 50 ms, so noise doesn't read as speed
+                v = (d << 14) // dt
+                v = -_V_MAX if v < -_V_MAX else (_V_MAX if v > _V_MAX else v)
+                self.speed += ((v - self.speed) * ((dt << 8) // (dt + 50_000))) >> 8
+                gain = 256
+                over = (self.speed if self.speed > 0 else -self.speed) - self.accel_speed
+                if self.accel and over > 0:
+                    if over > self.accel_speed * 16:
+                        over = self.accel_speed * 16
+                    gain += self.accel * over // self.accel_speed
+                    if gain > self.max_gain:
+                        gain = self.max_gain
+                self.acc += (d * self.steps * gain) >> 8
+            self.last_pos = pos
+            self.last_t = t_ms
+        # whole steps, rounded toward zero so the remainder keeps its sign
+        acc = self.acc
+        n = acc >> FIXED_SHIFT if acc >= 0 else -((-acc) >> FIXED_SHIFT)
+        if n > self.max_steps:
+            n = self.max_steps
+        elif n < -self.max_steps:
+            n = -self.max_steps
+        self.acc = acc - (n << FIXED_SHIFT)
+        return n
+
+class TwoFingerGesture():
+    """
+    Turn two fingers on a slider into rotate or pinch steps, from the
+    center and spread its pos_fixed() sets when its touches is 2. They're
+    smoothed first, two fingers far apart on a wheel give a jittery center.
+    Whichever of the two moves past `lock` first is the gesture until a
+    finger lifts, so turning doesn't also pinch. Like RelativeEncoder,
+    fractions of a step are kept for later.
+    """
+    ROTATE = "rotate"
+    PINCH = "pinch"
+
+    def __init__(self, rotate_steps=16, pinch_steps=64, wrap=True, lock=FIXED_ONE // 16,
+                 settle=3, smooth=3, max_steps=4):
+        """
+        rotate_steps: steps per full turn (or length) the fingers move together
+        pinch_steps: steps per FIXED_ONE change of spread, more when apart
+        wrap: positions wrap around, True for wheels
+        lock: how far center or spread moves before the gesture is decided
+        settle: updates ignored after the second finger lands, while it presses in
+        smooth: center and spread move 1/2**smooth of the way to each new one
+        max_steps: most steps update() returns at once, the rest come later
+        """
+        self.rotate_steps, self.pinch_steps = rotate_steps, pinch_steps
+        self.wrap = wrap
+        self.lock = lock
+        self.settle = settle
+        self.smooth = smooth
+        self.max_steps = max_steps
+        self.frames = 0  # updates since two fingers landed, 0 for none
+        self.kind = None  # ROTATE or PINCH once decided
+        self.last_center = self.last_spread = 0
+        self.moved_center = self.moved_spread = 0
+        self.acc = 0
+
+    def reset(self):
+        """Two fingers no longer down, the next update() starts a new gesture"""
+        self.frames = 0
+        self.kind = None
+        self.acc = 0
+
+    def update(self, center, spread):
+        """
+        Add a two-finger center and spread, returns the steps moved by the
+        gesture in self.kind, positive for increasing positions or apart.
+        """
+        self.frames += 1
+        if self.frames <= self.settle:
+            self.last_center, self.last_spread = center, spread
+            self.moved_center = self.moved_spread = 0
+            return 0
+        dc = center - self.last_center
+        if self.wrap:
+            dc = ((dc + FIXED_ONE // 2) & FIXED_MASK) - FIXED_ONE // 2
+        # rounded toward zero, so jitter doesn't creep in one direction
+        dc = dc >> self.smooth if dc >= 0 else -((-dc) >> self.smooth)
+        ds = spread - self.last_spread
+        ds = ds >> self.smooth if ds >= 0 else -((-ds) >> self.smooth)
+        self.last_center += dc
+        if self.wrap:
+            self.last_center &= FIXED_MASK
+        self.last_spread += ds
+        kind = self.kind
+        if kind is None:
+            self.moved_center += dc
+            self.moved_spread += ds
+            mc, ms = abs(self.moved_center), abs(self.moved_spread)
+            if mc < self.lock and ms < self.lock:
+                return 0
+            # count the movement that decided it too
+            if mc >= ms:
+                self.kind = kind = self.ROTATE
+                dc = self.moved_center
+            else:
+                self.kind = kind = self.PINCH
+                ds = self.moved_spread
+        if kind is self.ROTATE:
+            self.acc += dc * self.rotate_steps
+        else:
+            self.acc += ds * self.pinch_steps
+        # whole steps, rounded toward zero so the remainder keeps its sign
+        acc = self.acc
+        n = acc >> FIXED_SHIFT if acc >= 0 else -((-acc) >> FIXED_SHIFT)
+        if n > self.max_steps:
+            n = self.max_steps
+        elif n < -self.max_steps:
+            n = -self.max_steps
+        self.acc = acc - (n << FIXED_SHIFT)
+        return n
@@ -11,5 +11,11 @@ usb_midi.set_names(streaming_interface_name="picoslidertoy",
 
 print("set usb and midi ident to 'picoslidertoy'")
 
+# to record touch data with touchrecord.py, uncomment one of these:
+# over serial, on a second usb_cdc port next to the REPL
+#import usb_cdc; usb_cdc.enable(console=True, data=True)
+# to flash, CIRCUITPY becomes read-only to the computer until this is removed
+#import storage; storage.remount("/", readonly=False)
+
 # paste this lines into the REPL (without the '#') to put the board into UF2 bootloader mode
 # import microcontroller; microcontroller.on_next_reset(microcontroller.RunMode.BOOTLOADER); microcontroller.reset()
@@ -9,109 +9,58 @@
 # To use:
 #
 # 1. Install needed libraries:
-#   circup install adafruit_displayio_ssd1306 adafruit_midi
-# 2. Copy over files in this directory to CIRCUITPY:
+#   circup install adafruit_displayio_ssd1306
+# 2. Copy the picoslidertoy library and the files in this directory to CIRCUITPY:
+#   cp -r circuitpython/lib/picoslidertoy /Volumes/CIRCUITPY/lib/
 #   cp circuitpython/midi_sliders/* /Volumes/CIRCUITPY/
 #
 
-import time
-import board
-import touchio
-import busio
-import displayio
-import adafruit_displayio_ssd1306
+# timed from here, so make it before the other imports
+from picoslidertoy.boottime import BootTimer
+boot_timer = BootTimer()
+
 import usb_midi
-import adafruit_midi
-from adafruit_midi.control_change import ControlChange
-from adafruit_midi.note_on import NoteOn
-from adafruit_midi.note_off import NoteOff
 
-from touchslider import TouchWheel, TouchSlider
-from slider_display import FaderDisplay, WheelDisplay, PadsDisplay
+from picoslidertoy.controller import Controller
+from picoslidertoy.layout import LAYOUT
+from picoslidertoy.midi_out import MidiBackend, CC14, NRPN
 
 # midi cc and note definitions
+# a slider's entry can also be (cc_num, CC14) for a 14-bit CC on cc_num
+# and cc_num+32, e.g. (1, CC14), or (nrpn_num, NRPN) for a 14-bit NRPN
 midi_ccs = [ 73, 1, 72, 74, 71 ]
-midi_notes = [ 34, 35, 36, 37,  38, 39, 40, 41,  24 ]  # FIXME
 midi_chan = 1
+midi_cc_min_interval = 0  # seconds between messages on a CC, 0 for no limit
+# two fingers on a slider send relative CCs, (turn cc_num, pinch cc_num) or None,
+# needs wheels of 4 or more pads, the board's 3-pad wheels can't tell two fingers
+# from one (see README), e.g. [ None, None, None, (20, 21), (22, 23) ]
+midi_gesture_ccs = [ None, None, None, None, None ]
 base_note = 36
 scale_mixolydian   = (0, 2, 4, 5, 7, 9, 10, 12, 14, 16)
 scale_minor        = (0, 2, 3, 5, 7, 8, 10, 12, 14, 15)
 scale_major        = (0, 2, 4, 5, 7, 9, 11, 12, 14, 16)
-scale_fifths       = (0, 5, 7, 12, 17,19,24,29,31,36,41,43) 
+scale_fifths       = (0, 5, 7, 12, 17,19,24,29,31,36,41,43)
 scale = scale_fifths
+midi_notes = [ base_note + n for n in scale ]
 
-# pin definitions
-faderA_pins = (board.GP4, board.GP0, board.GP28)
-faderB_pins = (board.GP5, board.GP1, board.GP27)
-faderC_pins = (board.GP3, board.GP2, board.GP26)
-wheelX_pins = (board.GP7, board.GP8, board.GP9)
-wheelY_pins = (board.GP10, board.GP11, board.GP12)
-pad_pins = (board.GP22, board.GP21, board.GP20, board.GP19,
-            board.GP18, board.GP17, board.GP16, board.GP6, board.GP13)
-i2c_sda_pin, i2c_scl_pin = board.GP15, board.GP14
-
-
-# set up the touch controls
-sliders = (
-    TouchSlider(faderA_pins),
-    TouchSlider(faderB_pins),
-    TouchSlider(faderC_pins),
-    TouchWheel(wheelX_pins, offset=0.25),
-    TouchWheel(wheelY_pins, offset=0.25),
-)
-pads = [touchio.TouchIn(pin) for pin in pad_pins]
-
-# virtual on-screen displays of controls
-slider_displays = (
-    FaderDisplay(10 + 15*0, 10, 8, 35),
-    FaderDisplay(10 + 15*1, 10, 8, 35),
-    FaderDisplay(10 + 15*2, 10, 8, 35),
-    WheelDisplay(70 + 0*35, 25, 15, knob_w=9, phase_offset=-0.25),
-    WheelDisplay(70 + 1*35, 25, 15, knob_w=9, phase_offset=-0.25),
-)
-pad_displays = PadsDisplay(20, 50, n=9, pad_h=10, pad_w=10)
+# record raw touch values for replay on a computer, see touchrecord.py
+# None, a file like "/touch.rec" (CIRCUITPY must be writable, see boot.py)
+# or "serial" for the usb_cdc data port (must be enabled, see boot.py)
+touch_record = None
 
-# set up midi out
-midi = adafruit_midi.MIDI(midi_out=usb_midi.ports[1], out_channel=midi_chan-1)
+# seconds between summaries of where loop time goes, see loopprofile.py, None for off
+loop_profile = None
 
-# set up the display
-dw,dh = 128, 64
-displayio.release_displays()
-i2c = busio.I2C(scl=i2c_sda_pin, sda=i2c_scl_pin, frequency=1_000_000)
-display_bus = displayio.I2CDisplay(i2c, device_address=0x3c)
-display = adafruit_displayio_ssd1306.SSD1306(display_bus, width=dw, height=dh)
-maingroup = displayio.Group()
-display.root_group = maingroup
+# where the calibrate app saved this board's calibration, "nvm" or a file,
+# see calstore.py, None for off
+calibration = "nvm"
 
-for s in slider_displays:
-    maingroup.append(s)
-maingroup.append(pad_displays)
-
-# used to keep track of which note pads are curerntly pressed
-pad_state = [False] * len(pads)
+backend = MidiBackend(usb_midi.ports[1], channel=midi_chan-1, ccs=midi_ccs,
+                      notes=midi_notes, cc_min_interval=midi_cc_min_interval,
+                      gesture_ccs=midi_gesture_ccs)
+controller = Controller(backend, LAYOUT, touch_record=touch_record,
+                        boot_timer=boot_timer, loop_profile=loop_profile,
+                        calibration=calibration)
 
 while True:
-    for i, slider in enumerate(sliders):
-        pos = slider.pos()
-        if pos is not None:   # touched!
-            slider_displays[i].pos(pos)   # fixme: need ".pos(pos-0.5)" for fader
-            slider_displays[i].touch(True)
-            cc_val = int((1-pos) * 127)
-            midi.send(ControlChange(midi_ccs[i], cc_val))
-            print("slider:%d: %1.2f cc:%d ccval:%d" % (i,pos,midi_ccs[i],cc_val))
-        else:
-            slider_displays[i].touch(False)
-            
-    for i, pad in enumerate(pads):
-        v = pad.value
-        pad_displays.set(i, v)
-        if pad_state[i] != v:
-            #n = midi_notes[i]
-            n = base_note + scale[i]
-            msg = NoteOn(n, 127) if v else NoteOff(n,0)
-            midi.send(msg)
-            pad_state[i] = v
-            print("pad:%d: note:" % i, msg)
-
-    #time.sleep(0.01)
-
+    controller.step()
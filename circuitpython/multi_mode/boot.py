@@ -0,0 +1,23 @@
+# picoslidertoy boot.py
+
+import supervisor
+import usb_hid
+
+supervisor.set_usb_identification(manufacturer="todbot",
+                                  product="picoslidertoy")
+
+usb_hid.enable((
+    usb_hid.Device.KEYBOARD,
+    usb_hid.Device.CONSUMER_CONTROL,
+))
+
+print("set usb and hid ident to 'picoslidertoy'")
+
+# to record touch data with touchrecord.py, uncomment one of these:
+# over serial, on a second usb_cdc port next to the REPL
+#import usb_cdc; usb_cdc.enable(console=True, data=True)
+# to flash, CIRCUITPY becomes read-only to the computer until this is removed
+#import storage; storage.remount("/", readonly=False)
+
+# paste this lines into the REPL (without the '#') to put the board into UF2 bootloader mode
+# import microcontroller; microcontroller.on_next_reset(microcontroller.RunMode.BOOTLOADER); microcontroller.reset()
@@ -0,0 +1,134 @@
+#
+# code.py -- picoslidertoy as MIDI controller, HID media keys and HID hotkeys,
+# hold "*" to switch between them
+# 2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+#
+# To use:
+#
+# 1. Install needed libraries:
+#   circup install adafruit_displayio_ssd1306 adafruit_hid
+#   (and adafruit_display_emoji_text, if using icons not in emoji_atlas)
+# 2. Copy the picoslidertoy library and the files in this directory to CIRCUITPY:
+#   cp -r circuitpython/lib/picoslidertoy /Volumes/CIRCUITPY/lib/
+#   cp circuitpython/multi_mode/* /Volumes/CIRCUITPY/
+#
+
+# timed from here, so make it before the other imports
+from picoslidertoy.boottime import BootTimer
+boot_timer = BootTimer()
+
+import usb_midi
+import usb_hid
+from adafruit_hid.keyboard import Keyboard
+from adafruit_hid.keycode import Keycode
+from adafruit_hid.consumer_control import ConsumerControl
+from adafruit_hid.consumer_control_code import ConsumerControlCode
+
+from picoslidertoy.controller import Controller
+from picoslidertoy.layout import LAYOUT
+from picoslidertoy.midi_out import MidiBackend
+from picoslidertoy.hid_out import HIDBackend
+from picoslidertoy.profiles import ProfileManager
+
+# slider config
+MAX_REPEATS = 4  # maximum number of repeats per loop when using sliders
+
+# hold "*" this long to go to the next profile, a shorter tap is sent as usual
+PROFILE_HOLD_TIME = 0.5
+
+# bigger pads and fader knobs to fit the icons
+layout = dict(LAYOUT,
+              sliders=tuple(s if s["type"] == "wheel" else dict(s, knob_w=11)
+                            for s in LAYOUT["sliders"]),
+              pads=dict(LAYOUT["pads"], display=(16, 50, 11, 11)))
+
+# record raw touch values for replay on a computer, see touchrecord.py
+# None, a file like "/touch.rec" (CIRCUITPY must be writable, see boot.py)
+# or "serial" for the usb_cdc data port (must be enabled, see boot.py)
+touch_record = None
+
+# seconds between summaries of where loop time goes, see loopprofile.py, None for off
+loop_profile = None
+
+# where the calibrate app saved this board's calibration, "nvm" or a file,
+# see calstore.py, None for off
+calibration = "nvm"
+
+# midi cc and note definitions, as in midi_sliders
+midi_ccs = [ 73, 1, 72, 74, 71 ]
+midi_chan = 1
+base_note = 36
+scale_fifths = (0, 5, 7, 12, 17,19,24,29,31,36,41,43)
+midi_notes = [ base_note + n for n in scale_fifths ]
+
+# set up usb hid
+keyboard = Keyboard(usb_hid.devices)
+cc = ConsumerControl(usb_hid.devices)
+
+# map hid actions, as in hid_media and hid_hotkeys
+media_actions = {
+    "button": (  # (device, icon, action,),
+        (keyboard, "",   (Keycode.CONTROL, Keycode.F1,)),             # 1
+        (keyboard, "",   (Keycode.CONTROL, Keycode.F2,)),             # 2
+        (keyboard, "",   (Keycode.CONTROL, Keycode.F3,)),             # 3
+        (keyboard, "",   (Keycode.CONTROL, Keycode.F4,)),             # 4
+        (cc,       "⏏️", (ConsumerControlCode.EJECT,)),               # 5
+        (cc,       "🔇", (ConsumerControlCode.MUTE,)),                # 6
+        (cc,       "⏮️", (ConsumerControlCode.SCAN_PREVIOUS_TRACK,)), # 7
+        (cc,       "⏭️", (ConsumerControlCode.SCAN_NEXT_TRACK,)),     # 8
+        (cc,       "⏯️", (ConsumerControlCode.PLAY_PAUSE,)),          # *
+    ),
+    "slider": (  # (device, sensitivity, icon, decrement, increment),
+        (keyboard, 16, "",   (Keycode.CONTROL, Keycode.F9,),              (Keycode.CONTROL, Keycode.F10,)),             # A
+        (keyboard, 16, "",   (Keycode.CONTROL, Keycode.F11,),             (Keycode.CONTROL, Keycode.F12,)),             # B
+        (cc,       16, "🔆", (ConsumerControlCode.BRIGHTNESS_DECREMENT,), (ConsumerControlCode.BRIGHTNESS_INCREMENT,)), # C
+        (cc,       8,  "⏩", (ConsumerControlCode.REWIND,),               (ConsumerControlCode.FAST_FORWARD,)),         # X
+        (cc,       16, "🔊", (ConsumerControlCode.VOLUME_DECREMENT,),     (ConsumerControlCode.VOLUME_INCREMENT,)),     # Y
+    ),
+    # two fingers, (device, turn decrement, increment, pinch together, apart) or None,
+    # needs wheels of 4 or more pads, the board's 3-pad wheels can't tell two fingers
+    # from one (see README)
+    # "gesture": (
+    #     None, None, None,  # A B C
+    #     (cc, (ConsumerControlCode.SCAN_PREVIOUS_TRACK,), (ConsumerControlCode.SCAN_NEXT_TRACK,),
+    #          (ConsumerControlCode.BRIGHTNESS_DECREMENT,), (ConsumerControlCode.BRIGHTNESS_INCREMENT,)), # X
+    #     None,  # Y
+    # ),
+}
+
+hotkey_actions = {
+    "button": (
+        (Keycode.CONTROL, Keycode.F1,), # 1
+        (Keycode.CONTROL, Keycode.F2,), # 2
+        (Keycode.CONTROL, Keycode.F3,), # 3
+        (Keycode.CONTROL, Keycode.F4,), # 4
+        (Keycode.CONTROL, Keycode.F5,), # 5
+        (Keycode.CONTROL, Keycode.F6,), # 6
+        (Keycode.CONTROL, Keycode.F7,), # 7
+        (Keycode.CONTROL, Keycode.F8,), # 8
+        (Keycode.CONTROL, Keycode.F9,), # *
+    ),
+    "slider": ( # (sensitivity, decrement, increment,),
+        (16, (Keycode.CONTROL, Keycode.F10,),  (Keycode.CONTROL, Keycode.F11,),), # A
+        (16, (Keycode.CONTROL, Keycode.F12,), (Keycode.CONTROL, Keycode.F13,),), # B
+        (16, (Keycode.CONTROL, Keycode.F14,), (Keycode.CONTROL, Keycode.F15,),), # C
+        (16, (Keycode.CONTROL, Keycode.F16,), (Keycode.CONTROL, Keycode.F17,),), # X
+        (16, (Keycode.CONTROL, Keycode.F18,), (Keycode.CONTROL, Keycode.F19,),), # Y
+    ),
+}
+
+# every profile is set up at startup, so switching is instant
+profiles = ProfileManager((
+    ("midi", MidiBackend(usb_midi.ports[1], channel=midi_chan-1, ccs=midi_ccs, notes=midi_notes)),
+    ("media", HIDBackend(media_actions, keyboard, max_steps=MAX_REPEATS)),
+    ("hotkeys", HIDBackend(hotkey_actions, keyboard, max_steps=MAX_REPEATS)),
+), hold_time=PROFILE_HOLD_TIME)
+# icons come from emoji_atlas.bmp, after changing them in hid_actions remake it with:
+#   python3 circuitpython/tools/emoji_atlas.py circuitpython/hid_media/emoji \
+#       --app circuitpython/multi_mode/code.py -o circuitpython/multi_mode/emoji_atlas
+controller = Controller(profiles, layout, touch_record=touch_record,
+                        boot_timer=boot_timer, loop_profile=loop_profile,
+                        calibration=calibration, icon_atlas="emoji_atlas")
+
+while True:
+    controller.step()
@@ -0,0 +1,43 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_display_emoji_text` stand-in for running picoslidertoy code on a host.
+Like the real library, each label reads its emoji's PNG from emoji/ (when
+it's there) and keeps a Bitmap, Palette and TileGrid of it. It doesn't
+decode the pixels, instead making a label busy-waits `load_cost` seconds,
+roughly what reading and decoding its emoji from flash takes.
+"""
+
+import struct
+import time
+import displayio
+
+load_cost = 0.010
+files_read = 0
+
+class EmojiLabel(displayio.Group):
+    """Fake EmojiLabel, keeps its text, placement and an emoji bitmap"""
+    def __init__(self, text, *, scale=1, **kwargs):
+        global files_read
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < load_cost:
+            pass
+        super().__init__(scale=scale)
+        self.text = text
+        self.anchor_point = (0, 0)
+        self.anchored_position = (0, 0)
+        name = "-".join("U+%X" % ord(c) for c in text if ord(c) != 0xFE0F)
+        width = height = colors = 8
+        try:
+            with open("emoji/%s.png" % name, "rb") as f:
+                png = f.read()
+            files_read += 1
+            width, height = struct.unpack(">II", png[16:24])
+            i = png.find(b"PLTE")
+            if i > 0:
+                colors = struct.unpack(">I", png[i-4:i])[0] // 3
+        except OSError:
+            pass
+        bitmap = displayio.Bitmap(width, height, colors)
+        palette = displayio.Palette(colors)
+        self.append(displayio.TileGrid(bitmap, pixel_shader=palette))
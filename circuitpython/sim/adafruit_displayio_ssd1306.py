@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_ssd1306` stand-in for running picoslidertoy code on a host.
+
+A refresh busy-waits `refresh_cost` seconds, about what a full 128x64 frame
+takes over 1 MHz I2C. With auto_refresh on, call background() once per loop
+to stand in for CircuitPython's background refresh: it refreshes at up to
+`auto_fps` whenever displayio properties were written since the last one.
+Making one busy-waits `init_cost`, for its init commands and first clear.
+"""
+
+import time
+import displayio
+
+class SSD1306():
+    """Fake SSD1306 display"""
+    refresh_cost = 0.010
+    init_cost = 0.015
+    auto_fps = 60
+    instances = []
+
+    def __init__(self, bus=None, width=128, height=64, rotation=0, **kwargs):
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < self.init_cost:
+            pass
+        self.width, self.height, self.rotation = width, height, rotation
+        self.root_group = None
+        self.auto_refresh = True
+        self.refreshes = 0
+        self._writes = displayio.writes
+        self._last = 0
+        SSD1306.instances.append(self)
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < self.refresh_cost:
+            pass
+        self.refreshes += 1
+        self._writes = displayio.writes
+        self._last = time.perf_counter()
+        return True
+
+    def background(self):
+        """What auto_refresh would do in CircuitPython's background tasks"""
+        if (self.auto_refresh and displayio.writes != self._writes and
+                time.perf_counter() - self._last >= 1 / self.auto_fps):
+            self.refresh()
@@ -0,0 +1,1471 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+Host-side benchmarks for picoslidertoy, using the stand-ins in this directory.
+
+  python3 circuitpython/sim/bench.py          # run all benchmarks
+  python3 circuitpython/sim/bench.py scan     # run just one
+
+Numbers are CPython numbers, only useful for comparing approaches.
+"""
+
+import array
+import io
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(1, os.path.join(HERE, '..', 'lib'))
+
+import displayio
+import touchio
+import adafruit_displayio_ssd1306
+import adafruit_display_emoji_text
+from picoslidertoy.baseline import BaselineTracker
+from picoslidertoy.midi_out import MidiOut, CCSender, CC14, NRPN
+from picoslidertoy.touchslider import TouchScanner, TouchWheel, TouchSlider, RelativeEncoder
+from picoslidertoy.touchslider import TwoFingerGesture
+from picoslidertoy.touchslider import FIXED_ONE, FIXED_TOLERANCE, FIXED_SHIFT, FIXED_MASK
+from picoslidertoy.touchslider import _DELTA_MAX, _PCT_MAX, _RECIP_SHIFT
+from picoslidertoy.touchrecord import TouchRecorder, TouchPlayback
+from picoslidertoy.hid_out import HIDQueue, compile_actions
+from picoslidertoy.posfilter import FilterChain, EMAFilter, MedianFilter, OneEuroFilter
+from picoslidertoy.slider_display import FaderDisplay, WheelDisplay, PadsDisplay, RefreshScheduler, collect_dirty
+from picoslidertoy.slider_display import IconAtlas
+from picoslidertoy import slider_display
+from picoslidertoy.controller import Controller
+from picoslidertoy.layout import LAYOUT
+from picoslidertoy.midi_out import MidiBackend
+from picoslidertoy.hid_out import HIDBackend
+from picoslidertoy.profiles import ProfileManager
+from picoslidertoy.boottime import BootTimer
+from picoslidertoy.loopprofile import LoopProfiler
+from picoslidertoy.linearize import SweepCalibrator, identity_table
+from picoslidertoy import calstore
+import microcontroller
+
+# same layout as the apps, pins are just names here
+fader_pins = (("GP4", "GP0", "GP28"), ("GP5", "GP1", "GP27"), ("GP3", "GP2", "GP26"))
+wheel_pins = (("GP7", "GP8", "GP9"), ("GP10", "GP11", "GP12"))
+pad_pins = ("GP22", "GP21", "GP20", "GP19", "GP18", "GP17", "GP16", "GP6", "GP13")
+
+# a finger between the first two pads of every slider, and on a few pads
+touched = {"GP4": 1400, "GP0": 1300, "GP5": 1400, "GP1": 1300, "GP3": 1400, "GP2": 1300,
+           "GP7": 1400, "GP8": 1300, "GP10": 1400, "GP11": 1300, "GP22": 1500, "GP19": 1500}
+
+def finger_source(pin):
+    return touched.get(pin, 1000)
+
+def timeit(func, duration):
+    """Call func repeatedly for about duration seconds, return calls per second"""
+    n = 0
+    t0 = time.perf_counter()
+    t1 = t0
+    while t1 - t0 < duration:
+        for _ in range(100):
+            func()
+        n += 100
+        t1 = time.perf_counter()
+    return n / (t1 - t0)
+
+class LegacyWheel():
+    """TouchWheel as it was before TouchScanner, polling each TouchIn object"""
+    def __init__(self, touch_pins, offset=0, sector_scale=0.333, wrap_value=True):
+        self.touchins = [touchio.TouchIn(p) for p in touch_pins]
+        self.offset, self.scale, self.wrap_value = offset, sector_scale, wrap_value
+        self.last_pos = 0
+
+    def pos(self):
+        a, b, c = self.touchins
+        a_pct = (a.raw_value - a.threshold) / a.threshold
+        b_pct = (b.raw_value - b.threshold) / b.threshold
+        c_pct = (c.raw_value - c.threshold) / c.threshold
+        pos = None
+        if a_pct >= 0 and b_pct >= 0:
+            pos = self.scale * (0 + (b_pct / (a_pct + b_pct)))
+        elif b_pct >= 0 and c_pct >= 0:
+            pos = self.scale * (1 + (c_pct / (b_pct + c_pct)))
+        elif c_pct >= 0 and a_pct >= 0 and self.wrap_value:
+            pos = self.scale * (2 + (a_pct / (c_pct + a_pct)))
+        elif a_pct > 0 and b_pct <= 0 and c_pct <= 0:
+            pos = 0 * self.scale
+        elif a_pct <= 0 and b_pct > 0 and c_pct <= 0:
+            pos = 1 * self.scale
+        elif a_pct <= 0 and b_pct <= 0 and c_pct > 0 and self.wrap_value:
+            pos = 2 * self.scale
+        if pos is not None:
+            if abs(pos - self.last_pos) > 0.5:
+                self.last_pos = pos
+            self.last_pos = pos
+            pos = (pos + self.offset) % 1
+        return pos
+
+class DividingWheel(TouchWheel):
+    """
+    TouchWheel.pos() normalizing each pad with a division and its gain, as
+    before the cache, otherwise line for line the same
+    """
+    def pos(self):
+        scanner = self.scanner
+        if self.autoscan:
+            scanner.scan()
+        if self.generation != scanner.generation:
+            self.recalibrate()
+        raw, thresholds, gains, i = scanner.raw, scanner.thresholds, self.gains, self.start
+        t = thresholds[i]
+        first = prev = (raw[i] - t) * gains[0] / t
+        pad, pad_max = (0, first) if first > 0 else (-1, 0.0)
+        pair, pair_sum, pair_b = -1, -1.0, 0.0
+        for j in range(1, len(gains)):
+            t = thresholds[i+j]
+            pct = (raw[i+j] - t) * gains[j] / t
+            if pct >= 0:
+                if prev >= 0 and prev + pct > pair_sum:
+                    pair, pair_sum, pair_b = j - 1, prev + pct, pct
+                if pct > pad_max:
+                    pad, pad_max = j, pct
+            prev = pct
+        if self.wrap_value and prev >= 0 and first >= 0 and prev + first > pair_sum:
+            pair, pair_sum, pair_b = len(gains) - 1, prev + first, first
+        if pair >= 0:
+            pos = self.scale * (pair + (pair_b / pair_sum if pair_sum else 0))
+        elif pad >= 0:
+            pos = self.scale * pad
+        else:
+            if self.filter is not None:
+                self.filter.reset()
+            return None
+        if self.wrap_value:
+            pos = (pos + self.offset) % 1
+        else:
+            pos = min(max(pos + self.offset, 0), 1)
+        if self.linear is not None:
+            pos = self.linearize(min(int(pos * FIXED_ONE), FIXED_MASK)) / FIXED_ONE
+        if self.filter is not None:
+            pos = self.filter.update(min(int(pos * FIXED_ONE), FIXED_MASK)) / FIXED_ONE
+        return pos
+
+def bench_scan(duration=1.0):
+    """Full-surface scans per second, per-object polling vs TouchScanner"""
+    touchio.raw_source = finger_source
+
+    legacy_sliders = [LegacyWheel(pins, sector_scale=0.5, wrap_value=False) for pins in fader_pins]
+    legacy_sliders += [LegacyWheel(pins, offset=0.25) for pins in wheel_pins]
+    legacy_pads = [touchio.TouchIn(p) for p in pad_pins]
+    def legacy_loop():
+        for slider in legacy_sliders:
+            slider.pos()
+        for pad in legacy_pads:
+            pad.value
+
+    scanner = TouchScanner()
+    sliders = [TouchSlider(pins, scanner=scanner) for pins in fader_pins]
+    sliders += [TouchWheel(pins, offset=0.25, scanner=scanner) for pins in wheel_pins]
+    pads_start = scanner.add(pad_pins)
+    pads = range(pads_start, pads_start + len(pad_pins))
+    def scanner_loop():
+        scanner.scan()
+        for slider in sliders:
+            slider.pos()
+        for pad in pads:
+            scanner.value(pad)
+
+    for name, loop in (("per-object polling", legacy_loop), ("TouchScanner", scanner_loop)):
+        touchio.reads = 0
+        loop()
+        reads = touchio.reads
+        rate = timeit(loop, duration)
+        print("  %-20s %9.0f scans/s  %2d raw reads/scan" % (name, rate, reads))
+
+def sweep_triples(n=2000, wrap=True, seed=1, pads=3, amp=(250, 450)):
+    """
+    raw_value triples of a finger sweeping once along three pads, with noise.
+    Stands in for recorded data: each pad responds most when the finger is
+    over its center and falls off to nothing one sector away.
+    pads: make frames of that many pads instead of triples
+    amp: range of how much the pad under the finger rises, lower for lighter touches
+    """
+    rng = random.Random(seed)
+    base = (1010, 985, 1030, 995, 1020, 1005, 990, 1015)[:pads]
+    triples = []
+    for k in range(n):
+        p = k / n * (pads if wrap else pads - 1)
+        triple = []
+        for j in range(pads):
+            d = abs(p - j)
+            if wrap:
+                d = min(d, pads - d)
+            rise = rng.randint(*amp)
+            triple.append(base[j] + max(0, int(rise * (1.1 - d))) + rng.randint(-30, 30))
+        triples.append(triple)
+    return triples
+
+def bench_fixed(duration=0.5):
+    """TouchWheel.pos() vs pos_fixed(), agreement and cost on replayed triples"""
+    touchio.raw_source = lambda pin: 1000
+    for cls, kwargs, wrap in ((TouchWheel, {"offset": 0.25}, True), (TouchSlider, {}, False)):
+        scanner = TouchScanner()
+        slider = cls(("a", "b", "c"), scanner=scanner, **kwargs)
+        triples = sweep_triples(wrap=wrap)
+        max_err, touched, mismatched = 0, 0, 0
+        for triple in triples:
+            scanner.raw[0], scanner.raw[1], scanner.raw[2] = triple
+            pos, pos_fixed = slider.pos(), slider.pos_fixed()
+            if (pos is None) != (pos_fixed is None):
+                mismatched += 1
+                continue
+            if pos is not None:
+                touched += 1
+                err = abs(pos * FIXED_ONE - pos_fixed)
+                max_err = max(max_err, min(err, FIXED_ONE - err))  # wrap-aware
+        ok = mismatched == 0 and max_err <= FIXED_TOLERANCE
+        print("  %-12s %d/%d touched, %d touch mismatches, max error %.2f/%d %s" %
+              (cls.__name__, touched, len(triples), mismatched, max_err, FIXED_ONE,
+               "ok" if ok else "OUT OF TOLERANCE"))
+        assert mismatched == 0, "%s: %d touch mismatches" % (cls.__name__, mismatched)
+        assert max_err <= FIXED_TOLERANCE, "%s: max error %.2f" % (cls.__name__, max_err)
+        scanner.raw[0], scanner.raw[1], scanner.raw[2] = triples[len(triples)//3]
+        for name, func in (("pos", slider.pos), ("pos_fixed", slider.pos_fixed)):
+            print("    %-10s %6.2f us/call" % (name, 1e6 / timeit(func, duration)))
+
+class ThreePadWheel(TouchWheel):
+    """TouchWheel.pos_fixed() as it was for exactly three pads, unrolled"""
+    def pos_fixed(self):
+        scanner = self.scanner
+        if self.autoscan:
+            scanner.scan()
+        if self.generation != scanner.generation:
+            self.recalibrate()
+        raw, i = scanner.raw, self.start
+        base, scale = self.norm_base, self.norm_scale_fixed
+        a, b, c = raw[i] - base[0], raw[i+1] - base[1], raw[i+2] - base[2]
+        a = ((a if a < _DELTA_MAX else _DELTA_MAX) * scale[0]) >> _RECIP_SHIFT
+        b = ((b if b < _DELTA_MAX else _DELTA_MAX) * scale[1]) >> _RECIP_SHIFT
+        c = ((c if c < _DELTA_MAX else _DELTA_MAX) * scale[2]) >> _RECIP_SHIFT
+        if a > _PCT_MAX:
+            a = _PCT_MAX
+        if b > _PCT_MAX:
+            b = _PCT_MAX
+        if c > _PCT_MAX:
+            c = _PCT_MAX
+        if a >= 0 and b >= 0:
+            pos = (b << FIXED_SHIFT) // (a + b) if a + b else 0
+        elif b >= 0 and c >= 0:
+            pos = FIXED_ONE + ((c << FIXED_SHIFT) // (b + c) if b + c else 0)
+        elif c >= 0 and a >= 0 and self.wrap_value:
+            pos = 2 * FIXED_ONE + ((a << FIXED_SHIFT) // (c + a) if c + a else 0)
+        elif a > 0 and b <= 0 and c <= 0:
+            pos = 0
+        elif a <= 0 and b > 0 and c <= 0:
+            pos = FIXED_ONE
+        elif a <= 0 and b <= 0 and c > 0 and self.wrap_value:
+            pos = 2 * FIXED_ONE
+        else:
+            if self.filter is not None:
+                self.filter.reset()
+            return None
+        pos = (pos * self.scale_fixed) >> FIXED_SHIFT
+        pos = (pos + self.offset_fixed) & FIXED_MASK
+        if self.filter is not None:
+            pos = self.filter.update(pos)
+        return pos
+
+def bench_npad(duration=0.5):
+    """pos_fixed() of the unrolled three-pad wheel vs the N-pad one, and N-pad wheels of 3, 5 and 8"""
+    touchio.raw_source = lambda pin: 1000
+    for wrap in (True, False):
+        scanner = TouchScanner()
+        old = ThreePadWheel(("a", "b", "c"), wrap_value=wrap, scanner=scanner)
+        new = TouchWheel(("d", "e", "f"), wrap_value=wrap, scanner=scanner)
+        same, max_err, end_wraps, end_nones, other = 0, 0, 0, 0, 0
+        triples = sweep_triples(wrap=wrap)
+        for triple in triples:
+            scanner.raw[0], scanner.raw[1], scanner.raw[2] = triple
+            scanner.raw[3], scanner.raw[4], scanner.raw[5] = triple
+            a, b = old.pos_fixed(), new.pos_fixed()
+            if a == b:
+                same += 1
+            elif a is not None and b is not None:
+                err = abs(a - b)
+                if not wrap and err > FIXED_ONE // 2 and b == FIXED_MASK:
+                    end_wraps += 1  # the unrolled slider's far end came out as 0
+                else:
+                    max_err = max(max_err, min(err, FIXED_ONE - err))
+            elif not wrap and a is None and b == FIXED_MASK:
+                end_nones += 1  # finger on just the last pad, the unrolled slider said None
+            else:
+                other += 1
+        print("  %-6s 3 pads: %d/%d frames the same, max difference %d counts, "
+              "slider ends before: %d wrapped to 0, %d were None" %
+              ("wheel" if wrap else "slider", same, len(triples), max_err, end_wraps, end_nones))
+        # only the two slider-end changes, wheels are untouched
+        assert max_err == 0 and other == 0, "%d frames differ, by up to %d" % (other, max_err)
+        assert same == len(triples) or not wrap, "wheel frames differ"
+    scanner.raw[0], scanner.raw[1], scanner.raw[2] = triples[len(triples) // 3]
+    scanner.raw[3], scanner.raw[4], scanner.raw[5] = triples[len(triples) // 3]
+    print("  unrolled 3-pad    %6.2f us/call" % (1e6 / timeit(old.pos_fixed, duration)))
+    for pads in (3, 5, 8):
+        scanner = TouchScanner()
+        wheel = TouchWheel([str(j) for j in range(pads)], scanner=scanner)
+        frames = sweep_triples(pads=pads)
+        # how far from the finger's true position, in counts
+        errs = []
+        for k, frame in enumerate(frames):
+            scanner.raw[0:pads] = array.array('H', frame)
+            pos = wheel.pos_fixed()
+            if pos is not None:
+                err = abs(pos - k * FIXED_ONE // len(frames))
+                errs.append(min(err, FIXED_ONE - err))
+        scanner.raw[0:pads] = array.array('H', frames[len(frames) // 3])
+        print("  N-pad wheel of %d %6.2f us/call, error mean %3.0f max %3d counts" %
+              (pads, 1e6 / timeit(wheel.pos_fixed, duration), sum(errs) / len(errs), max(errs)))
+
+def bench_centroid(duration=0.5, steps=4000):
+    """Pair interpolation vs circular centroid: accuracy, cost, and MIDI sent with min_strength"""
+    touchio.raw_source = lambda pin: 1000
+    for pads, wrap in ((3, True), (5, True), (3, False)):
+        for touch, amp in (("firm", (250, 450)), ("light", (150, 250))):
+            frames = sweep_triples(wrap=wrap, pads=pads, amp=amp)
+            results = []
+            for estimator in ("pair", "centroid"):
+                scanner = TouchScanner()
+                slider = TouchWheel([str(j) for j in range(pads)], wrap_value=wrap,
+                                    scanner=scanner, estimator=estimator)
+                errs, strengths = [], []
+                for k, frame in enumerate(frames):
+                    scanner.raw[0:pads] = array.array('H', frame)
+                    pos = slider.pos_fixed()
+                    if pos is not None:
+                        err = abs(pos - min(k * FIXED_ONE // len(frames), FIXED_ONE - 1))
+                        errs.append(min(err, FIXED_ONE - err) if wrap else err)
+                        strengths.append(slider.strength)
+                scanner.raw[0:pads] = array.array('H', frames[len(frames) // 3])
+                us = 1e6 / timeit(slider.pos_fixed, duration)
+                errs.sort()
+                results.append("%-8s %4.0f/%4d  %4.2f us" % (estimator, sum(errs) / len(errs),
+                                                            errs[len(errs) * 95 // 100], us))
+            print("  %d-pad %-6s %-5s  err mean/p95 counts: %s  |  %s, strength median %d" %
+                  (pads, "wheel" if wrap else "slider", touch, results[0], results[1],
+                   sorted(strengths)[len(strengths) // 2]))
+
+    # a sweep around a wheel, firmly then lightly, with light touches' positions not trusted
+    firm, light = sweep_triples(seed=5), sweep_triples(seed=6, amp=(130, 230))
+    for estimator in ("pair", "centroid"):
+        for min_strength in (0, FIXED_ONE // 16, FIXED_ONE // 8):
+            touchio.raw_source = lambda pin: 1000
+            scanner = TouchScanner()
+            wheel = TouchWheel(("a", "b", "c"), scanner=scanner, estimator=estimator)
+            port = FakeMidiPort()
+            backend = MidiBackend(port)
+            backend.attach(StepClock())
+            sent = []
+            stdout, sys.stdout = sys.stdout, io.StringIO()
+            try:
+                for frames in (firm, light):
+                    before = len(port.data)
+                    for frame in frames:
+                        backend.controller.now += 1
+                        scanner.raw[0], scanner.raw[1], scanner.raw[2] = frame
+                        pos = wheel.pos_fixed()
+                        if pos is None or wheel.strength >= min_strength:
+                            backend.slider(0, pos)
+                        backend.flush()
+                    sent.append(len(port.data) - before)
+            finally:
+                sys.stdout = stdout
+            print("  %-8s min_strength %3d: MIDI bytes sent for a firm sweep %4d, light sweep %4d" %
+                  (estimator, min_strength, sent[0], sent[1]))
+
+def bell_sweep(n=2000, wrap=True, seed=1, pads=3, width=0.9, amp=400, noise=5):
+    """
+    Frames of a finger sweeping once along `pads` pads that respond with a
+    bell curve of distance, `width` sectors wide, so between pads the ratio
+    of their readings follows an S-curve rather than a straight line.
+    """
+    rng = random.Random(seed)
+    base = (1010, 985, 1030, 995, 1020, 1005, 990, 1015)[:pads]
+    frames = []
+    for k in range(n):
+        p = k / n * (pads if wrap else pads - 1)
+        frame = []
+        for j in range(pads):
+            d = abs(p - j)
+            if wrap:
+                d = min(d, pads - d)
+            rise = amp * (1 + rng.uniform(-0.03, 0.03)) * math.exp(-(d / width) ** 2)
+            frame.append(base[j] + int(rise) + rng.randint(-noise, noise))
+        frames.append(frame)
+    return frames
+
+def bench_linearize(duration=0.5, sweeps=5):
+    """Positions vs true finger position on bell-curve pads, raw and through a table from calibration sweeps"""
+    touchio.raw_source = lambda pin: 1000
+    for pads, wrap, estimator in ((3, False, "pair"), (3, False, "centroid"), (3, True, "pair"),
+                                  (3, True, "centroid"), (5, True, "centroid")):
+        scanner = TouchScanner()
+        slider = TouchWheel([str(j) for j in range(pads)], wrap_value=wrap, scanner=scanner,
+                            estimator=estimator)
+        # calibrate on some sweeps, check against another
+        cal = SweepCalibrator(wrap)
+        for seed in range(10, 10 + sweeps):
+            for frame in bell_sweep(wrap=wrap, pads=pads, seed=seed):
+                scanner.raw[0:pads] = array.array('H', frame)
+                cal.add(slider.pos_fixed())
+        table = cal.table()
+        test = bell_sweep(wrap=wrap, pads=pads, seed=99)
+        results = []
+        for linear in (None, table):
+            slider.linear = linear
+            errs = []
+            for k, frame in enumerate(test):
+                scanner.raw[0:pads] = array.array('H', frame)
+                pos = slider.pos_fixed()
+                if pos is not None:
+                    err = abs(pos - min(k * FIXED_ONE // len(test), FIXED_ONE - 1))
+                    errs.append(min(err, FIXED_ONE - err) if wrap else err)
+            errs.sort()
+            scanner.raw[0:pads] = array.array('H', test[len(test) // 3])
+            results.append("%4.0f/%4d  %4.2f us" % (sum(errs) / len(errs), errs[len(errs) * 95 // 100],
+                                                   1e6 / timeit(slider.pos_fixed, duration)))
+        increasing = all(a < b for a, b in zip(table, table[1:]))
+        print("  %d-pad %-6s %-8s err mean/p95 counts: raw %s  |  table %s  %s" %
+              (pads, "wheel" if wrap else "slider", estimator, results[0], results[1],
+               "increasing" if increasing else "NOT INCREASING"))
+        assert increasing, "%d-pad %s table not increasing" % (pads, estimator)
+        # tables are saved with the rest of the calibration, see calstore.py
+        saved = calstore.Calibration(array.array('H', [1000] * pads), array.array('H', [1200] * pads),
+                                     array.array('h', [0]), [array.array('H', [256] * pads)], [table])
+        loaded = calstore.unpack(calstore.pack(saved)).tables[0]
+        assert list(loaded) == list(table), "table changed on the way through calstore"
+
+def bench_norm(duration=0.2, runs=7):
+    """TouchWheel.pos() with per-call divisions vs the normalization cache, best of runs"""
+    touchio.raw_source = lambda pin: 1000
+    scanner = TouchScanner()
+    dividing = DividingWheel(("a", "b", "c"), offset=0.25, scanner=scanner)
+    cached = TouchWheel(("d", "e", "f"), offset=0.25, scanner=scanner)
+    for wheel in (dividing, cached):
+        wheel.gains = [1.0, 1.1, 0.9]
+        wheel.recalibrate()
+    triple = sweep_triples()[300]
+    scanner.raw[0], scanner.raw[1], scanner.raw[2] = triple
+    scanner.raw[3], scanner.raw[4], scanner.raw[5] = triple
+    assert abs(dividing.pos() - cached.pos()) < 1e-9
+    t_div = min(1e6 / timeit(dividing.pos, duration) for _ in range(runs))
+    t_cache = min(1e6 / timeit(cached.pos, duration) for _ in range(runs))
+    print("  divide per call     %6.3f us/call" % t_div)
+    print("  normalization cache %6.3f us/call  (%+.3f us)" % (t_cache, t_cache - t_div))
+
+def drift_trace(n=600000, drift=400, seed=2):
+    """
+    Raw values of one pad whose untouched value drifts up by `drift` counts
+    and back over n scans (10 minutes at 1 kHz, like warming up on stage),
+    with noise and a touch now and then.
+    Returns list of (raw, is_touched) pairs.
+    """
+    rng = random.Random(seed)
+    trace = []
+    for k in range(n):
+        x = k / n
+        base = 1000 + drift * (4 * x * (1 - x))  # up, then back down
+        touched = (k // 1500) % 5 == 4  # touched 1/5 of the time
+        raw = base + (450 if touched else 0) + rng.gauss(0, 8)
+        trace.append((int(raw), touched))
+    return trace
+
+def bench_drift(duration=0.5):
+    """Touch detection on a drifting pad, fixed threshold vs BaselineTracker"""
+    trace = drift_trace()
+    touchio.raw_source = lambda pin: trace[0][0]
+    for name in ("fixed threshold", "BaselineTracker"):
+        scanner = TouchScanner(("GP0",))
+        scanner.thresholds[0] += 100  # what the hwtest apps do
+        tracker = BaselineTracker(scanner) if name == "BaselineTracker" else None
+        false_touch = missed = 0
+        for raw, touched in trace:
+            scanner.raw[0] = raw
+            if tracker:
+                tracker.update()
+            v = scanner.value(0)
+            false_touch += v and not touched
+            missed += touched and not v
+        print("  %-16s %5d false touches, %5d missed touches of %d scans" %
+              (name, false_touch, missed, len(trace)))
+    assert false_touch == 0 and missed == 0, "BaselineTracker lost track of the drift"
+    # a light finger resting just under the threshold for 10 s at 1 kHz
+    scanner = TouchScanner(("GP0",))
+    tracker = BaselineTracker(scanner)
+    start = tracker.baseline(0)
+    scanner.raw[0] = start + tracker.min_margin - 50
+    for _ in range(10000):
+        tracker.update()
+    absorbed = tracker.baseline(0) - start
+    print("  finger resting %d counts up for 10 s: baseline rose %d counts" %
+          (scanner.raw[0] - start, absorbed))
+    assert absorbed < (scanner.raw[0] - start) // 2, "resting finger taken as the baseline"
+    scanner.raw[0] = 1000
+    print("  BaselineTracker.update() %.2f us/call" %
+          (1e6 / timeit(BaselineTracker(TouchScanner(["GP%d" % i for i in range(24)])).update, duration)))
+
+def bench_display(duration=0.5):
+    """displayio property writes per frame while one slider is slowly dragged"""
+    faders = [FaderDisplay(10 + 15*i, 10, 8, 35) for i in range(3)]
+    wheels = [WheelDisplay(70 + i*35, 25, 15, knob_w=9, phase_offset=-0.25) for i in range(2)]
+    pads = PadsDisplay(20, 50, n=9, pad_h=10, pad_w=10)
+    widgets = faders + wheels + [pads]
+    collect_dirty(widgets)
+    frames = 2000
+    displayio.writes = dirty = 0
+    for k in range(frames):
+        faders[0].pos(k / frames)  # about one pixel every 60 frames
+        faders[0].touch(True)
+        for w in faders[1:] + wheels:
+            w.touch(False)
+        wheels[0].pos(0.3)
+        for i in range(9):
+            pads.set(i, i == 4 and k > frames // 2)
+        dirty += collect_dirty(widgets)
+    # before, every call wrote: knob.y and hidden per fader,
+    # knob.x, knob.y and hidden per wheel, hidden per pad
+    print("  unconditional writes  %6.2f writes/frame" % (3*2 + 2*3 + 9))
+    print("  dirty tracking        %6.2f writes/frame, %.3f dirty widgets/frame" %
+          (displayio.writes / frames, dirty / frames))
+
+def loop_stats(times):
+    """mean, 99th percentile and max of a list of loop times, in ms"""
+    times = sorted(times)
+    return (1e3 * sum(times) / len(times), 1e3 * times[int(len(times) * 0.99)], 1e3 * times[-1])
+
+def busy_wait(seconds):
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        pass
+
+def bench_refresh(duration=3.0, refresh_cost=0.010, scan_cost=0.001):
+    """Loop times with 10 ms display refreshes, auto_refresh vs RefreshScheduler"""
+    adafruit_displayio_ssd1306.SSD1306.refresh_cost = refresh_cost
+    touchio.raw_source = lambda pin: 1000
+    for name, fps, defer in (("auto_refresh", None, False), ("scheduler 20fps", 20, False),
+                             ("scheduler + defer", 20, True)):
+        scanner = TouchScanner()
+        sliders = [TouchSlider(pins, scanner=scanner) for pins in fader_pins]
+        sliders += [TouchWheel(pins, offset=0.25, scanner=scanner) for pins in wheel_pins]
+        displays = [FaderDisplay(10 + 15*i, 10, 8, 35) for i in range(3)]
+        displays += [WheelDisplay(70 + i*35, 25, 15, knob_w=9) for i in range(2)]
+        display = adafruit_displayio_ssd1306.SSD1306()
+        refresher = RefreshScheduler(display, displays, fps=fps, defer_while_moving=defer) if fps else None
+        times, moving_times = [], []
+        t_start = time.perf_counter()
+        while (t := time.perf_counter() - t_start) < duration:
+            t0 = time.perf_counter()
+            busy_wait(scan_cost)  # stands in for reading 24 pins on the device
+            # a finger sliding along the first fader for half of every second
+            touching = t % 1 < 0.5
+            p = (t % 0.5) / 0.5
+            scanner.raw[0] = 1000 + (int(400 * (1 - p)) if touching else 0)
+            scanner.raw[1] = 1000 + (int(400 * p) if touching else 0)
+            moving = False
+            for slider, disp in zip(sliders, displays):
+                pos = slider.pos()
+                if pos is not None:
+                    disp.pos(pos)
+                    disp.touch(True)
+                    moving = True
+                else:
+                    disp.touch(False)
+            if refresher:
+                refresher.update(int(t * 1000), moving)
+            else:
+                display.background()
+            dt = time.perf_counter() - t0
+            times.append(dt)
+            if moving:
+                moving_times.append(dt)
+        print("  %-18s %3d refreshes, all loops: mean %.2f p99 %.2f max %.2f ms" %
+              ((name, display.refreshes) + loop_stats(times)))
+        print("  %-18s while moving: mean %.2f p99 %.2f max %.2f ms" %
+              (("",) + loop_stats(moving_times)))
+
+class StepClock():
+    """Stands in for a Controller when a backend is driven directly, now is its step time in ms"""
+    def __init__(self):
+        self.now = 0
+
+class FakeMidiPort():
+    """Stands in for usb_midi.ports[1], keeping every byte written"""
+    def __init__(self):
+        self.data = bytearray()
+        self.writes = 0
+
+    def write(self, buf, num=None):
+        self.data.extend(buf[:num] if num is not None else buf)
+        self.writes += 1
+        return len(buf)
+
+def gesture_positions(scan_cost=0.0005):
+    """
+    Fixed-point positions of a fader over a gesture: a slow sweep, then a
+    rest with the finger still on it. Busy-waits scan_cost per frame so the
+    gesture has device-like timing.
+    """
+    touchio.raw_source = lambda pin: 1000
+    scanner = TouchScanner()
+    slider = TouchSlider(("a", "b", "c"), scanner=scanner)
+    triples = sweep_triples(n=1000, wrap=False)
+    triples += [triples[700]] * 1000
+    for triple in triples:
+        busy_wait(scan_cost)
+        scanner.raw[0], scanner.raw[1], scanner.raw[2] = triple
+        yield slider.pos_fixed()
+
+def bench_cc():
+    """CC messages sent over a recorded-like fader gesture, every loop vs CCSender"""
+    for name, min_interval in (("every loop", None), ("CCSender", 0), ("CCSender 10ms", 0.010)):
+        port = FakeMidiPort()
+        def send_cc(cc_num, cc_val):
+            port.write(bytes((0xB0, cc_num, cc_val)))
+        cc_out = CCSender(send_cc, (73,), min_interval=min_interval or 0)
+        last = None
+        t0 = time.perf_counter()
+        for pos in gesture_positions():
+            t_ms = int((time.perf_counter() - t0) * 1000)
+            if pos is None:
+                continue
+            val = (4095 - pos) * 16383 // 4095
+            last = val >> 7
+            if min_interval is None:
+                send_cc(73, last)
+            else:
+                cc_out.set(0, val, t_ms)
+            cc_out.poll(t_ms)
+        cc_out.poll(t_ms + 20)  # let a held back value settle
+        print("  %-14s %5d messages, last value sent %d" % (name, port.writes, port.data[-1]))
+        assert port.data[-1] == last, "%s ended on %d, not %d" % (name, port.data[-1], last)
+
+def bench_midiout(duration=0.5):
+    """One loop's MIDI output (5 CCs, a note on and off), adafruit_midi vs MidiOut"""
+    try:
+        import adafruit_midi
+        from adafruit_midi.control_change import ControlChange
+        from adafruit_midi.note_on import NoteOn
+        from adafruit_midi.note_off import NoteOff
+    except ImportError:
+        adafruit_midi = None
+        print("  (pip install adafruit-circuitpython-midi to compare with adafruit_midi)")
+    ccs = (73, 1, 72, 74, 71)
+    k = 0
+    if adafruit_midi:
+        port = FakeMidiPort()
+        midi = adafruit_midi.MIDI(midi_out=port, out_channel=0)
+        def adafruit_loop():
+            nonlocal k
+            k = (k + 1) & 0x7f
+            for cc_num in ccs:
+                midi.send(ControlChange(cc_num, k))
+            midi.send(NoteOn(36, 127))
+            midi.send(NoteOff(36, 0))
+        adafruit_loop()
+        expected = bytes(port.data)
+        rate = timeit(adafruit_loop, duration)
+        print("  adafruit_midi  %6.2f us/loop  %d writes/loop" % (1e6 / rate, 7))
+    port = FakeMidiPort()
+    midi = MidiOut(port)
+    k = 0
+    def midiout_loop():
+        nonlocal k
+        k = (k + 1) & 0x7f
+        for cc_num in ccs:
+            midi.control_change(cc_num, k)
+        midi.note_on(36, 127)
+        midi.note_off(36, 0)
+        midi.flush()
+    midiout_loop()
+    if adafruit_midi:
+        assert bytes(port.data) == expected, "MidiOut bytes differ from adafruit_midi"
+    rate = timeit(midiout_loop, duration)
+    print("  MidiOut        %6.2f us/loop  %d writes/loop" % (1e6 / rate, 1))
+
+def decode_ccs(data):
+    """
+    Follow a stream of CC messages like a receiver would, returning
+    {cc_num: value} for 7-bit CCs and {("cc14", n) or ("nrpn", n): value}
+    for 14-bit ones. A new MSB resets the LSB to 0.
+    """
+    values, nrpn = {}, [0, 0]
+    for k in range(0, len(data), 3):
+        status, num, val = data[k:k+3]
+        assert status & 0xf0 == 0xB0
+        if num == 99:
+            nrpn[0] = val
+        elif num == 98:
+            nrpn[1] = val
+        elif num in (6, 38):
+            key = ("nrpn", nrpn[0] << 7 | nrpn[1])
+            old = values.get(key, 0)
+            values[key] = val << 7 if num == 6 else (old & ~0x7f) | val
+        elif num < 32:
+            values[num] = val
+            values[("cc14", num)] = val << 7
+        elif num < 64:
+            key = ("cc14", num - 32)
+            values[key] = (values.get(key, 0) & ~0x7f) | val
+    return values
+
+def bench_cc14():
+    """Bytes sent over a fader gesture as 7-bit CC, 14-bit CC and NRPN"""
+    vals = [(4095 - pos) * 16383 // 4095 for pos in gesture_positions(scan_cost=0) if pos is not None]
+    for name, cc, key in (("CC7", 1, 1), ("CC14", (1, CC14), ("cc14", 1)),
+                          ("NRPN", (300, NRPN), ("nrpn", 300))):
+        port = FakeMidiPort()
+        midi = MidiOut(port)
+        cc_out = CCSender(midi.control_change, (cc,))
+        distinct = 0
+        for val in vals:
+            distinct += cc_out.set(0, val, 0)
+            midi.flush()
+        got = decode_ccs(port.data)[key]
+        want = vals[-1] >> 7 if name == "CC7" else vals[-1]
+        print("  %-5s %5d bytes for %4d value changes, receiver ends at %5d %s" %
+              (name, len(port.data), distinct, got, "ok" if got == want else "WRONG"))
+        assert got == want, "%s receiver ends at %d, not %d" % (name, got, want)
+    # MidiBackend's 14-bit output reaches both ends of the range
+    for pos, want in ((FIXED_MASK, 0), (0, 16383)):
+        port = FakeMidiPort()
+        backend = MidiBackend(port, ccs=((1, CC14),))
+        backend.attach(StepClock())
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            backend.slider(0, pos)
+            backend.flush()
+        finally:
+            sys.stdout = stdout
+        got = decode_ccs(port.data)[("cc14", 1)]
+        print("  MidiBackend position %4d sends %5d" % (pos, got))
+        assert got == want, "position %d sends %d, not %d" % (pos, got, want)
+
+def bench_replay(frames=4000):
+    """Record the run.py demo gesture, then replay it at full speed"""
+    from run import demo_gesture, SLIDER_PINS, PAD_PINS
+    demo_gesture(touchio.traces)
+    touchio.frame = 0
+
+    def make_controls():
+        scanner = TouchScanner()
+        sliders = [TouchSlider(p, scanner=scanner) for p in SLIDER_PINS[:3]]
+        sliders += [TouchWheel(p, offset=0.25, scanner=scanner) for p in SLIDER_PINS[3:]]
+        pads = range(scanner.add(PAD_PINS), len(scanner.raw))
+        return scanner, sliders, pads
+
+    def step(scanner, sliders, pads):
+        return [s.pos_fixed() for s in sliders] + [scanner.value(p) for p in pads]
+
+    scanner, sliders, pads = make_controls()
+    stream = io.BytesIO()
+    recorder = TouchRecorder(scanner, stream)
+    live = []
+    for _ in range(frames):
+        scanner.scan()
+        recorder.record()
+        live.append(step(scanner, sliders, pads))
+        touchio.next_frame()
+    recorder.flush()
+    touchio.traces.clear()
+
+    # replay writes straight into the frame buffer, touchio is never read
+    scanner, sliders, pads = make_controls()
+    for s in sliders:
+        s.autoscan = False
+    size = len(stream.getvalue())
+    stream.seek(0)
+    playback = TouchPlayback(stream)
+    playback.apply_thresholds(scanner)
+    replayed = []
+    t0 = time.perf_counter()
+    while playback.read_into(scanner.raw) is not None:
+        replayed.append(step(scanner, sliders, pads))
+    dt = time.perf_counter() - t0
+    print("  %d frames of %d pins, %d bytes (%.1f per frame)" %
+          (frames, len(playback.names), size, size / frames))
+    print("  replay %8.0f frames/s, matches live run: %s" %
+          (len(replayed) / dt, "yes" if replayed == live else "NO"))
+    assert replayed == live, "replay differs from the live run"
+
+def filter_recording(seed=3, noise=6, spike_every=97):
+    """
+    A recorded fader gesture with known true positions: hold, fast swipe,
+    hold, slow drag, at 1 kHz. Pad values get noise and occasional spikes.
+    Returns (recording bytes, true positions)
+    """
+    rnd = random.Random(seed)
+    path = [0.3] * 400                                      # hold
+    path += [0.3 + 0.5 * i / 120 for i in range(120)]       # fast swipe
+    path += [0.8] * 400                                     # hold
+    path += [0.8 - 0.4 * i / 1500 for i in range(1500)]     # slow drag
+    scanner = TouchScanner()
+    touchio.raw_source = lambda pin: 1000
+    slider = TouchSlider(fader_pins[0], scanner=scanner)
+    stream = io.BytesIO()
+    recorder = TouchRecorder(scanner, stream)
+    truth = []
+    for n, p in enumerate(path):
+        sector = min(int(p * 2), 1)
+        frac = p * 2 - sector
+        amounts = [0, 0, 0]
+        amounts[sector], amounts[sector + 1] = 400 * (1 - frac), 400 * frac
+        triple = [1150 + a if a else 1000 for a in amounts]  # untouched pads sit at baseline
+        scanner.raw[0], scanner.raw[1], scanner.raw[2] = [int(v) for v in triple]
+        truth.append(slider.pos_fixed())
+        for j in range(3):
+            v = triple[j] + rnd.gauss(0, noise)
+            if n % spike_every == j:
+                v += 150
+            scanner.raw[j] = int(v)
+        recorder.t0 = time.monotonic_ns() - n * 1_000_000  # 1 kHz timestamps
+        recorder.record()
+    recorder.flush()
+    return stream.getvalue(), truth
+
+def bench_filter(duration=0.3):
+    """Position filters: lag, jitter and cost per sample on a recorded gesture"""
+    data, truth = filter_recording()
+    chains = (
+        ("none", lambda: FilterChain()),
+        ("ema", lambda: FilterChain(EMAFilter(3))),
+        ("median", lambda: FilterChain(MedianFilter())),
+        ("1euro", lambda: FilterChain(OneEuroFilter())),
+        ("median+1euro", lambda: FilterChain(MedianFilter(), OneEuroFilter())),
+    )
+    print("  %-13s %10s %10s %10s %12s" % ("", "hold rms", "swipe lag", "drag lag", "us/sample"))
+    for name, make in chains:
+        chain = make()
+        scanner = TouchScanner()
+        touchio.raw_source = lambda pin: 1000
+        slider = TouchSlider(fader_pins[0], scanner=scanner)
+        slider.autoscan = False
+        playback = TouchPlayback(io.BytesIO(data))
+        playback.apply_thresholds(scanner)
+        errs = []
+        while True:
+            t = playback.read_into(scanner.raw)
+            if t is None:
+                break
+            pos = chain.update(slider.pos_fixed(), t // 1000)
+            errs.append(pos - truth[len(errs)])
+        holds = errs[100:400] + errs[620:920]
+        rms = (sum(e * e for e in holds) / len(holds)) ** 0.5
+        swipe = sum(abs(e) for e in errs[400:520]) / 120
+        drag = sum(abs(e) for e in errs[920:]) / len(errs[920:])
+        chain.update(2000, 0)
+        t_ms = [0]
+        def step():
+            t_ms[0] += 1
+            chain.update(2000 + (t_ms[0] & 63), t_ms[0])
+        print("  %-13s %10.1f %10.1f %10.1f %12.2f" %
+              (name, rms, swipe, drag, 1e6 / timeit(step, duration)))
+    print("  (errors in counts of %d, lag is mean error while moving)" % FIXED_ONE)
+
+def spin(turns, seconds, start=0.9, rate=1000, noise=4, seed=4):
+    """Wheel positions (fixed-point) of a spin at constant speed, sampled at rate Hz"""
+    rnd = random.Random(seed)
+    n = int(seconds * rate)
+    return [int((start + turns * k / n) * FIXED_ONE + rnd.gauss(0, noise)) % FIXED_ONE
+            for k in range(n + 1)]
+
+def legacy_steps(positions, segments=16, max_repeats=1):
+    """Steps the HID apps sent before RelativeEncoder, in the same sign as positions"""
+    sent, last = [], None
+    for p in positions:
+        val = int((1 - p / FIXED_ONE) * segments)
+        if last is not None and val != last:
+            chng = last - val
+            sent.append(min(abs(chng), max_repeats) * (1 if chng > 0 else -1))
+        last = val
+    return sent
+
+def encoder_steps(positions, accel=0, rate=1000, **kwargs):
+    encoder = RelativeEncoder(accel=accel, **kwargs)
+    sent = []
+    for k, p in enumerate(positions):
+        n = encoder.update(p, k * 1000 // rate)
+        if n:
+            sent.append(n)
+    return sent
+
+def bench_encoder(duration=0.3):
+    """Wheel spins over the wrap point, old slider_state steps vs RelativeEncoder"""
+    gestures = (("slow cw, 1 turn in 2 s", spin(1, 2.0)),
+                ("fast ccw, 3 turns in 1 s", spin(-3, 1.0)),
+                ("back and forth over the seam", [p for k in range(6) for p in
+                                                  spin(-0.2 if k % 2 else 0.2, 0.2,
+                                                       start=0.1 if k % 2 else 0.9, seed=k)]),
+                ("very fast cw, 2 turns in 0.25 s", spin(2, 0.25)))
+    for name, positions in gestures:
+        moved = 0  # shortest-arc distance actually travelled, in turns
+        for a, b in zip(positions, positions[1:]):
+            moved += (((b - a) + FIXED_ONE // 2) % FIXED_ONE - FIXED_ONE // 2) / FIXED_ONE
+        print("  %s, expect %+d steps" % (name, round(moved * 16)))
+        want = round(moved * 16)
+        for label, sent in (("old", legacy_steps(positions)),
+                            ("encoder", encoder_steps(positions)),
+                            ("accel", encoder_steps(positions, accel=1.0))):
+            wrong_way = sum(1 for n in sent if n * want < 0)
+            backwards = ("%3d sends backwards" % wrong_way) if want else ""
+            print("    %-8s %+4d steps in %3d sends %s" % (label, sum(sent), len(sent), backwards))
+            if label == "encoder":
+                assert sum(sent) == want and not wrong_way, "encoder %+d steps, not %+d" % (sum(sent), want)
+            elif label == "accel" and want:
+                assert abs(sum(sent)) >= abs(want) and not wrong_way, "accel %+d steps" % sum(sent)
+            elif label == "accel":
+                # each way is accelerated by its own speed, and at about
+                # accel_speed the noise decides, so there and back again can
+                # end a step off
+                assert abs(sum(sent)) <= 1, "accel %+d steps there and back" % sum(sent)
+    positions = spin(3, 1.0)
+    encoder = RelativeEncoder(accel=1.0)
+    i = [0]
+    def step():
+        i[0] += 1
+        encoder.update(positions[i[0] % len(positions)], i[0])
+    print("  RelativeEncoder.update %.2f us/call" % (1e6 / timeit(step, duration)))
+
+class FakeHIDDevice():
+    """Keyboard/ConsumerControl-like device whose send() blocks for press and release reports"""
+    def __init__(self, report_latency):
+        self.report_latency = report_latency
+        self.sends = 0
+
+    def send(self, *codes):
+        busy_wait(2 * self.report_latency)
+        self.sends += 1
+
+def bench_hidqueue(report_latency=0.002, scan_cost=0.0005, turns=-4, seconds=0.5):
+    """Loop times during a fast wheel spin, HID sends inline vs through HIDQueue"""
+    for name, per_loop in (("inline", None), ("queue 1/loop", 1), ("queue 2/loop", 2)):
+        device = FakeHIDDevice(report_latency)
+        queue = HIDQueue(per_loop=per_loop or 1)
+        encoder = RelativeEncoder(accel=1.0)
+        times, wanted, t_last = [], 0, 0
+        t_start = time.perf_counter()
+        while True:
+            t0 = time.perf_counter()
+            t = t0 - t_start
+            if t > 4 * seconds:
+                break
+            busy_wait(scan_cost)
+            # the finger moves with time, however long loops take
+            pos = int((0.9 + turns * t / seconds) * FIXED_ONE) % FIXED_ONE if t < seconds else None
+            steps = encoder.update(pos, int(t * 1e3))
+            wanted += abs(steps)
+            if steps and per_loop is None:
+                for _ in range(abs(steps)):
+                    device.send(0xe9 if steps > 0 else 0xea)
+                t_last = time.perf_counter() - t_start
+            elif steps:
+                queue.put(device, (0xe9 if steps > 0 else 0xea,), abs(steps))
+            sends = device.sends
+            queue.drain()
+            if device.sends != sends:
+                t_last = time.perf_counter() - t_start
+            times.append((t, time.perf_counter() - t0))
+        spinning = [dt for t, dt in times if t < seconds]
+        mean, p99, worst = loop_stats(spinning)
+        print("  %-13s %4.0f loops/s while spinning, loop p99 %5.2f max %5.2f ms, "
+              "%d/%d sent, last %3.0f ms after release" %
+              (name, len(spinning) / seconds, p99, worst, device.sends, wanted,
+               max(0, t_last - seconds) * 1e3))
+        assert device.sends == wanted, "%s: %d of %d sent" % (name, device.sends, wanted)
+    # repeats past max_count go in the next slot, only a full queue drops any
+    device = NullHIDDevice()
+    queue = HIDQueue(size=2, max_count=255)
+    assert queue.put(device, (1,), 300) and queue.pending() == 300
+    assert not queue.put(device, (1,), 300) and queue.pending() == 510 and queue.dropped == 90
+    print("  300 repeats then 300 more into 2 slots of 255: %d queued, %d dropped" %
+          (queue.pending(), queue.dropped))
+
+class NullHIDDevice():
+    def send(self, *codes):
+        pass
+
+def bench_dispatch(duration=0.5):
+    """Firing a slider action: do_hid_action's checks every time vs compile_actions() table"""
+    keyboard, cc = NullHIDDevice(), NullHIDDevice()
+    hid_actions = {
+        "button": tuple((keyboard, "", (0xe0, 0x3a + i)) for i in range(9)),
+        "slider": tuple((cc, 16, "", (0xea,), (0xe9,)) for i in range(5)),
+    }
+    queue = HIDQueue(per_loop=64)
+
+    def do_hid_action(group, index, option=0, repeats=1):
+        # as it was in hid_media/code.py, minus the `type(device)` check
+        if not group in hid_actions or index >= len(hid_actions[group]):
+            return False
+        action = hid_actions[group][index]
+        if len(action) < 3 + option:
+            return False
+        device = action[0]
+        action = hid_actions[group][index]
+        if not type(action) is tuple:
+            return False
+        if len(action) < (4 if group == "slider" else 3) + option:
+            return False
+        command = action[(3 if group == "slider" else 2) + option]
+        if not type(command) is tuple or not type(command[0]) is int:
+            return False
+        repeats = int(min(max(repeats, 1), 4))
+        return queue.put(device, command, repeats)
+
+    actions = compile_actions(hid_actions, num_buttons=9, num_sliders=5)
+    def table(i=3, steps=2):
+        action = actions.sliders[2*i + (steps > 0)] if steps else None
+        if action:
+            queue.put(action[0], action[1], abs(steps))
+
+    for name, func in (("do_hid_action", lambda: do_hid_action("slider", 3, 1, 2)),
+                       ("table", table)):
+        def fire():
+            func()
+            queue.clear()
+        print("  %-14s %5.2f us/action" % (name, 1e6 / timeit(fire, duration)))
+    for bad in ({"slider": ((cc, 16, "", (0xea,)),)}, {"button": ((cc, "", 0xe9),)},
+                {"button": (("keyboard", "", (1,)),)}, {"buttons": ()}):
+        try:
+            compile_actions(bad)
+        except ValueError as e:
+            print("  rejected at boot:", e)
+            continue
+        raise AssertionError("not rejected: %r" % (bad,))
+
+class CountingHIDDevice():
+    def __init__(self):
+        self.sent = []
+
+    def send(self, *codes):
+        self.sent.append(codes)
+
+def bench_profile(switches=30, hold_time=0.02):
+    """Holding "*" to switch profiles: step times, imports and icon labels made by switching"""
+    star = [False]
+    touchio.raw_source = lambda pin: 1400 if star[0] and pin.name == "GP13" else 1000
+    device = CountingHIDDevice()
+    def hid_actions(first):
+        return {
+            "button": tuple((device, "🔇" if i % 2 else "", (first + i,)) for i in range(9)),
+            "slider": tuple((device, 16, "🔊" if i == 4 else "", (first + 0x20,), (first + 0x21,))
+                            for i in range(5)),
+        }
+    made = [0]
+    make_label = slider_display._emoji_label
+    def counting_label(text):
+        made[0] += 1
+        return make_label(text)
+    slider_display._emoji_label = counting_label
+    port = FakeMidiPort()
+    profiles = ProfileManager((("midi", MidiBackend(port)),
+                               ("media", HIDBackend(hid_actions(0x10))),
+                               ("hotkeys", HIDBackend(hid_actions(0x40)))), hold_time=hold_time)
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        controller = Controller(profiles, LAYOUT)
+        while controller.startup:
+            controller.step()
+        made_at_boot = made[0]
+        steps, switch_steps = [], []
+        modules = len(sys.modules)
+        for n in range(switches):
+            star[0] = True
+            while True:
+                before = profiles.switches
+                t0 = time.perf_counter()
+                controller.step()
+                dt = time.perf_counter() - t0
+                if profiles.switches != before:
+                    switch_steps.append(dt)
+                    break
+                steps.append(dt)
+            star[0] = False
+            controller.step()
+        imports = len(sys.modules) - modules
+        # a tap of "*" is still the active profile's button
+        while profiles.active != 1:
+            profiles.select(profiles.active + 1)
+        device.sent.clear()
+        star[0] = True
+        controller.step()
+        star[0] = False
+        controller.step()
+        controller.step()
+    finally:
+        sys.stdout = stdout
+        slider_display._emoji_label = make_label
+    print("  %d switches, ended on profile %d (%s)" %
+          (profiles.switches, profiles.active, profiles.names[profiles.active]))
+    print("  step           mean %.3f p99 %.3f max %.3f ms" % loop_stats(steps))
+    print("  switching step mean %.3f p99 %.3f max %.3f ms" % loop_stats(switch_steps))
+    print("  icon labels made at boot %d, while switching %d, modules imported while switching %d"
+          % (made_at_boot, made[0] - made_at_boot, imports))
+    print("  tap of \"*\" sends %s" % device.sent)
+    assert device.sent == [(0x10 + 8,)], "tap of \"*\" didn't reach the active profile"
+    assert made[0] == made_at_boot and not imports, "switching made labels or imported modules"
+
+def bench_boot(runs=5):
+    """Startup with an icon per pad and slider, display brought up in the constructor vs deferred"""
+    held = [False]  # pad 1, touched once the pads are set up
+    touchio.raw_source = lambda pin: 1500 if held[0] and pin.name == "GP22" else 1000
+    device = CountingHIDDevice()
+    hid_actions = {
+        "button": tuple((device, "🔇", (0x10 + i,)) for i in range(9)),
+        "slider": tuple((device, 16, "🔊", (0x30,), (0x31,)) for i in range(5)),
+    }
+    for name, defer in (("in constructor", False), ("deferred", True)):
+        results = []
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            for _ in range(runs):
+                held[0] = False
+                timer = BootTimer(report=None)
+                controller = Controller(HIDBackend(hid_actions), LAYOUT, defer_display=defer,
+                                        boot_timer=timer)
+                held[0] = True
+                steps = 0
+                while steps < 2 or controller.startup:
+                    controller.step()
+                    steps += 1
+                results.append((timer.times["first scan"], timer.times["first usb"],
+                                timer.times["display"], steps))
+        finally:
+            sys.stdout = stdout
+        scan, usb, display, steps = (sorted(r[k] for r in results)[runs // 2] for k in range(4))
+        print("  %-15s first scan %4d ms  first usb %4d ms  display done %4d ms  (%d steps)" %
+              (name, scan, usb, display, steps))
+
+def bench_atlas(runs=5):
+    """hid_media's icons: an EmojiLabel per icon vs tiles of the emoji_atlas sprite sheet"""
+    pad_icons = ("", "", "", "", "⏏️", "🔇", "⏮️", "⏭️", "⏯️")
+    slider_icons = ("", "", "🔆", "⏩", "🔊")
+    cwd = os.getcwd()
+    os.chdir(os.path.join(HERE, "..", "hid_media"))  # for emoji/ and emoji_atlas.*
+    try:
+        for name, use_atlas in (("no icons", None), ("EmojiLabel", False), ("atlas", True)):
+            times, heap = [], []
+            for _ in range(runs):
+                opened = displayio.files_opened + adafruit_display_emoji_text.files_read
+                tracemalloc.start()
+                t0 = time.perf_counter()
+                atlas = IconAtlas("emoji_atlas") if use_atlas else None
+                widgets = [FaderDisplay(10 + 15*i, 10, 8, 35, atlas=atlas) for i in range(3)]
+                widgets += [WheelDisplay(70 + 35*i, 25, 15, knob_w=9, atlas=atlas) for i in range(2)]
+                pads = PadsDisplay(20, 50, n=9, atlas=atlas)
+                if use_atlas is not None:
+                    for i, icon in enumerate(pad_icons):
+                        pads.icon(i, icon)
+                    for w, icon in zip(widgets, slider_icons):
+                        w.icon(icon)
+                times.append(time.perf_counter() - t0)
+                heap.append(tracemalloc.get_traced_memory()[0])
+                tracemalloc.stop()
+                opened = displayio.files_opened + adafruit_display_emoji_text.files_read - opened
+            if use_atlas is None:
+                base_heap = sorted(heap)[runs // 2]
+                continue
+            # pixels held in RAM: each label's Bitmap, the atlas keeps its pixels on flash
+            icons = pads.icons + [getattr(w, "knob_icon", None) or w.center_icon for w in widgets]
+            pixels = sum(len(t.bitmap.buffer) for icon in icons if icon.label
+                         for t in icon.label if hasattr(t.bitmap, "buffer"))
+            # swapping pad 5's icon back and forth, once each has been shown
+            pads.icon(5, "⏏️")
+            writes, t0 = displayio.writes, time.perf_counter()
+            tracemalloc.start()
+            for n in range(1000):
+                pads.icon(5, "🔇" if n % 2 else "⏏️")
+            swap_heap = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            swap_us = (time.perf_counter() - t0) * 1e3
+            print("  %-10s setup %5.1f ms  %2d files read  icons' host heap %5d bytes  icon bitmaps %3d bytes" %
+                  (name, 1e3 * sorted(times)[runs // 2], opened, sorted(heap)[runs // 2] - base_heap,
+                   pixels))
+            print("  %-10s icon change %5.2f us  %.1f displayio writes  peak heap %d bytes" %
+                  ("", swap_us, (displayio.writes - writes) / 1000, swap_heap))
+    finally:
+        os.chdir(cwd)
+
+def wheel_finger(turns_per_step=0.01):
+    """raw_source of a finger going around wheel X, a little further each scan of GP7"""
+    step = [0]
+    def source(pin):
+        name = pin.name
+        if name == "GP7":
+            step[0] += 1
+        if name not in ("GP7", "GP8", "GP9"):
+            return 1000
+        p = (step[0] * turns_per_step) % 1.0
+        d = abs(p - ("GP7", "GP8", "GP9").index(name) / 3)
+        d = min(d, 1 - d)
+        return 1000 + int(500 * max(0.0, 1 - 3 * d))
+    return source
+
+def bench_loopprofile(steps=3000, report_latency=0.001):
+    """Step cost with the loop profiler off and on, and touch-to-USB latency it measures"""
+    port = FakeMidiPort()
+    slow = FakeHIDDevice(report_latency)
+    hid_actions = {
+        "button": tuple((slow, "", (0x10 + i,)) for i in range(9)),
+        "slider": tuple((slow, 8, "", (0xe9,), (0xea,)) for i in range(5)),
+    }
+    for name, make_backend in (("MIDI", lambda: MidiBackend(port)),
+                               ("HID", lambda: HIDBackend(hid_actions))):
+        for profiled in (False, True):
+            touchio.raw_source = lambda pin: 1000
+            lines = []
+            profiler = LoopProfiler(report_every=None, report=lines.append) if profiled else None
+            stdout, sys.stdout = sys.stdout, io.StringIO()
+            try:
+                controller = Controller(make_backend(), LAYOUT, loop_profile=profiler)
+                while controller.startup:
+                    controller.step()
+                if profiler:
+                    profiler.clear()
+                touchio.raw_source = wheel_finger()
+                times = []
+                for _ in range(steps):
+                    t0 = time.perf_counter()
+                    controller.step()
+                    times.append(time.perf_counter() - t0)
+            finally:
+                sys.stdout = stdout
+            print("  %-4s profiler %-3s step mean %.3f p99 %.3f max %.3f ms" %
+                  ((name, "on" if profiled else "off") + loop_stats(times)))
+            if profiler:
+                profiler.report()
+                for line in lines:
+                    print("    " + line)
+
+def bench_calstore(duration=0.3, steps=200):
+    """Calibration blob round trips, damaged blobs refused, load time, a pad held through boot, pads drifted up"""
+    import tempfile
+    held = [False]  # pad 1
+    touchio.raw_source = lambda pin: 1500 if held[0] and pin.name == "GP22" else 1000
+    port = FakeMidiPort()
+    controller = Controller(MidiBackend(port), LAYOUT, use_display=False)
+    controller.sliders[0].gains = [1.0, 1.1, 0.9]
+    tables = [None, None, None, identity_table(), identity_table()]
+    cal = calstore.from_controller(controller, tables)
+    blob = calstore.pack(cal)
+    microcontroller.nvm[:] = b"\xff" * len(microcontroller.nvm)
+    calstore.save(cal, "nvm")
+    path = os.path.join(tempfile.gettempdir(), "bench_cal.bin")
+    calstore.save(cal, path)
+    loaded = (calstore.unpack(blob), calstore.load("nvm"), calstore.load(path))
+    print("  %d byte blob, round trip matches: unpack %s  nvm %s  file %s" %
+          (len(blob), *("yes" if c == cal else "NO" for c in loaded)))
+    assert all(c == cal for c in loaded), "calibration changed on the way through"
+
+    def refused(what):
+        try:
+            what()
+        except ValueError as e:
+            return "refused (%s)" % e
+        return "ACCEPTED"
+    flipped = bytearray(blob)
+    flipped[-3] ^= 0x10
+    old = bytearray(blob)
+    old[4] = calstore.VERSION + 1
+    small = dict(LAYOUT, pads=dict(LAYOUT["pads"], pins=LAYOUT["pads"]["pins"][:4]))
+    for name, what in (("flipped bit", lambda: calstore.unpack(flipped)),
+                       ("cut short", lambda: calstore.unpack(blob[:-10])),
+                       ("other version", lambda: calstore.unpack(old)),
+                       ("erased nvm", lambda: calstore.unpack(b"\xff" * 64)),
+                       ("other layout", lambda: cal.apply(Controller(MidiBackend(port), small,
+                                                                      use_display=False)))):
+        result = refused(what)
+        print("  %-13s %s" % (name, result))
+        assert result != "ACCEPTED", "%s calibration accepted" % name
+    print("  load+apply  nvm %.1f us  file %.1f us" %
+          (1e6 / timeit(lambda: calstore.load("nvm").apply(controller), duration),
+           1e6 / timeit(lambda: calstore.load(path).apply(controller), duration)))
+    os.remove(path)
+
+    for name, where in (("uncalibrated", None), ("calibrated", "nvm")):
+        held[0] = True  # from power up
+        stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            controller = Controller(MidiBackend(port), LAYOUT, use_display=False,
+                                    calibration=where)
+            seen = []
+            for phase in (True, False, True):  # held, let go, touched again
+                held[0] = phase
+                n = 0
+                for _ in range(steps):
+                    controller.step()
+                    n += controller.pad_state[0]
+                seen.append(n)
+        finally:
+            sys.stdout = stdout
+        print("  pad held through boot, %-12s steps seen pressed: held %s  let go %s  touched again %s" %
+              ((name,) + tuple("%3d/%d" % (n, steps) for n in seen)))
+        # uncalibrated, the held pad is taken for untouched, calibrated it's seen
+        assert seen[0] == (steps if where else 0) and seen[1] == 0, "%s: %r" % (name, seen)
+        assert seen[2] == steps or not where, "%s: %r" % (name, seen)
+
+    # untouched readings drifted up past the saved calibration's thresholds
+    touchio.raw_source = lambda pin: 1300
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        controller = Controller(MidiBackend(port), LAYOUT, use_display=False,
+                                calibration="nvm")
+        stuck = controller.baselines.every * controller.baselines.max_held
+        controller.step()
+        pressed_at_boot = sum(controller.pad_state)
+        for _ in range(stuck + steps):
+            controller.step()
+    finally:
+        sys.stdout = stdout
+    print("  drifted up 300 after calibration: %d pads pressed at boot, %d after %d steps" %
+          (pressed_at_boot, sum(controller.pad_state), stuck + steps))
+    assert pressed_at_boot, "drift didn't press the pads, nothing tested"
+    assert not any(controller.pad_state), "pads stuck pressed after an upward drift"
+
+def finger_frames(fingers, pads=3, wrap=True, seed=1, width=0.9, amp=400, noise=5):
+    """
+    Frames of pads responding like bell_sweep() to any number of fingers,
+    fingers is a list of each frame's finger positions in pads.
+    """
+    rng = random.Random(seed)
+    base = (1010, 985, 1030, 995, 1020, 1005, 990, 1015)[:pads]
+    frames = []
+    for positions in fingers:
+        frame = []
+        for j in range(pads):
+            rise = 0
+            for p in positions:
+                d = abs(p % pads - j) if wrap else abs(p - j)
+                if wrap:
+                    d = min(d, pads - d)
+                rise += amp * (1 + rng.uniform(-0.03, 0.03)) * math.exp(-(d / width) ** 2)
+            frame.append(min(base[j] + int(rise) + rng.randint(-noise, noise), 0xffff))
+        frames.append(frame)
+    return frames
+
+def bench_gestures(duration=0.3, n=1000):
+    """Multi-touch on the wheels: one finger never taken for two, two-finger turns and pinches"""
+    touchio.raw_source = lambda pin: 1000
+    for pads in (3, 5):
+        scanner = TouchScanner()
+        wheel = TouchWheel([str(j) for j in range(pads)], scanner=scanner)
+        # fingers' distance in pads turning, and a pinch's start and change,
+        # under half the wheel apart so the shorter way between them stays the same
+        apart, close, pinch = (1.0, 0.7, 0.5) if pads == 3 else (1.5, 1.5, 0.8)
+        moves = (
+            ("one finger", [[k / n * pads] for k in range(n)]),
+            ("turn", [[c - apart / 2, c + apart / 2] for c in (k / n * pads for k in range(n))]),
+            ("turn back", [[c - apart / 2, c + apart / 2] for c in (-k / n * pads for k in range(n))]),
+            ("pinch apart", [[1 - d / 2, 1 + d / 2] for d in (close + k / n * pinch for k in range(n))]),
+            ("pinch together", [[1 - d / 2, 1 + d / 2] for d in (close + pinch - k / n * pinch
+                                                                for k in range(n))]),
+        )
+        for name, fingers in moves:
+            gesture = TwoFingerGesture()
+            two = 0
+            steps = {"rotate": 0, "pinch": 0}
+            for frame in finger_frames(fingers, pads=pads, seed=len(name)):
+                scanner.raw[0:pads] = array.array('H', frame)
+                wheel.pos_fixed()
+                if wheel.touches > 1:
+                    two += 1
+                    moved = gesture.update(wheel.center, wheel.spread)
+                    if moved:
+                        steps[gesture.kind] += moved
+                elif gesture.frames:
+                    gesture.reset()
+            print("  %d-pad wheel %-14s %4d/%d frames two fingers, rotate %+3d steps, pinch %+3d steps" %
+                  (pads, name, two, n, steps["rotate"], steps["pinch"]))
+            # a 3-pad wheel can't tell two fingers from one pressed flat over all three
+            if name == "one finger" or pads == 3:
+                assert two == 0, "%d-pad %s taken for two fingers" % (pads, name)
+            elif name.startswith("turn"):
+                assert abs(steps["rotate"]) >= 14 and not steps["pinch"], "%s: %r" % (name, steps)
+                assert (steps["rotate"] > 0) == (name == "turn"), "%s: %r" % (name, steps)
+            else:
+                assert steps["pinch"] and not steps["rotate"], "%s: %r" % (name, steps)
+                assert (steps["pinch"] > 0) == (name == "pinch apart"), "%s: %r" % (name, steps)
+        one, two = finger_frames([[0.5]], pads=pads)[0], finger_frames([[0, apart]], pads=pads)[0]
+        costs = []
+        for frame in (one, two):
+            scanner.raw[0:pads] = array.array('H', frame)
+            costs.append(1e6 / timeit(wheel.pos_fixed, duration))
+        print("  %d-pad wheel pos_fixed() %.2f us one finger, %.2f us two fingers" %
+              ((pads,) + tuple(costs)))
+
+    # one firm finger pressed flat in the middle of a 3-pad wheel
+    scanner = TouchScanner()
+    wheel = TouchWheel([str(j) for j in range(3)], scanner=scanner)
+    scanner.raw[0:3] = array.array('H', (1400, 1400, 1400))
+    wheel.pos_fixed()
+    print("  3-pad wheel, one firm finger on every pad: %d touches" % wheel.touches)
+    assert wheel.touches == 1, "one firm finger taken for two"
+
+    # through Controller and MidiBackend: two fingers two pads apart turning a 5-pad
+    # wheel X once, any closer and they can look like one between two pads
+    pins = ("GP7", "GP8", "GP9", "GP10", "GP11")
+    layout = dict(LAYOUT, sliders=LAYOUT["sliders"][:3] + (dict(LAYOUT["sliders"][3], pins=pins),))
+    frames = finger_frames([[c - 1, c + 1] for c in (k / n * 5 for k in range(n))],
+                           pads=5, seed=3)
+    step = [0]
+    def source(pin):
+        name = pin.name
+        if name == "GP7":
+            step[0] += 1
+        if name not in pins:
+            return 1000
+        return frames[min(step[0], n - 1)][pins.index(name)]
+    touchio.raw_source = lambda pin: 1000
+    port = FakeMidiPort()
+    stdout, sys.stdout = sys.stdout, io.StringIO()
+    try:
+        controller = Controller(MidiBackend(port, gesture_ccs=(None, None, None, (20, 21))),
+                                layout, use_display=False)
+        touchio.raw_source = source
+        for _ in range(n):
+            controller.step()
+    finally:
+        sys.stdout = stdout
+    data = bytes(port.data)
+    ccs = [data[k + 1] for k in range(0, len(data), 3) if data[k] & 0xf0 == 0xb0]
+    print("  Controller 5-pad wheel X two-finger turn: %d rotate CCs (cc 20), %d slider CCs (cc 74)" %
+          (ccs.count(20), ccs.count(74)))
+    assert ccs.count(20) and not ccs.count(74), "two fingers moved wheel X's knob"
+
+benchmarks = {
+    "scan": bench_scan,
+    "fixed": bench_fixed,
+    "npad": bench_npad,
+    "centroid": bench_centroid,
+    "linearize": bench_linearize,
+    "norm": bench_norm,
+    "drift": bench_drift,
+    "display": bench_display,
+    "refresh": bench_refresh,
+    "cc": bench_cc,
+    "midiout": bench_midiout,
+    "cc14": bench_cc14,
+    "replay": bench_replay,
+    "filter": bench_filter,
+    "encoder": bench_encoder,
+    "hidqueue": bench_hidqueue,
+    "dispatch": bench_dispatch,
+    "profile": bench_profile,
+    "boot": bench_boot,
+    "atlas": bench_atlas,
+    "loopprofile": bench_loopprofile,
+    "calstore": bench_calstore,
+    "gestures": bench_gestures,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or benchmarks:
+        print(name + ":", benchmarks[name].__doc__)
+        benchmarks[name]()
@@ -0,0 +1,18 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`board` stand-in for running picoslidertoy code on a host computer.
+Has the Raspberry Pi Pico's GPx pins.
+"""
+
+class Pin():
+    """Fake microcontroller.Pin, known by its name"""
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "board." + self.name
+
+for _n in range(29):
+    globals()["GP%d" % _n] = Pin("GP%d" % _n)
+LED = GP25
@@ -0,0 +1,13 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`busio` stand-in for running picoslidertoy code on a host computer.
+"""
+
+class I2C():
+    """Fake busio.I2C, nothing is ever sent"""
+    def __init__(self, scl, sda, *, frequency=100_000, timeout=255):
+        self.scl, self.sda, self.frequency = scl, sda, frequency
+
+    def deinit(self):
+        pass
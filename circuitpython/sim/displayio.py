@@ -0,0 +1,119 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`displayio` stand-in for running picoslidertoy code on a host computer.
+
+Only draw state is kept, nothing is rendered. Every write of x, y or hidden
+on a Group or vectorio shape, of a TileGrid tile, and every append, insert
+or remove on a Group is counted in `writes`,
+since on the device each one can mark the display dirty. Bitmaps keep a
+buffer the size CircuitPython would allocate, and every file opened by an
+OnDiskBitmap is counted in `files_opened`.
+"""
+
+import struct
+
+writes = 0
+files_opened = 0
+
+class _Placed():
+    """x, y and hidden properties that count their writes"""
+    def __init__(self, x=0, y=0):
+        self._x, self._y, self._hidden = x, y, False
+
+    def _set(self, name, v):
+        global writes
+        writes += 1
+        setattr(self, name, v)
+
+    x = property(lambda self: self._x, lambda self, v: self._set("_x", v))
+    y = property(lambda self: self._y, lambda self, v: self._set("_y", v))
+    hidden = property(lambda self: self._hidden, lambda self, v: self._set("_hidden", v))
+
+class Group(_Placed, list):
+    """Fake displayio.Group, a list of drawables"""
+    def __init__(self, *, x=0, y=0, scale=1):
+        list.__init__(self)
+        _Placed.__init__(self, x, y)
+        self.scale = scale
+
+    def append(self, layer):
+        global writes
+        writes += 1
+        list.append(self, layer)
+
+    def insert(self, i, layer):
+        global writes
+        writes += 1
+        list.insert(self, i, layer)
+
+    def remove(self, layer):
+        global writes
+        writes += 1
+        list.remove(self, layer)
+
+class Palette(list):
+    """Fake displayio.Palette"""
+    def __init__(self, color_count):
+        super().__init__([0] * color_count)
+        self.transparent = set()
+
+    def make_transparent(self, i):
+        self.transparent.add(i)
+
+    def make_opaque(self, i):
+        self.transparent.discard(i)
+
+class Bitmap():
+    """Fake displayio.Bitmap, its buffer is sized like CircuitPython's"""
+    def __init__(self, width, height, value_count):
+        self.width, self.height = width, height
+        bits = 1
+        while (1 << bits) < value_count:
+            bits *= 2
+        self.bits_per_value = bits
+        stride = (width * bits + 31) // 32  # in 32-bit words
+        self.buffer = bytearray(stride * 4 * height)
+
+class OnDiskBitmap():
+    """Fake displayio.OnDiskBitmap, reads the BMP header, pixels stay in the file"""
+    def __init__(self, file):
+        global files_opened
+        if isinstance(file, str):
+            file = open(file, "rb")
+        files_opened += 1
+        self.file = file
+        header = file.read(54)
+        if header[:2] != b"BM":
+            raise ValueError("Invalid BMP file")
+        self.width, height, _, bits = struct.unpack("<iiHH", header[18:30])
+        self.height = abs(height)
+        colors = struct.unpack("<I", header[46:50])[0] or (1 << bits if bits <= 8 else 0)
+        self.pixel_shader = Palette(colors)
+
+class TileGrid(_Placed):
+    """Fake displayio.TileGrid, setting a tile counts as a write"""
+    def __init__(self, bitmap, *, pixel_shader, width=1, height=1, tile_width=None,
+                 tile_height=None, default_tile=0, x=0, y=0):
+        _Placed.__init__(self, x, y)
+        self.bitmap, self.pixel_shader = bitmap, pixel_shader
+        self.width, self.height = width, height
+        self.tile_width = tile_width or bitmap.width
+        self.tile_height = tile_height or bitmap.height
+        self.tiles = [default_tile] * (width * height)
+
+    def __getitem__(self, i):
+        return self.tiles[i]
+
+    def __setitem__(self, i, tile):
+        global writes
+        writes += 1
+        self.tiles[i] = tile
+
+class I2CDisplay():
+    """Fake displayio.I2CDisplay, the older name of i2cdisplaybus.I2CDisplayBus"""
+    def __init__(self, i2c_bus, *, device_address, reset=None):
+        self.i2c_bus, self.device_address = i2c_bus, device_address
+
+def release_displays():
+    pass
@@ -0,0 +1,10 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`i2cdisplaybus` stand-in for running picoslidertoy code on a host computer.
+"""
+
+class I2CDisplayBus():
+    """Fake i2cdisplaybus.I2CDisplayBus"""
+    def __init__(self, i2c_bus, *, device_address, reset=None):
+        self.i2c_bus, self.device_address = i2c_bus, device_address
@@ -0,0 +1,10 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`microcontroller` stand-in for running picoslidertoy code on a host computer.
+
+`nvm` is a bytearray the size of the RP2040's, erased like fresh flash.
+run.py --nvm fills it from a file before the app runs and saves it after.
+"""
+
+nvm = bytearray(b"\xff" * 4096)
@@ -0,0 +1,8 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`micropython` stand-in for running picoslidertoy code on a host computer.
+"""
+
+def const(x):
+    return x
@@ -0,0 +1,251 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+Run a picoslidertoy app's code.py on a host computer against the stand-ins
+in this directory, for a bounded number of loop iterations, and report
+loop timing and what was sent over USB.
+
+  python3 circuitpython/sim/run.py midi_sliders --loops 2000
+  python3 circuitpython/sim/run.py --all
+  python3 circuitpython/sim/run.py hid_media --replay gesture.rec
+
+The touch pins follow a scripted demo gesture, or a recording made with
+touchrecord.py (--record makes one from the app itself). --profile turns on
+the app's loopprofile.py summary of where its loop time goes. --nvm keeps
+microcontroller.nvm in a file, where the calibrate app saves the
+calibration and the other apps load it, without it nvm starts out erased:
+  python3 circuitpython/sim/run.py calibrate --nvm /tmp/nvm.bin --loops 12000
+  python3 circuitpython/sim/run.py midi_sliders --nvm /tmp/nvm.bin
+
+The app's top-level `while True:` is run as a counted loop. Between
+iterations touchio steps to its next frame and displays with auto_refresh
+get their background refresh. The app's print() output is dropped unless
+--show-output is given. The HID apps need the real adafruit_hid library:
+  pip install adafruit-circuitpython-hid
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APPS_DIR = os.path.dirname(HERE)
+
+# pin names of each slider's pads and of the pads, same on every app
+SLIDER_PINS = (("GP4", "GP0", "GP28"), ("GP5", "GP1", "GP27"), ("GP3", "GP2", "GP26"),
+               ("GP7", "GP8", "GP9"), ("GP10", "GP11", "GP12"))
+PAD_PINS = ("GP22", "GP21", "GP20", "GP19", "GP18", "GP17", "GP16", "GP6", "GP13")
+
+def demo_gesture(traces, period=400, touch_amount=400):
+    """
+    Fill touchio traces with a repeating demo: a finger sweeps along each
+    slider in turn, then the pads get tapped one after another.
+    """
+    phases = len(SLIDER_PINS) + 1
+
+    def slider_trace(s, j):
+        def trace(frame):
+            if (frame // period) % phases != s or frame % period >= period * 3 // 4:
+                return 1000
+            p = (frame % period) / (period * 3 // 4) * 2  # across the three pads
+            return 1000 + max(0, int(touch_amount * (1.1 - abs(p - j))))
+        return trace
+
+    def pad_trace(j):
+        def trace(frame):
+            touched = ((frame // period) % phases == phases - 1 and
+                       (frame % period) * len(PAD_PINS) // period == j and frame % 20 < 15)
+            return 1000 + touch_amount if touched else 1000
+        return trace
+
+    for s, pins in enumerate(SLIDER_PINS):
+        for j, pin in enumerate(pins):
+            traces[pin] = slider_trace(s, j)
+    for j, pin in enumerate(PAD_PINS):
+        traces[pin] = pad_trace(j)
+
+class _NullOutput():
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+def percentile(sorted_times, p):
+    return sorted_times[min(len(sorted_times) - 1, int(len(sorted_times) * p))]
+
+def load_recording(path, traces, thresholds):
+    """Fill touchio traces and thresholds from a touchrecord.py file, returns frame count"""
+    sys.path.append(os.path.join(APPS_DIR, "lib"))
+    from picoslidertoy.touchrecord import TouchPlayback
+    with open(path, "rb") as f:
+        playback = TouchPlayback(f)
+        times, columns = playback.traces()
+    for name, t in zip(playback.names, playback.thresholds):
+        pin = name.split(".")[-1]  # names are "board.GP4" on CircuitPython
+        traces[pin] = columns[name]
+        thresholds[pin] = t
+    return len(times)
+
+def run_app(app, loops=None, show_output=False, read_us=0, replay=None, record=None,
+            profile=False, nvm=None):
+    """
+    Run app's code.py for `loops` iterations and print a timing report.
+    replay: touchrecord.py file to play back instead of the demo gesture,
+            by default all of its frames are run
+    record: file for the app to record its touch values to
+    profile: give the app a LoopProfiler and print its summary of the whole run
+    nvm: file holding microcontroller.nvm, read before the app runs and written after
+    """
+    app_dir = os.path.join(APPS_DIR, app)
+    sys.path[:0] = [HERE, app_dir, os.path.join(APPS_DIR, "lib")]
+    os.chdir(app_dir)  # files are opened relative to the CIRCUITPY root
+
+    import touchio
+    import displayio
+    import usb_midi
+    import usb_hid
+    import adafruit_displayio_ssd1306
+    import microcontroller
+
+    with open("code.py") as f:
+        source = f.read()
+    source, found = re.subn(r"^while True:", "for _sim_loop in _sim_loops():", source,
+                            count=1, flags=re.M)
+    if not found:
+        sys.exit("%s/code.py has no top-level 'while True:' loop" % app)
+    if record:
+        source, found = re.subn(r"^touch_record = None", "touch_record = %r" % record, source,
+                                count=1, flags=re.M)
+        if not found:
+            sys.exit("%s/code.py has no 'touch_record = None' setting" % app)
+    if profile:
+        source, found = re.subn(r"^loop_profile = None", "loop_profile = _sim_profiler", source,
+                                count=1, flags=re.M)
+        if not found:
+            print("%s/code.py has no 'loop_profile = None' setting, not profiling" % app)
+            profile = False
+
+    if nvm and os.path.exists(nvm):
+        with open(nvm, "rb") as f:
+            data = f.read(len(microcontroller.nvm))
+        microcontroller.nvm[0:len(data)] = data
+
+    if replay:
+        frames = load_recording(replay, touchio.traces, touchio.thresholds)
+        loops = loops or frames
+    else:
+        demo_gesture(touchio.traces)
+        loops = loops or 2000
+    touchio.read_cost = read_us / 1e6
+    sleeps = [0.0]
+    def fake_sleep(seconds):
+        sleeps[0] += seconds
+    time.sleep = fake_sleep  # loops run flat out, requested sleep is reported
+
+    times = []
+    t_start = time.perf_counter()
+    t_first = [None]
+    def sim_loops():
+        t_first[0] = time.perf_counter()
+        for i in range(loops):
+            t0 = time.perf_counter()
+            yield i
+            for display in adafruit_displayio_ssd1306.SSD1306.instances:
+                display.background()
+            touchio.next_frame()
+            times.append(time.perf_counter() - t0)
+
+    stdout = sys.stdout
+    if not show_output:
+        sys.stdout = _NullOutput()
+    app_globals = {"__name__": "__main__", "_sim_loops": sim_loops}
+    if profile:
+        from picoslidertoy.loopprofile import LoopProfiler
+        app_globals["_sim_profiler"] = LoopProfiler(report_every=None)
+    try:
+        exec(compile(source, os.path.join(app_dir, "code.py"), "exec"), app_globals)
+    finally:
+        sys.stdout = stdout
+    recorder = getattr(app_globals.get("controller"), "recorder", None)
+    if recorder:
+        recorder.flush()
+        recorder.stream.close()
+    t_total = time.perf_counter() - t_start
+
+    times.sort()
+    ms = lambda t: t * 1e3
+    print("%s: %d loops in %.2f s, %.1f ms to first loop" %
+          (app, len(times), t_total, ms(t_first[0] - t_start)))
+    print("  loop time  mean %.3f  p50 %.3f  p99 %.3f  max %.3f ms  (%.0f loops/s)" %
+          (ms(sum(times) / len(times)), ms(percentile(times, 0.5)), ms(percentile(times, 0.99)),
+           ms(times[-1]), len(times) / sum(times)))
+    print("  touchio    %.1f raw reads/loop" % (touchio.reads / len(times)))
+    print("  usb_midi   %d bytes in %d writes" % (len(usb_midi.ports[1].data), usb_midi.ports[1].writes))
+    print("  usb_hid    %d reports" % sum(len(d.reports) for d in usb_hid.devices))
+    print("  display    %d refreshes, %d displayio writes" %
+          (sum(d.refreshes for d in adafruit_displayio_ssd1306.SSD1306.instances), displayio.writes))
+    boot_timer = getattr(app_globals.get("controller"), "boot_timer", None)
+    if boot_timer:
+        print("  boot       " + ", ".join("%s at %d ms" % (name, ms)
+                                          for name, ms in boot_timer.times.items()))
+    if sleeps[0]:
+        print("  time.sleep %.2f s requested and skipped" % sleeps[0])
+    if record:
+        print("  recorded   %d frames to %s" % (recorder.frames, record))
+    sliders = getattr(app_globals.get("controller"), "sliders", ())
+    linearized = sum(1 for s in sliders if s.linear is not None)
+    if linearized:
+        print("  calibrate  %d sliders linearized" % linearized)
+    if nvm:
+        with open(nvm, "wb") as f:
+            f.write(microcontroller.nvm)
+    if profile:
+        app_globals["_sim_profiler"].report_func = lambda line: print("  " + line)
+        app_globals["_sim_profiler"].report()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("app", nargs="?", help="app directory name, e.g. midi_sliders")
+    parser.add_argument("--loops", type=int,
+                        help="loop iterations to run (default 2000, or the whole --replay)")
+    parser.add_argument("--read-us", type=float, default=0,
+                        help="microseconds each touchio raw read takes, for device-like loop rates")
+    parser.add_argument("--replay", help="touchrecord.py file to feed the touch pins from")
+    parser.add_argument("--record", help="have the app record its touch values to this file")
+    parser.add_argument("--show-output", action="store_true", help="show the app's print()s")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the app's loop phase and touch-to-USB latency histograms")
+    parser.add_argument("--nvm", help="file to keep microcontroller.nvm in, e.g. the calibration")
+    parser.add_argument("--all", action="store_true", help="run every app, each in its own process")
+    args = parser.parse_args()
+    # apps run in their own directory
+    replay = args.replay and os.path.abspath(args.replay)
+    record = args.record and os.path.abspath(args.record)
+    nvm = args.nvm and os.path.abspath(args.nvm)
+    if args.all:
+        apps = sorted(d for d in os.listdir(APPS_DIR)
+                      if os.path.exists(os.path.join(APPS_DIR, d, "code.py")))
+        failed = 0
+        for app in apps:
+            cmd = [sys.executable, __file__, app, "--read-us", str(args.read_us)]
+            if args.loops:
+                cmd += ["--loops", str(args.loops)]
+            if replay:
+                cmd += ["--replay", replay]
+            if args.profile:
+                cmd += ["--profile"]
+            if nvm:
+                cmd += ["--nvm", nvm]
+            failed += subprocess.call(cmd) != 0
+        sys.exit(failed)
+    if not args.app:
+        parser.error("give an app name or --all")
+    run_app(args.app, args.loops, args.show_output, args.read_us, replay, record, args.profile,
+            nvm)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`supervisor` stand-in for running picoslidertoy code on a host computer.
+"""
+
+import time
+
+class _Runtime():
+    usb_connected = True
+    serial_connected = True
+
+runtime = _Runtime()
+
+def ticks_ms():
+    """Milliseconds, wrapping at 2**29 like CircuitPython's"""
+    return (time.monotonic_ns() // 1_000_000) & ((1 << 29) - 1)
+
+def set_usb_identification(manufacturer=None, product=None, vid=None, pid=None):
+    pass
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`touchio` stand-in for running picoslidertoy code on a host computer.
+
+Each TouchIn gets its raw_value from `raw_source(pin)`. By default that
+looks up `traces` by pin name ("GP4"): a trace is either a sequence of raw
+values, indexed by `frame`, or a function of `frame`. Untraced pins read
+as untouched, and `thresholds` can give a pin's threshold at creation
+instead of the one touchio would pick. Call next_frame() once per loop to step through the traces.
+`raw_source` can also be replaced outright. `reads` counts raw measurements
+across all pins, and each one busy-waits `read_cost` seconds to stand in
+for the time a real measurement takes.
+"""
+
+import time
+
+UNTOUCHED = 1000
+
+traces = {}
+thresholds = {}
+frame = 0
+reads = 0
+read_cost = 0
+
+def from_traces(pin):
+    """Raw value of pin for the current frame"""
+    trace = traces.get(getattr(pin, "name", pin))
+    if trace is None:
+        return UNTOUCHED
+    if callable(trace):
+        return trace(frame)
+    return trace[frame] if frame < len(trace) else trace[-1]
+
+def next_frame():
+    global frame
+    frame += 1
+
+raw_source = from_traces
+
+class TouchIn():
+    """Fake touchio.TouchIn, thresholds are set like CircuitPython does at creation"""
+    def __init__(self, pin):
+        self.pin = pin
+        self.threshold = thresholds.get(getattr(pin, "name", pin))
+        if self.threshold is None:
+            self.threshold = int(raw_source(pin) * 1.05) + 100
+
+    @property
+    def raw_value(self):
+        global reads
+        reads += 1
+        if read_cost:
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < read_cost:
+                pass
+        return raw_source(self.pin)
+
+    @property
+    def value(self):
+        return self.raw_value > self.threshold
+
+    def deinit(self):
+        pass
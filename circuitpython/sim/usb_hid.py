@@ -0,0 +1,41 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`usb_hid` stand-in for running picoslidertoy code on a host computer.
+Every report sent on a Device is kept in its `reports` list, and sending
+one busy-waits `send_latency` seconds like waiting on the USB host does.
+"""
+
+import time
+
+send_latency = 0
+
+class Device():
+    """Fake usb_hid.Device, keeps every report sent"""
+    def __init__(self, usage_page, usage):
+        self.usage_page, self.usage = usage_page, usage
+        self.reports = []
+
+    def send_report(self, report, report_id=None):
+        if send_latency:
+            t0 = time.perf_counter()
+            while time.perf_counter() - t0 < send_latency:
+                pass
+        self.reports.append(bytes(report))
+
+    def get_last_received_report(self, report_id=None):
+        return None
+
+Device.KEYBOARD = Device(0x01, 0x06)
+Device.MOUSE = Device(0x01, 0x02)
+Device.CONSUMER_CONTROL = Device(0x0C, 0x01)
+
+devices = (Device.KEYBOARD, Device.MOUSE, Device.CONSUMER_CONTROL)
+
+def enable(devices_to_enable, boot_device=0):
+    global devices
+    devices = tuple(devices_to_enable)
+
+def disable():
+    global devices
+    devices = ()
@@ -0,0 +1,30 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`usb_midi` stand-in for running picoslidertoy code on a host computer.
+Everything written to ports[1] is kept in its `data`.
+"""
+
+class PortIn():
+    """Fake usb_midi.PortIn, never receives anything"""
+    def read(self, nbytes=None):
+        return b""
+
+    def readinto(self, buf, nbytes=None):
+        return 0
+
+class PortOut():
+    """Fake usb_midi.PortOut, keeps every byte written"""
+    def __init__(self):
+        self.data = bytearray()
+        self.writes = 0
+
+    def write(self, buf, nbytes=None):
+        self.data.extend(buf[:nbytes] if nbytes is not None else buf)
+        self.writes += 1
+        return len(buf) if nbytes is None else nbytes
+
+ports = (PortIn(), PortOut())
+
+def set_names(**kwargs):
+    pass
@@ -0,0 +1,19 @@
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`vectorio` stand-in for running picoslidertoy code on a host computer.
+"""
+
+from displayio import _Placed
+
+class Rectangle(_Placed):
+    """Fake vectorio.Rectangle"""
+    def __init__(self, *, pixel_shader, width, height, x=0, y=0):
+        super().__init__(x, y)
+        self.pixel_shader, self.width, self.height = pixel_shader, width, height
+
+class Circle(_Placed):
+    """Fake vectorio.Circle"""
+    def __init__(self, *, pixel_shader, radius, x=0, y=0):
+        super().__init__(x, y)
+        self.pixel_shader, self.radius = pixel_shader, radius
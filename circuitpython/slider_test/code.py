@@ -10,7 +10,8 @@
 #
 # 1. Install needed libraries:
 #   circup install adafruit_displayio_ssd1306
-# 2. Copy over this file as code.py:
+# 2. Copy the picoslidertoy library and this file as code.py:
+#   cp -r circuitpython/lib/picoslidertoy /Volumes/CIRCUITPY/lib/
 #   cp circuitpython/hwtest_display/code.py /Volumes/CIRCUITPY/code.py
 #
 
@@ -22,7 +23,7 @@ import displayio
 import vectorio
 import adafruit_displayio_ssd1306
 
-from touchslider import TouchWheel, TouchSlider
+from picoslidertoy.touchslider import TouchWheel, TouchSlider
 
 faderA_pins = (board.GP4, board.GP0, board.GP28)
 faderB_pins = (board.GP5, board.GP1, board.GP27)
@@ -38,8 +39,9 @@ faders = (
     TouchSlider(faderC_pins),
 )
 
-wheelX = TouchWheel(wheelX_pins)
-wheelY = TouchWheel(wheelY_pins)
+# physical design is rotated 1/2 a sector anti-clockwise
+wheelX = TouchWheel(wheelX_pins, offset=-0.333/2)
+wheelY = TouchWheel(wheelY_pins, offset=-0.333/2)
 
 pads = []
 for pin in pad_pins:
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: Copyright (c) 2024 Tod Kurt
+# SPDX-License-Identifier: MIT
+"""
+`emoji_atlas.py` -- pack emoji PNGs into one 1-bit sprite sheet for picoslidertoy.
+
+Making an EmojiLabel for each pad and slider icon reads and decodes a PNG
+per icon at startup and keeps a bitmap, palette and label per icon in RAM.
+This packs the icons once, on a computer, into a single 1-bit BMP strip
+that slider_display.IconAtlas shows with a displayio.OnDiskBitmap, so the
+pixels stay in flash and changing an icon is just changing a tile index.
+
+Two files are written, e.g. emoji_atlas.bmp and emoji_atlas.txt, the index
+of which tile is which emoji. Copy both next to the app's code.py.
+
+  python3 circuitpython/tools/emoji_atlas.py circuitpython/hid_media/emoji \\
+      --app circuitpython/hid_media/code.py -o circuitpython/hid_media/emoji_atlas
+
+With --app only the emoji that appear in that code.py are packed.
+Runs with just the Python standard library.
+
+Part of picoslidertoy
+2024 - @todbot / Tod Kurt - github.com/todbot/picoslidertoy
+
+"""
+
+import argparse
+import os
+import struct
+import sys
+import zlib
+
+def icon_key(text):
+    """Atlas index name of an icon's text, like its PNG's name: "⏏️" is "U+23CF" """
+    return "-".join("U+%X" % ord(c) for c in text if ord(c) != 0xFE0F)
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+def read_png(path):
+    """
+    Decode a non-interlaced PNG, returns (width, height, rows) where rows
+    are lists of (r, g, b, a) tuples.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("%s: not a PNG" % path)
+    pos, idat, palette, trns = 8, b"", [], b""
+    while pos < len(data):
+        n, kind = struct.unpack(">I4s", data[pos:pos+8])
+        body = data[pos+8:pos+8+n]
+        pos += 12 + n
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = [tuple(body[i:i+3]) for i in range(0, n, 3)]
+        elif kind == b"tRNS":
+            trns = body
+        elif kind == b"IDAT":
+            idat += body
+        elif kind == b"IEND":
+            break
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(color)
+    if channels is None or interlace or (depth != 8 and color != 3):
+        raise ValueError("%s: only 8-bit or palette non-interlaced PNGs are supported" % path)
+    bits = channels * depth
+    stride = (width * bits + 7) // 8
+    bpp = max(1, bits // 8)  # bytes per pixel for the filters
+    raw = zlib.decompress(idat)
+    rows, prev = [], bytearray(stride)
+    for y in range(height):
+        ftype = raw[y * (stride + 1)]
+        line = bytearray(raw[y * (stride + 1) + 1:(y + 1) * (stride + 1)])
+        for i in range(stride):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            if ftype == 1:
+                line[i] = (line[i] + a) & 0xff
+            elif ftype == 2:
+                line[i] = (line[i] + b) & 0xff
+            elif ftype == 3:
+                line[i] = (line[i] + (a + b) // 2) & 0xff
+            elif ftype == 4:
+                line[i] = (line[i] + _paeth(a, b, c)) & 0xff
+        prev = line
+        row = []
+        for x in range(width):
+            if color == 3:
+                bit = x * depth
+                v = (line[bit // 8] >> (8 - depth - bit % 8)) & ((1 << depth) - 1)
+                alpha = trns[v] if v < len(trns) else 255
+                row.append(palette[v] + (alpha,))
+            elif color == 0:
+                row.append((line[x],) * 3 + (255,))
+            elif color == 4:
+                row.append((line[2*x],) * 3 + (line[2*x+1],))
+            elif color == 2:
+                row.append(tuple(line[3*x:3*x+3]) + (255,))
+            else:
+                row.append(tuple(line[4*x:4*x+4]))
+        rows.append(row)
+    return width, height, rows
+
+def to_1bit(rows, threshold=128):
+    """Pixels that are opaque and bright are on, like the SSD1306 shows them"""
+    return [[1 if a >= 128 and (r * 299 + g * 587 + b * 114) // 1000 >= threshold else 0
+             for r, g, b, a in row] for row in rows]
+
+def write_bmp(path, width, height, pixels):
+    """Write a 1-bit BMP, palette 0 black (transparent when shown) and 1 white"""
+    stride = ((width + 31) // 32) * 4
+    body = bytearray()
+    for y in range(height - 1, -1, -1):  # BMP rows go bottom up
+        line = bytearray(stride)
+        for x in range(width):
+            if pixels[y][x]:
+                line[x // 8] |= 0x80 >> (x % 8)
+        body += line
+    offset = 14 + 40 + 8
+    with open(path, "wb") as f:
+        f.write(struct.pack("<2sIHHI", b"BM", offset + len(body), 0, 0, offset))
+        f.write(struct.pack("<IiiHHIIiiII", 40, width, height, 1, 1, 0, len(body),
+                            2835, 2835, 2, 2))
+        f.write(bytes((0, 0, 0, 0, 255, 255, 255, 0)))
+        f.write(body)
+
+def make_atlas(names, emoji_dir, out):
+    """Pack the emoji PNGs `names` (like "U+23CF") from emoji_dir into out.bmp and out.txt"""
+    tiles, tile_w, tile_h = [], None, None
+    for name in names:
+        w, h, rows = read_png(os.path.join(emoji_dir, name + ".png"))
+        if tile_w is None:
+            tile_w, tile_h = w, h
+        elif (w, h) != (tile_w, tile_h):
+            raise ValueError("%s is %dx%d, the others are %dx%d" % (name, w, h, tile_w, tile_h))
+        tiles.append(to_1bit(rows))
+    if not tiles:
+        raise ValueError("no emoji to pack")
+    # one row of tiles, tile 0 is left blank for "no icon"
+    width = tile_w * (len(tiles) + 1)
+    pixels = [[0] * width for _ in range(tile_h)]
+    for t, tile in enumerate(tiles):
+        for y in range(tile_h):
+            pixels[y][(t + 1) * tile_w:(t + 2) * tile_w] = tile[y]
+    write_bmp(out + ".bmp", width, tile_h, pixels)
+    with open(out + ".txt", "w") as f:
+        f.write("# made by emoji_atlas.py, tile size then each emoji's tile\n")
+        f.write("%d %d\n" % (tile_w, tile_h))
+        for t, name in enumerate(names):
+            f.write("%s %d\n" % (name, t + 1))
+    return len(tiles), width, tile_h
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].split("--")[1].strip())
+    parser.add_argument("emoji_dir", help="directory of emoji PNGs named like U+23CF.png")
+    parser.add_argument("-o", "--out", default="emoji_atlas",
+                        help="output path without extension (default emoji_atlas)")
+    parser.add_argument("--app", help="only pack the emoji used in this code.py")
+    args = parser.parse_args()
+    names = sorted(f[:-4] for f in os.listdir(args.emoji_dir) if f.endswith(".png"))
+    if args.app:
+        with open(args.app, encoding="utf-8") as f:
+            source = f.read()
+        used = set()
+        for i, c in enumerate(source):
+            # an emoji is one codepoint, maybe followed by variation selector 16
+            key = icon_key(source[i:i+2] if source[i+1:i+2] == "\ufe0f" else c)
+            if key in names:
+                used.add(key)
+        names = [n for n in names if n in used]
+    n, w, h = make_atlas(names, args.emoji_dir, args.out)
+    print("packed %d emoji into %s.bmp (%dx%d, 1-bit) and %s.txt" % (n, args.out, w, h, args.out))
+
+if __name__ == "__main__":
+    sys.exit(main())